@@ -3,6 +3,7 @@
 
 # Imports.
 from subprocess import run, Popen, PIPE
+from hashlib import sha256
 from json import load
 from pathlib import Path
 from re import sub
@@ -35,6 +36,8 @@ from Proof_of_Concept.getters import (get_mp_spdz_scripts_path as
                                       mp_spdz_scripts_path)
 from Proof_of_Concept.getters import (get_mp_spdz_compile_path as
                                       mp_spdz_compile_path)
+from Proof_of_Concept.getters import (get_mp_spdz_schedules_directory as
+                                      mp_spdz_schedules_directory)
 from Proof_of_Concept.getters import (get_client_mp_spdz_input_path as
                                       client_mp_spdz_input_path)
 from Proof_of_Concept.getters import (get_client_mp_spdz_output_path as
@@ -155,9 +158,16 @@ def compile_and_run_mp_spdz():
 
     """
 
-    run(['cp', proof_of_concept_mpc_script_path(), f'{mp_spdz_scripts_path()}/{proof_of_concept_mpc_script_path().name}'])
+    # Only recompiles the script when it has changed since it was last compiled, the parameters being written into it.
+    script_key = sha256(proof_of_concept_mpc_script_path().read_bytes()).hexdigest()
+    script_key_path = mp_spdz_schedules_directory() / f'{proof_of_concept_mpc_script_path().stem}.key'
     chdir(mp_spdz_directory())
-    run([f'{mp_spdz_directory() / mp_spdz_compile_path().name}', proof_of_concept_mpc_script_path().stem])
+    if not script_key_path.is_file() or script_key_path.read_text() != script_key:
+        run(['cp', proof_of_concept_mpc_script_path(),
+             f'{mp_spdz_scripts_path()}/{proof_of_concept_mpc_script_path().name}'])
+        run([f'{mp_spdz_directory() / mp_spdz_compile_path().name}', proof_of_concept_mpc_script_path().stem],
+            check=True)
+        script_key_path.write_text(script_key)
     client = Popen([f'{mp_spdz_directory() / mp_spdz_protocol()}', f'{proof_of_concept_mpc_script_path().stem}',
                     '-p', '0',
                     '-IF', f'{client_mp_spdz_input_path()}',
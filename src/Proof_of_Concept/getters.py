@@ -57,6 +57,12 @@ def get_mp_spdz_programs_directory() -> Path:
     return mp_spdz_programs_directory
 
 
+def get_mp_spdz_schedules_directory() -> Path:
+    """ Getter for the mp_spdz_schedules_directory variable. """
+    mp_spdz_schedules_directory = get_mp_spdz_programs_directory() / 'Schedules'
+    return mp_spdz_schedules_directory
+
+
 def get_mp_spdz_scripts_path() -> Path:
     """ Getter for the mp_spdz_scripts_path variable. """
     mp_spdz_scripts_path = get_mp_spdz_programs_directory() / 'Source'
@@ -1,279 +1,130 @@
-""" Permutes and shuffles the records using the oblivious sorting algorithm bitonic sort. """
-
-# Imports.
-from math import log
-from numpy import random
+""" Permutes the records using the oblivious sorting algorithm bitonic sort. """
 
 # Local getters imports.
 from application.getters import (get_database_size as
                                                        database_size)
 
 
-def compare_init(client, connection, index: int, permutation: list, descending: bool, midpoint: int) -> None:
-    """ 
-        Sorts and encrypts two records.
-
-        Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-            - index (int) : An index of a record to be evaluated.
-            - permutation (list) : The order the records will be shuffled.
-            - descending (bool) : Indicates the order the records should be sorted.
-            - midpoint (int) : An index of a record to be evaluated.
-
-        Returns:
-            :raises
-            -  
+def compare(index_a: int, index_b: int, permutation: list) -> tuple[bool, int, int]:
     """
-    
-    index_a, index_b = index, index + midpoint
-    
-    # Evaluates whether the records should be swapped or not.
-    swap = False
-    permutation_a, permutation_b = permutation[index_a], permutation[index_b]
-    if (permutation_a > permutation_b and not descending) or (permutation_b > permutation_a and descending):
-        permutation_a, permutation_b = permutation_b, permutation_a
-        swap = True
-
-    # Updates permutation.
-    permutation[index_a], permutation[index_b] = permutation_a, permutation_b
-
-    # Executes the mpc encryption and sorting.
-    client.send_indices_and_encrypt(connection, swap, index_a, index_b)
-
-    return 
-
-
-def compare(client, connection, index: int, permutation: list, descending: bool, midpoint: int) -> None:
-    """
-        Sorts and re-encrypts two records.
+        Evaluates whether two records should be swapped to be sorted in ascending order.
 
         Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-            - index (int) : An index of a record to be evaluated.
+            - index_a (int) : The lower index of the records to be evaluated.
+            - index_b (int) : The higher index of the records to be evaluated.
             - permutation (list) : The order the records will be shuffled.
-            - descending (bool) : Indicates the order the records should be sorted.
-            - midpoint (int) : An index of a record to be evaluated.
 
         Returns:
             :raises
-            -  
+            - compare_exchange (tuple[bool, int, int]) : The swap indicator and the indices of the two records.
     """
 
-    index_record_a, index_record_b = index, index + midpoint
-    
     # Evaluates whether the records should be swapped or not.
     swap = False
-    permutation_a, permutation_b = permutation[index], permutation[index + midpoint]
-    if (permutation_a > permutation_b and not descending) or (permutation_b > permutation_a and descending):
+    permutation_a, permutation_b = permutation[index_a], permutation[index_b]
+    if permutation_a > permutation_b:
         permutation_a, permutation_b = permutation_b, permutation_a
         swap = True
 
     # Updates permutation.
-    permutation[index], permutation[index + midpoint] = permutation_a, permutation_b
-
-    # Executes the mpc encryption and sorting.
-    client.send_indices_and_reencrypt(connection, swap, index_record_a, index_record_b)
-
-    return
-
-
-def init(client, connection, permutation: list) -> None:
-    """
-        Performs the first layer of the bitonic sort and encrypts the records.
-
-        Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-            - permutation (list) : The order the records will be shuffled.
-
-        Returns:
-            :raises
-            -  
-    """
-
-    partition_size = 2
-    partition_midpoint = partition_size // 2
-
-    descending = False
-    for index in range(0, database_size(), partition_size):
-
-        # Parallelizable
-        compare_init(client, connection, index, permutation, descending, partition_midpoint)
+    permutation[index_a], permutation[index_b] = permutation_a, permutation_b
 
-        descending = (descending + 1) % 2
-        
-    return 
+    return swap, index_a, index_b
 
 
-def merge_partition(client, connection, descending: bool, permutation: list, partition_index: int, partition_midpoint: int) -> None:
+def get_padded_size() -> int:
     """
-        Merges two bitonic sequences.
+        Gets the smallest power of two at least as large as the database, the size of the network the records are
+        sorted with. The network is padded with virtual records larger than every record, which a compare-exchange
+        would never move, so the compare-exchanges with virtual records are left out.
 
         Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-            - permutation (list) : The order the records will be shuffled.
-            - partition_ex (int) : The first index of a partition.
-            - partition_midpoint (int) : Midpoint of a partition.
+            -
 
         Returns:
             :raises
-            -  
+            - padded_size (int) : The size of the network.
     """
 
-    for value in range(partition_midpoint):
-        index = partition_index + value
-
-        # Parallelizable
-        compare(client, connection, index, permutation, descending, partition_midpoint)
-    
-    return 
+    return 1 << (database_size() - 1).bit_length()
 
 
-def merge(client, connection, permutation: list, partition_size, partition_midpoint: int) -> None:
+def merge(permutation: list, partition_size: int) -> list[tuple[bool, int, int]]:
     """
-        Merges the bitonic sequences of a layer.
+        Compiles the merging of the two sorted halves of every partition of a layer, comparing the records of the first
+        half with those of the second half in reverse order.
 
         Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
             - permutation (list) : The order the records will be shuffled.
             - partition_size (int) : Size of the partition.
-            - partition_midpoint (int) : Midpoint of a partition.
-
-        Returns:
-            :raises
-            -  
-    """
-
-    descending = False
-    for partition_index in range(0, database_size(), partition_size):
-
-        # Parallelizable
-        merge_partition(client, connection, descending, permutation, partition_index, partition_midpoint)
-
-        descending = (descending + 1) % 2
-        
-    return 
-
-
-def sort_subpartition(client, connection, permutation: list, descending: bool, partition_index: int,
-                      subpartition_index: int, subpartition_midpoint: int) -> None:
-    """
-        Sorts the sub-partition into a bitonic sequences.
-
-        Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-            - permutation (list) : The order the records will be shuffled.
-            - descending (bool) : Indicates the order the records should be sorted.
-            - partition_index (int) : The first index of a partition.
-            - subpartition_index (int) : The first index of a subpartition.
-            - subpartition_midpoint (int) : The subpartition midpoint. 
 
         Returns:
             :raises
-            -  
+            - layer (list[tuple[bool, int, int]]) : The compare-exchanges of the layer.
     """
 
-    for value in range(subpartition_midpoint):
-        index = partition_index + subpartition_index + value
+    layer = []
+    for partition_index in range(0, get_padded_size(), partition_size):
+        for value in range(partition_size // 2):
+            index_a, index_b = partition_index + value, partition_index + partition_size - 1 - value
+            if index_b < database_size():
+                layer.append(compare(index_a, index_b, permutation))
 
-        # Parallelizable
-        compare(client, connection, index, permutation, descending, subpartition_midpoint)
-    
-    return 
+    return layer
 
 
-def sort_partition(client, connection, permutation: list, descending: bool, partition_size: int, partition_index: int) -> None:
+def sort(permutation: list, partition_size: int) -> list[list[tuple[bool, int, int]]]:
     """
-        Sorts all sub-layers into bitonic sequences.
+        Compiles the sorting of the bitonic halves of every partition of a layer, one sub-layer at a time.
 
         Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
             - permutation (list) : The order the records will be shuffled.
-            - descending (bool) : Indicates the order the records should be sorted.
             - partition_size (int) : Size of the partition.
-            - partition_index (int) : The first index of a partition.
 
         Returns:
             :raises
-            -  
+            - layers (list[list[tuple[bool, int, int]]]) : The compare-exchanges of each sub-layer.
     """
 
-    for sub_layer in range(-int(log(partition_size, 2)) + 1, 0):
-        subpartition_size = 2 ** (sub_layer * -1)
-        subpartition_midpoint = subpartition_size // 2
+    layers = []
+    subpartition_midpoint = partition_size // 4
+    while subpartition_midpoint > 0:
+        layer = []
+        for index in range(get_padded_size()):
+            if index % (2 * subpartition_midpoint) < subpartition_midpoint and \
+                    index + subpartition_midpoint < database_size():
+                layer.append(compare(index, index + subpartition_midpoint, permutation))
+        layers.append(layer)
 
-        for subpartition_index in range(0, partition_size, subpartition_size):
+        subpartition_midpoint //= 2
 
-            # Parallelizable
-            sort_subpartition(client, connection, permutation, descending, partition_index, subpartition_index,
-                              subpartition_midpoint)
-            
-    return 
+    return layers
 
 
-def sort(client, connection, permutation: list, partition_size: int) -> None:
+def get_bitonic_network(permutation: list) -> list[list[tuple[bool, int, int]]]:
     """
-        Sorts a layer into bitonic sequences.
+        Compiles the bitonic sorting network of the permutation, layer by layer, for any number of records. Every
+        compare-exchange sorts in ascending order, so the virtual records padding the network stay at its end. The swap
+        indicators are evaluated while compiling, as the client knows the whole permutation.
 
         Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
             - permutation (list) : The order the records will be shuffled.
-            - partition_size (int) : Size of the partition.
 
         Returns:
             :raises
-            -  
+            - layers (list[list[tuple[bool, int, int]]]) : The compare-exchanges of each layer, in program order. The
+                                                           first layer holds every record when there is an even number
+                                                           of them.
     """
 
-    descending = False
-    for partition_index in range(0, database_size(), partition_size):
-
-        # Parallelizable
-        sort_partition(client, connection, permutation, descending, partition_size, partition_index)
-
-        descending = (descending + 1) % 2
-        
-    return 
-
-
-def bitonic_sort(client, connection) -> dict[int, int]:
-    """
-        Performs a random oblivious shuffling of the server's records.
-
-        Parameters:
-            - client (Communicator) : The client.
-            - connection (SSLSocket) : Connection with the server.
-
-        Returns:
-            :raises
-            -  permutation_indexing (dict[int, int]) : The mapping from the original record indexing to their shuffled 
-                                                       location.
-    """
-
-    if not log(database_size(), 2).is_integer():
-        raise ValueError('Array size has to be of power 2.')
-
-    # Creates new indexing of the shuffled records
-    permutation = random.permutation(database_size()).tolist()
-    permutation_indexing = dict(zip([str(i) for i in range(len(permutation))], permutation))
-
-    # Encrypts the records and sorts the first layer
-    init(client, connection, permutation)
-
-    # Completes the sorting of the encrypted records
-    for layer in range(2, int(log(database_size(), 2) + 1)):
-        partition_size = 2 ** layer
-        partition_midpoint = partition_size // 2
+    # Sorts partitions of twice the size at every layer, the first layer encrypting the records.
+    layers = []
+    partition_size = 2
+    while partition_size <= get_padded_size():
+        layers.append(merge(permutation, partition_size))
 
-        merge(client, connection, permutation, partition_size, partition_midpoint)
+        layers.extend(sort(permutation, partition_size))
 
-        sort(client, connection, permutation, partition_size)
+        partition_size *= 2
 
-    return permutation_indexing
+    return layers
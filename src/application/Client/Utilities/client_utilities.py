@@ -1,12 +1,10 @@
 """ Functionality of the client. """
 
 # Imports.
-from os import chdir
-from subprocess import Popen, PIPE
 from hashlib import shake_128
-from re import search
 from json import dump, load
 from pathlib import Path, PosixPath
+from shutil import rmtree, copytree
 from random import randint
 from numpy import multiply
 from sentence_transformers import SentenceTransformer
@@ -14,26 +12,30 @@ from warnings import simplefilter
 from cryptography.hazmat.primitives.ciphers import (Cipher, algorithms, modes)
 
 # Local getters imports.
-from application.getters import (get_mp_spdz_protocol as
-                                 mp_spdz_protocol)
 from application.getters import (get_database_size as
                                  database_size)
 from application.getters import (get_number_of_bytes as
                                  number_of_bytes)
-from application.getters import (get_encoding_base as
-                                 encoding_base)
+from application.getters import (get_query_digests_per_job as
+                                 query_digests_per_job)
+from application.getters import (get_number_of_query_jobs as
+                                 number_of_query_jobs)
+from application.getters import (get_maximum_number_of_search_query_terms as
+                                 maximum_number_of_search_query_terms)
+from application.getters import (get_number_of_records as
+                                 number_of_records)
+from application.getters import (get_maximum_number_of_requests_per_search as
+                                 maximum_number_of_requests_per_search)
+from application.getters import (get_search_query_term_separator as
+                                 search_query_term_separator)
 from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
                                  aes_128_ecb_mpc_script_path)
-from application.getters import (get_client_mp_spdz_input_path as
-                                 mp_spdz_input_path)
-from application.getters import (get_client_mp_spdz_output_path as
-                                 mp_spdz_output_path)
-from application.getters import (get_mp_spdz_directory as
-                                 mp_spdz_directory)
-from application.getters import (get_working_directory as
-                                 working_directory)
 from application.getters import (get_records_encryption_key_streams_directory as
                                  records_encryption_keys_directory)
+from application.getters import (get_scratch_directory as
+                                 scratch_directory)
+from application.getters import (get_client_scratch_encryption_key_streams_directory as
+                                 scratch_encryption_keys_directory)
 from application.getters import (get_permutation_indexing_path as
                                  permutation_indexing_path)
 from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_path as
@@ -46,6 +48,8 @@ from application.getters import (get_requested_indices_path as
                                  requested_indices_path)
 from application.getters import (get_number_of_blocks as
                                  number_of_blocks)
+from application.getters import (get_compare_exchanges_per_job as
+                                 compare_exchanges_per_job)
 from application.getters import (get_semantic_search_mpc_script_path as
                                  semantic_search_mpc_script_path)
 from application.getters import (get_semantic_search_request_threshold as
@@ -56,11 +60,21 @@ from application.getters import (get_embedding_model as
                                  embedding_model)
 from application.getters import (get_float_to_integer_scalar as
                                  float_to_integer_scalar)
-from application.getters import (get_number_of_records as
-                                 number_of_records)
+
+# Binary encoding imports.
+from application.binary_encoding import encode_words, decode_words
+from application.binary_encoding import read_encrypted_inverted_index_matrix_part
+from application.binary_encoding import read_encrypted_inverted_index_matrix_part_header
+
+# Networking imports.
+from application.networking import get_file_digest
+
+# MPC imports.
+from application.MPC.worker import WorkerPool
+from application.MPC.backend import get_mpc_workers
 
 # Client imports.
-from application.Client.Utilities.bitonic_sort import bitonic_sort
+from application.Client.Utilities.shuffle import shuffle
 from application.Client.Utilities.key_stream_generator import get_key_stream, aes_128_ctr
 
 
@@ -77,14 +91,16 @@ class Utilities:
         self.is_semantic_search = False
         self.resume_from_previous_preprocessing = False
         self.query_embedding = None
-        self.encrypted_query_key1 = None
-        self.encrypted_query_key2 = None
+        self.encrypted_query_keys = []
         self.permuted_indices = None
         self.number_of_dummy_items = None
         self.dummy_item_indices = None
         self.requests_to_make = None
         self.requested_indices = set()
         self.indices_to_request = set()
+        self.mp_spdz_port_base = None
+        self.mpc_workers = None
+        self.encryption_keys_directory = records_encryption_keys_directory()
 
         return
 
@@ -127,6 +143,47 @@ class Utilities:
 
         return
 
+    @staticmethod
+    def get_encrypted_inverted_index_matrix_part_path(part: int) -> Path:
+        """
+            Gets the path of a part of the encrypted inverted index matrix.
+
+            Parameters:
+                - part (int) : The number of the part.
+
+            Returns:
+                :raises
+                - part_path (Path) : The path of the part.
+        """
+
+        return encrypted_inverted_index_matrix_directory() / f'Encrypted_Inverted_Index{part}.bin'
+
+    def get_missing_encrypted_inverted_index_matrix_parts(self, manifest: list[list[int | str]]) -> list[int]:
+        """
+            Compares the parts of the encrypted inverted index matrix held from previous pre-processing with the
+            server's manifest, removing the parts that are corrupt.
+
+            Parameters:
+                - manifest (list[list[int | str]]) : The size and digest of each part, in the order of the parts.
+
+            Returns:
+                :raises
+                - missing_parts (list[int]) : The numbers of the parts that are missing or were corrupt.
+        """
+
+        missing_parts = []
+        for part, (size, digest) in enumerate(manifest):
+            part_path = self.get_encrypted_inverted_index_matrix_part_path(part)
+
+            # Only parts of the right size are hashed, the rest are missing or cut short.
+            if part_path.exists() and part_path.stat().st_size == size and get_file_digest(part_path) == digest:
+                continue
+
+            part_path.unlink(missing_ok=True)
+            missing_parts.append(part)
+
+        return missing_parts
+
     def records_preprocessing(self, client_communicator, connection) -> None:
         """
             Obliviously encrypts and shuffles all records and dummy items according to the client's permutation and 
@@ -141,8 +198,26 @@ class Utilities:
                 -
         """
 
-        # Shuffles and encrypts the records and dummy items.
-        self.permuted_indices = bitonic_sort(client_communicator, connection)
+        # Keeps the encryption keys in the scratch directory of the session during the shuffle, when there is one,
+        # which only the user running the client can access.
+        if scratch_directory() is not None:
+            self.encryption_keys_directory = scratch_encryption_keys_directory(client_communicator.session_id)
+            rmtree(self.encryption_keys_directory.parent, ignore_errors=True)
+            self.encryption_keys_directory.parent.mkdir(mode=0o700, parents=True)
+            self.encryption_keys_directory.mkdir(mode=0o700)
+
+        try:
+            # Shuffles and encrypts the records and dummy items.
+            self.permuted_indices = shuffle(client_communicator, connection)
+
+            # Moves the final encryption keys to the disk.
+            if self.encryption_keys_directory != records_encryption_keys_directory():
+                copytree(self.encryption_keys_directory, records_encryption_keys_directory(), dirs_exist_ok=True)
+        finally:
+            # Removes the scratch directory of the session, even if the shuffle failed.
+            if self.encryption_keys_directory != records_encryption_keys_directory():
+                rmtree(self.encryption_keys_directory.parent, ignore_errors=True)
+                self.encryption_keys_directory = records_encryption_keys_directory()
 
         # Writes the permutation.
         self.write_permutation(self.permuted_indices)
@@ -154,67 +229,86 @@ class Utilities:
 
         return
 
-    def encrypt_records(self, swap: bool, index_a: int, index_b: int, host_address: str) -> None:
+    def encrypt_records(self, compare_exchanges: list[tuple[bool, int, int]], host_address: str, worker: int) -> None:
         """
-            Obliviously encrypts the records with the client's keys.
+            Obliviously encrypts pairs of records with the client's keys, in a single job. A job of fewer than
+            compare_exchanges_per_job pairs is padded with zero inputs, as the server pads it with zero blocks.
 
             Parameters:
-                - swap (bool) : Indicator for whether the records should be swapped or not to be sorted.
-                - index_a (int) : Index to the pointer of a record.
-                - index_b (int) : Index to the pointer of a record.
+                - compare_exchanges (list[tuple[bool, int, int]]) : The indicator for whether the records should be
+                                                                    swapped or not to be sorted, and the indices to the
+                                                                    pointers of the two records of each pair.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
-
+                - worker (int) : The number of the worker to run the job on.
 
             Returns:
                 :raises
                 -
         """
 
-        encryption_key_streams_a, encryption_key_a, nonce_a = get_key_stream()
-        encryption_key_streams_b, encryption_key_b, nonce_b = get_key_stream()
-        encryption_key_streams = [encryption_key_streams_a, encryption_key_streams_b]
+        inputs, indices, keys, nonces = [], [], [], []
+        for swap, index_a, index_b in compare_exchanges:
+            encryption_key_streams_a, encryption_key_a, nonce_a = get_key_stream()
+            encryption_key_streams_b, encryption_key_b, nonce_b = get_key_stream()
+            encryption_key_streams = [encryption_key_streams_a, encryption_key_streams_b]
 
-        # Runs MP-SPDZ to obliviously encrypt the records with the client's keys.
+            inputs.append(self.get_mp_spdz_inputs(encryption_key_streams, int(swap)))
+            indices.extend([index_a, index_b])
+            keys.extend([encryption_key_a, encryption_key_b])
+            nonces.extend([nonce_a, nonce_b])
+
+        # Runs MP-SPDZ to obliviously encrypt the pairs of records with the client's keys.
         player_id = 1
-        self.write_mp_spdz_inputs(player_id, encryption_key_streams, int(swap))
-        self.run_mp_spdz(player_id, sort_and_encrypt_with_circuit_mpc_script_path().stem, host_address)
-        self.write_encryption_keys([index_a, index_b], [encryption_key_a, encryption_key_b], [nonce_a, nonce_b])
+        mpc_script_name = sort_and_encrypt_with_circuit_mpc_script_path().stem
+        job_inputs = b''.join(inputs).ljust(compare_exchanges_per_job() * len(inputs[0]), b'\0')
+        self.get_mpc_workers().run(player_id, mpc_script_name, host_address, job_inputs, worker)
+        self.write_encryption_keys(indices, keys, nonces)
 
         return
 
-    def reencrypt_records(self, swap: bool, index_a: int, index_b: int, host_address: str) -> None:
+    def reencrypt_records(self, compare_exchanges: list[tuple[bool, int, int]], host_address: str,
+                          worker: int) -> None:
         """
-            Obliviously re-encrypts the records with the client's keys.
+            Obliviously re-encrypts pairs of records with the client's keys, in a single job. A job of fewer than
+            compare_exchanges_per_job pairs is padded with zero inputs, as the server pads it with zero blocks.
 
             Parameters:
-                - swap (bool) : Indicator for whether the records should be swapped or not to be sorted.
-                - index_a (int) : Index to the pointer of a record.
-                - index_b (int) : Index to the pointer of a record.
+                - compare_exchanges (list[tuple[bool, int, int]]) : The indicator for whether the records should be
+                                                                    swapped or not to be sorted, and the indices to the
+                                                                    pointers of the two records of each pair.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - worker (int) : The number of the worker to run the job on.
 
             Returns:
                 :raises
                 -
         """
 
-        # Gets the decryption key streams and new encryption key streams.
-        decryption_key_streams_a = self.get_stored_key_stream(index_a)
-        decryption_key_streams_b = self.get_stored_key_stream(index_b)
-        encryption_key_streams_a, encryption_key_a, nonce_a = get_key_stream()
-        encryption_key_streams_b, encryption_key_b, nonce_b = get_key_stream()
-        encryption_key_streams = [encryption_key_streams_a, encryption_key_streams_b]
-        decryption_key_streams = [decryption_key_streams_a, decryption_key_streams_b]
+        inputs, indices, keys, nonces = [], [], [], []
+        for swap, index_a, index_b in compare_exchanges:
+            # Gets the decryption key streams and new encryption key streams.
+            decryption_key_streams_a = self.get_stored_key_stream(index_a)
+            decryption_key_streams_b = self.get_stored_key_stream(index_b)
+            encryption_key_streams_a, encryption_key_a, nonce_a = get_key_stream()
+            encryption_key_streams_b, encryption_key_b, nonce_b = get_key_stream()
+            encryption_key_streams = [encryption_key_streams_a, encryption_key_streams_b]
+            decryption_key_streams = [decryption_key_streams_a, decryption_key_streams_b]
 
-        # Runs MP-SPDZ to obliviously re-encrypt the records with the client's keys.
+            inputs.append(self.get_mp_spdz_inputs(encryption_key_streams, int(swap), decryption_key_streams))
+            indices.extend([index_a, index_b])
+            keys.extend([encryption_key_a, encryption_key_b])
+            nonces.extend([nonce_a, nonce_b])
+
+        # Runs MP-SPDZ to obliviously re-encrypt the pairs of records with the client's keys.
         player_id = 1
-        self.write_mp_spdz_inputs(player_id, encryption_key_streams, int(swap), decryption_key_streams)
-        self.run_mp_spdz(player_id, sort_and_reencrypt_with_circuit_mpc_script_path().stem, host_address)
-        self.write_encryption_keys([index_a, index_b], [encryption_key_a, encryption_key_b], [nonce_a, nonce_b])
+        mpc_script_name = sort_and_reencrypt_with_circuit_mpc_script_path().stem
+        job_inputs = b''.join(inputs).ljust(compare_exchanges_per_job() * len(inputs[0]), b'\0')
+        self.get_mpc_workers().run(player_id, mpc_script_name, host_address, job_inputs, worker)
+        self.write_encryption_keys(indices, keys, nonces)
 
         return
 
-    @staticmethod
-    def get_stored_key_stream(index: int) -> list[str]:
+    def get_stored_key_stream(self, index: int) -> list[str]:
         """
             Gets the key streams used ot encrypt a record.
             
@@ -226,7 +320,7 @@ class Utilities:
                 - key_stream (list[str]) : Key streams corresponding to a record.
         """
 
-        key_path = records_encryption_keys_directory() / f'{index}.txt'
+        key_path = self.encryption_keys_directory / f'{index}.txt'
 
         # Reads the key streams.
         with key_path.open('r') as f:
@@ -258,8 +352,7 @@ class Utilities:
 
         return
 
-    @staticmethod
-    def write_encryption_keys(indices: list[int], keys: list[str], nonces: list[str]) -> None:
+    def write_encryption_keys(self, indices: list[int], keys: list[str], nonces: list[str]) -> None:
         """
             Obliviously encrypts and shuffles all records and dummy items according to the client's permutation and 
             encryption keys.
@@ -279,7 +372,7 @@ class Utilities:
             index = indices[i]
             key = keys[i]
             nonce = nonces[i]
-            encryption_key_streams_path = records_encryption_keys_directory() / f'{index}.txt'
+            encryption_key_streams_path = self.encryption_keys_directory / f'{index}.txt'
             with encryption_key_streams_path.open('w') as f:
                 f.write(f'{key} {nonce}')
                 f.close()
@@ -323,66 +416,69 @@ class Utilities:
                 -
         """
 
-        # OBS INSECURE FOR DEMONSTRATIVE PURPOSES.
-        # Compares the search query embedding to each record embedding one by one and sorts them by smallest distance.
-        results = []
+        # Compares the search query embedding to every record embedding in a single job, which only reveals the
+        # indices of the closest records.
         player_id = 0
-        self.write_embedding_mp_spdz_input(player_id)
-        for _ in range(number_of_records()):
-            self.run_mp_spdz(player_id, semantic_search_mpc_script_path().stem, host_address)
-            results.append(self.get_semantic_search_result(player_id))
+        output = self.run_mp_spdz(player_id, semantic_search_mpc_script_path().stem, host_address,
+                                  self.get_embedding_mp_spdz_input())
 
         # Updates local variable with the closes record indices.
-        results.sort(key=lambda x: x[0])
-        for i in range(request_threshold()):
-            self.indices_to_request.add(results[i][1])
+        self.indices_to_request.update(self.get_semantic_search_results(output))
 
         return
 
-    def write_embedding_mp_spdz_input(self, player_id: int) -> None:
+    def get_embedding_mp_spdz_input(self) -> bytes:
         """
-            Writes an embedding vectory to the MP-SPDZ input file.
+            Encodes the search query embedding as inputs to be used with MPC.
 
             Parameters:
-                - player_id (int) : The player ID the key streams will be written to.
+                -
 
             Returns:
                 :raises
-                -
+                - inputs (bytes) : The values of the vector embedding as words.
         """
 
-        # Writes each value of the vector embedding.
-        with open(mp_spdz_input_path().parent / f'{mp_spdz_input_path()}-P{player_id}-0', 'w') as f:
-            for value in self.query_embedding:
-                f.write(f'{value} ')
-            f.close()
-
-        return
+        return encode_words(self.query_embedding, signed=True)
 
     @staticmethod
-    def get_semantic_search_result(player_id: int) -> tuple[str, str]:
+    def get_semantic_search_results(output: bytes) -> list[str]:
         """
-            Gets the result of the oblivious comparison of the search query embedding and a record embedding from the
-            MP-SPDZ output file.
+            Gets the result of the oblivious comparison of the search query embedding and the record embeddings from
+            the output of the MPC execution.
 
             Parameters:
-                - player_id (int) : The player ID the key streams will be written to.
+                - output (bytes) : The output of the MPC execution as words.
 
             Returns:
                 :raises
-                -
+                - indices (list[str]) : The indices of the closest records, closest first.
         """
 
-        with open(mp_spdz_output_path().parent / f'{mp_spdz_output_path()}-P{player_id}-0', 'r') as f:
-            distance, index = f.read().strip().split(' ')
-            f.close()
+        return [f'{index}' for index in decode_words(output, signed=True)]
+
+    def get_search_query_terms(self, search_query: str) -> list[str]:
+        """
+            Splits the client's search query into its terms.
+
+            Parameters:
+                - search_query (str) : Client's search query.
 
-        return distance, index
+            Returns:
+                :raises
+                - search_query_terms (list[str]) : The terms of the search query, the whole query if it has one term.
+        """
+
+        search_query_terms = [term.strip() for term in search_query.split(search_query_term_separator())]
+
+        return [term for term in search_query_terms if term] or [search_query]
 
     def encrypt_search_query(self, search_query: str, host_address: str) -> None:
         """
-            Obliviously encrypts the client's search query with the server's inverted index matrix encryption key.
-            
+            Obliviously encrypts every term of the client's search query with both of the server's inverted index
+            matrix encryption keys, query_digests_per_job terms per job with the jobs running concurrently. The terms
+            are padded with dummy digests to number_of_query_jobs full jobs, the same for every search query.
+
             Parameters:
                 - search_query (str) : Client's search query.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
@@ -392,111 +488,107 @@ class Utilities:
                 -
         """
 
-        # Runs MP-SPDZ to obliviously encrypt the client's search query.
-        player_id = 0
-        query_digest = shake_128(search_query.encode('ASCII')).digest(number_of_bytes()).hex()
-        self.write_mp_spdz_inputs(player_id, [[query_digest]])
-        self.run_mp_spdz(player_id, aes_128_ecb_mpc_script_path().stem, host_address)
-        self.encrypted_query_key1 = self.get_mp_spdz_output()
+        # Pads the digests of the terms with digests of zeros to fill every job.
+        query_digests = [shake_128(term.encode('ASCII')).digest(number_of_bytes())
+                         for term in self.get_search_query_terms(search_query)]
+        number_of_terms = len(query_digests)
+        query_digests.extend([bytes(number_of_bytes())] * (number_of_query_jobs() * query_digests_per_job() -
+                                                           number_of_terms))
 
-        self.run_mp_spdz(player_id, aes_128_ecb_mpc_script_path().stem, host_address)
-        self.encrypted_query_key2 = self.get_mp_spdz_output()
+        # Runs MP-SPDZ to obliviously encrypt the client's search query, each job returning the encryptions under the
+        # first key followed by those under the second key.
+        player_id = 0
+        jobs = [b''.join(query_digests[i: i + query_digests_per_job()])
+                for i in range(0, len(query_digests), query_digests_per_job())]
+        self.encrypted_query_keys = []
+        for output in self.get_mpc_workers().map(player_id, aes_128_ecb_mpc_script_path().stem, host_address, jobs):
+            ciphertexts = [output[i: i + number_of_bytes()].hex() for i in range(0, len(output), number_of_bytes())]
+            self.encrypted_query_keys.extend(zip(ciphertexts[:query_digests_per_job()],
+                                                 ciphertexts[query_digests_per_job():]))
+        self.encrypted_query_keys = self.encrypted_query_keys[:number_of_terms]
 
         return
 
     @staticmethod
-    def write_mp_spdz_inputs(player_id: int, encryption_key_streams: list[list[str]], swap: int = None,
-                             decryption_key_streams: list[list[str]] = None) -> None:
+    def get_mp_spdz_inputs(encryption_key_streams: list[list[str]], swap: int,
+                           decryption_key_streams: list[list[str]] = None) -> bytes:
         """
-            Obliviously encrypts the client's search query with the server's inverted index matrix encryption key.
+            Encodes the swap indicator and key streams as inputs to be used with MPC.
 
             Parameters:
-                - player_id (int) : The player ID the key streams will be written to.
                 - encryption_key_streams (list[list[str]]) : The encryption key streams.
                 - swap (bool) : Indicator for whether the records should be swapped or not to be sorted.
                 - decryption_key_streams (list[list[str]]) : The decryption key streams.
 
             Returns:
                 :raises
-                -
+                - inputs (bytes) : The client's inputs as words.
         """
 
-        # Writes the swap indicator, decryption key streams,and encryption key streams as the client's MP-SPDZ input.
-        with open(mp_spdz_input_path().parent / f'{mp_spdz_input_path()}-P{player_id}-0', 'w') as f:
-            if swap is not None:
-                f.write(f'{swap} \n')
-            if decryption_key_streams:
-                for i in range(len(decryption_key_streams)):
-                    for block in range(len(decryption_key_streams[i])):
-                        f.write(f'{int(decryption_key_streams[i][block], encoding_base())} ')
-                    f.write('\n')
-            for i in range(len(encryption_key_streams)):
-                for block in range(len(encryption_key_streams[i])):
-                    f.write(f'{int(encryption_key_streams[i][block], encoding_base())} ')
-                f.write('\n')
-            f.close()
+        # Encodes the swap indicator, decryption key streams, and encryption key streams as the client's input, every
+        # key stream converted at once.
+        key_streams = (decryption_key_streams or []) + encryption_key_streams
 
-        return
+        return encode_words([swap]) + b''.join(bytes.fromhex(''.join(key_stream)) for key_stream in key_streams)
 
-    @staticmethod
-    def run_mp_spdz(player_id: int, mpc_script_name: str, host_address: str) -> None:
+    def run_mp_spdz(self, player_id: int, mpc_script_name: str, host_address: str, inputs: bytes) -> bytes:
         """
-            Runs the client party of the MP-SPDZ execution.
+            Runs a job on the client's worker for the client party of the MP-SPDZ execution, on the port base the
+            server assigned to the session.
 
             Parameters:
-                - player_id (int) : The player ID the records will be written to.
-                - mpc_script_name (str) : Name of the .mpo script to be used.
+                - player_id (int) : The player ID of the client.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - inputs (bytes) : The client's inputs to the job as words.
 
             Returns:
-                :raises
-                -
+                :raises ChildProcessError
+                - output (bytes) : The output of the job as words, empty unless the client is party 0.
         """
 
-        # Temporarily sets a new working directory
-        chdir(mp_spdz_directory())
+        return self.get_mpc_workers().run(player_id, mpc_script_name, host_address, inputs)
 
-        # Runs the client party.
-        client_mp_spdz_process = Popen([f'{mp_spdz_directory() / mp_spdz_protocol()}',
-                                        f'{mpc_script_name}',
-                                        '-p', f'{player_id}',
-                                        '-h', f'{host_address}',
-                                        '-IF', f'{mp_spdz_input_path()}',
-                                        '-OF', f'{mp_spdz_output_path()}'],
-                                       stdout=PIPE, stderr=PIPE
-                                       )
+    def warm_query_workers(self, host_address: str) -> None:
+        """
+            Starts the client's workers of the search query program in the background once the session is ready for
+            searches, so a search query only waits for the online part of its job. The workers then keep running
+            between the searches. The server warms its workers at the same point.
 
-        # Blocks until the process is finished and captures the standard out and standard error of the processes.
-        client_output, client_error = client_mp_spdz_process.communicate()
+            Parameters:
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
 
-        # Terminates the processes.
-        client_mp_spdz_process.kill()
+            Returns:
+                :raises
+                -
+        """
 
-        # Changes back to the original working directory.
-        chdir(working_directory())
+        player_id = 0
+        if self.is_semantic_search:
+            mpc_script_name = semantic_search_mpc_script_path().stem
+        else:
+            mpc_script_name = aes_128_ecb_mpc_script_path().stem
+        self.get_mpc_workers().warm(player_id, mpc_script_name, host_address)
 
         return
 
-    @staticmethod
-    def get_mp_spdz_output() -> str:
+    def get_mpc_workers(self) -> WorkerPool:
         """
-            Takes the output of the MP-SPDZ execution.
+            Gets the client's MPC workers of the configured backend, which are created on first use once the server has
+            assigned the port base.
 
             Parameters:
                 -
 
             Returns:
                 :raises
-                - encrypted_query_key1 (str) : Encrypted search query under the server's encryption key.
+                - mpc_workers (WorkerPool) : The client's MPC workers.
         """
 
-        # Finds the hexadecimal encrypted search query in the client's output.
-        with open(mp_spdz_output_path().parent / f'{mp_spdz_output_path()}-P0-0', 'r') as f:
-            hexadecimals_pattern = r'0x([a-fA-F0-9]+)'
-            encrypted_query = search(hexadecimals_pattern, f.read()).group()
-            encrypted_query = f'{int(encrypted_query, 16):0{32}x}'
+        if self.mpc_workers is None:
+            self.mpc_workers = get_mpc_workers(self.mp_spdz_port_base)
 
-        return encrypted_query
+        return self.mpc_workers
 
     def get_indices(self) -> set[str]:
         """
@@ -524,24 +616,26 @@ class Utilities:
             # Gets the paths for all the parts of the encrypted inverted index matrix.
             encrypted_inverted_index_matrix_part_paths = [path for path in
                                                           encrypted_inverted_index_matrix_directory().glob('*')
-                                                          if path.suffix == '.json']
+                                                          if path.suffix == '.bin']
 
-            # Searches each part of the encrypted inverted index matrix.
+            # Searches each part of the encrypted inverted index matrix for every term of the search query.
+            encrypted_query_keys = [(bytes.fromhex(encrypted_query_key1), bytes.fromhex(encrypted_query_key2))
+                                    for encrypted_query_key1, encrypted_query_key2 in self.encrypted_query_keys]
             for encrypted_inverted_index_matrix_part_path in encrypted_inverted_index_matrix_part_paths:
-                with encrypted_inverted_index_matrix_part_path.open('r') as f:
-                    encrypted_inverted_index_matrix_part = load(f)
-                    f.close()
+                encrypted_inverted_index_matrix_part = read_encrypted_inverted_index_matrix_part(
+                    encrypted_inverted_index_matrix_part_path)
 
                 # Updates the results from the search of that part.
-                if self.encrypted_query_key1 in encrypted_inverted_index_matrix_part:
-                    encrypted_indices = encrypted_inverted_index_matrix_part[self.encrypted_query_key1]
+                for encrypted_query_key1, encrypted_query_key2 in encrypted_query_keys:
+                    if encrypted_query_key1 in encrypted_inverted_index_matrix_part:
+                        encrypted_indices = encrypted_inverted_index_matrix_part[encrypted_query_key1]
 
-                    indices = []
-                    for ciphertext in encrypted_indices:
-                        index = self.aes_128_ecb(bytes.fromhex(self.encrypted_query_key2), bytes.fromhex(ciphertext))
-                        indices.append(index)
+                        indices = []
+                        for ciphertext in encrypted_indices:
+                            index = self.aes_128_ecb(encrypted_query_key2, ciphertext)
+                            indices.append(index)
 
-                    self.indices_to_request.update(indices)
+                        self.indices_to_request.update(indices)
 
             # Filters dummy indices.
             self.indices_to_request = set(filter(lambda x: int(x) >= 0, self.indices_to_request))
@@ -617,30 +711,28 @@ class Utilities:
         """
 
         # Inspects the encrypted inverted index matrix to find number of requests to be made so that all search query 
-        # results look the same to the server.
+        # results look the same to the server. A search query matches the records of up to the maximum number of terms,
+        # which are at most the records of the database. No search requests more than the maximum number of requests
+        # per search, which the dummy items are sized for.
         if not self.requests_to_make and not self.is_semantic_search:
             largest_set_of_indices = 0
             # Gets the paths for all the parts of the encrypted inverted index matrix.
             encrypted_inverted_index_matrix_part_paths = [path for path in
                                                           encrypted_inverted_index_matrix_directory().glob('*')
-                                                          if path.suffix == '.json']
+                                                          if path.suffix == '.bin']
 
             # Finds the largest set of indices in each part and keeps the largest.
             for encrypted_inverted_index_matrix_part_path in encrypted_inverted_index_matrix_part_paths:
-                with encrypted_inverted_index_matrix_part_path.open('r') as f:
-                    encrypted_inverted_index_matrix_part = load(f)
-                    f.close()
-
-                parts_largest_set_of_indices = max([len(indices)
-                                                    for indices in encrypted_inverted_index_matrix_part.values()]
-                                                   )
+                number_of_attributes, parts_largest_set_of_indices = read_encrypted_inverted_index_matrix_part_header(
+                    encrypted_inverted_index_matrix_part_path)
 
                 if parts_largest_set_of_indices > largest_set_of_indices:
                     largest_set_of_indices = parts_largest_set_of_indices
 
-            self.requests_to_make = largest_set_of_indices
+            self.requests_to_make = min(maximum_number_of_search_query_terms() * largest_set_of_indices,
+                                        number_of_records(), maximum_number_of_requests_per_search())
         elif not self.requests_to_make and self.is_semantic_search:
-            self.requests_to_make = request_threshold()
+            self.requests_to_make = min(request_threshold(), maximum_number_of_requests_per_search())
 
         return self.requests_to_make
 
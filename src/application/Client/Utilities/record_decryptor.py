@@ -13,14 +13,16 @@ from application.getters import (get_max_file_length as
                                  max_file_length)
 from application.getters import (get_encoding_base as
                                  encoding_base)
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
 
 
-def decrypt_record(ciphertexts: list[str], key_streams: list[str]) -> list[str]:
+def decrypt_record(ciphertexts: bytes, key_streams: list[str]) -> list[str]:
     """
         Decrypts a record.
 
         Parameters:
-            - ciphertexts (list[str]) : The encrypted record.
+            - ciphertexts (bytes) : The encrypted record as raw blocks.
             - key_streams (list[str]) : The decryption key streams.
 
         Returns:
@@ -31,7 +33,7 @@ def decrypt_record(ciphertexts: list[str], key_streams: list[str]) -> list[str]:
     # Decrypts the record.
     decrypted_record = []
     for i in range(number_of_blocks()):
-        ciphertext = int(ciphertexts[i], 16)
+        ciphertext = int.from_bytes(ciphertexts[i * number_of_bytes(): (i + 1) * number_of_bytes()], 'big')
         key_stream = int(key_streams[i], 16)
 
         plaintext = f'{(ciphertext ^ key_stream):0{32}x}'
@@ -87,12 +89,12 @@ def write_record(record: dict) -> None:
     return
 
 
-def run(encrypted_record: list[str], key_stream: list[str]) -> None:
+def run(encrypted_record: bytes, key_stream: list[str]) -> None:
     """
         Writes the record.
 
         Parameters:
-            - encrypted_record (list[str]) : The encrypted record.
+            - encrypted_record (bytes) : The encrypted record as raw blocks.
             - key_streams (list[str]) : The corresponding decryption key streams.
 
         Returns:
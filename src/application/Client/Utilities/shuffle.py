@@ -0,0 +1,75 @@
+""" Obliviously shuffles the server's records with the configured network of compare-exchanges. """
+
+# Imports.
+from numpy import random
+
+# Local getters imports.
+from application.getters import (get_database_size as
+                                 database_size)
+from application.getters import (get_shuffle_network as
+                                 shuffle_network)
+from application.getters import (get_compare_exchanges_per_job as
+                                 compare_exchanges_per_job)
+from application.getters import (get_mp_spdz_workers_per_program as
+                                 mp_spdz_workers_per_program)
+
+# Client imports.
+from application.Client.Utilities.bitonic_sort import get_bitonic_network
+from application.Client.Utilities.waksman_network import get_waksman_network
+
+# MPC imports.
+from application.MPC.scheduler import get_dependencies, run_schedule
+
+
+# The networks moving every record to its place in a permutation, by the name they are configured with.
+SHUFFLE_NETWORKS = {'bitonic': get_bitonic_network,
+                    'waksman': get_waksman_network}
+
+
+def shuffle(client, connection) -> dict[str, int]:
+    """
+        Performs a random oblivious shuffling of the server's records. The network of the configured shuffle_network is
+        split into tasks of compare_exchanges_per_job compare-exchanges, each depending on the earlier tasks that last
+        touched its records, and every task is run by the first free worker once its dependencies are done. The tasks
+        of different partitions thereby overlap across layer boundaries instead of waiting for the slowest task of the
+        layer.
+
+        Parameters:
+            - client (Communicator) : The client.
+            - connection (SSLSocket) : Connection with the server.
+
+        Returns:
+            :raises ValueError
+            -  permutation_indexing (dict[str, int]) : The mapping from the original record indexing to their shuffled
+                                                       location.
+    """
+
+    if shuffle_network() not in SHUFFLE_NETWORKS:
+        raise ValueError(f'Unknown shuffle network: {shuffle_network()}')
+
+    # Creates new indexing of the shuffled records
+    permutation = random.permutation(database_size()).tolist()
+    permutation_indexing = dict(zip([str(i) for i in range(len(permutation))], permutation))
+
+    # Compiles the network into a dependency graph of tasks, the first layer encrypting the records.
+    tasks = [(layer_index == 0, layer[i: i + compare_exchanges_per_job()])
+             for layer_index, layer in enumerate(SHUFFLE_NETWORKS[shuffle_network()](permutation))
+             for i in range(0, len(layer), compare_exchanges_per_job())]
+    dependencies = get_dependencies([[index for _, index_a, index_b in compare_exchanges
+                                      for index in (index_a, index_b)] for _, compare_exchanges in tasks])
+
+    def run_task(task: tuple[bool, list[tuple[bool, int, int]]], worker: int) -> None:
+        is_first_layer, compare_exchanges = task
+        if is_first_layer:
+            client.send_indices_and_encrypt(connection, compare_exchanges, worker)
+        else:
+            client.send_indices_and_reencrypt(connection, compare_exchanges, worker)
+
+    # Runs the tasks on the workers as soon as they are ready, creating the workers before the tasks share them.
+    client.get_mpc_workers()
+    metrics = run_schedule(tasks, dependencies, run_task, mp_spdz_workers_per_program())
+    print(f'[SHUFFLED] {metrics["tasks"]} tasks in {metrics["running_time"]:.2f}s, critical path of '
+          f'{metrics["critical_path_length"]} tasks, {metrics["utilization"]:.0%} worker utilization, '
+          f'{metrics["average_queue_depth"]:.1f} average and {metrics["maximum_queue_depth"]} maximum queue depth.')
+
+    return permutation_indexing
@@ -0,0 +1,135 @@
+""" Permutes the records using a Waksman permutation network, whose switches are set from the permutation. """
+
+
+def merge_layers(layers_a: list[list[tuple[bool, int, int]]],
+                 layers_b: list[list[tuple[bool, int, int]]]) -> list[list[tuple[bool, int, int]]]:
+    """
+        Merges the layers of two networks on disjoint records, so that the layers of the same depth run together.
+
+        Parameters:
+            - layers_a (list[list[tuple[bool, int, int]]]) : The switches of each layer of a network.
+            - layers_b (list[list[tuple[bool, int, int]]]) : The switches of each layer of the other network.
+
+        Returns:
+            :raises
+            - layers (list[list[tuple[bool, int, int]]]) : The switches of each layer of both networks.
+    """
+
+    layers = []
+    for depth in range(max(len(layers_a), len(layers_b))):
+        layers.append((layers_a[depth] if depth < len(layers_a) else []) +
+                      (layers_b[depth] if depth < len(layers_b) else []))
+
+    return layers
+
+
+def get_subnetworks(permutation: list) -> list[int]:
+    """
+        Routes the inputs of a network through its two subnetworks. The inputs of an input switch are routed through
+        different subnetworks, and so are the outputs of an output switch. The last input and the last output of a
+        network of odd size have no switch and are routed through the lower subnetwork, while the last output switch of
+        a network of even size is left straight, as in the Waksman network, so its last output is routed through the
+        lower subnetwork as well.
+
+        Parameters:
+            - permutation (list) : The output of each input of the network.
+
+        Returns:
+            :raises
+            - subnetworks (list[int]) : The subnetwork of each input, 0 for the upper and 1 for the lower subnetwork.
+    """
+
+    size = len(permutation)
+    inverse = [0] * size
+    for index, output in enumerate(permutation):
+        inverse[output] = index
+
+    # Follows the chains of constraints, which alternate between the inputs of an input switch and the inputs routed
+    # to the outputs of an output switch. The chains starting from an input routed through the lower subnetwork are
+    # followed first, and the subnetwork of the remaining chains, which are cycles, can be chosen freely.
+    subnetworks = [None] * size
+    first_index = size - 1 if size % 2 else inverse[size - 1]
+    for index, subnetwork in [(first_index, 1)] + [(index, 0) for index in range(size)]:
+        through_input_switch = index ^ 1 < size
+        while subnetworks[index] is None:
+            subnetworks[index] = subnetwork
+            if through_input_switch:
+                next_index = index ^ 1 if index ^ 1 < size else None
+            else:
+                next_index = inverse[permutation[index] ^ 1] if permutation[index] ^ 1 < size else None
+            if next_index is None:
+                break
+            index, subnetwork, through_input_switch = next_index, 1 - subnetwork, not through_input_switch
+
+    return subnetworks
+
+
+def route(permutation: list, indices: list[int]) -> list[list[tuple[bool, int, int]]]:
+    """
+        Compiles the network permuting a set of records recursively. The input switches split the records between two
+        subnetworks on every other record, which permute half of the records each, and the output switches put the
+        records of the subnetworks in place. The lower subnetwork of a network of odd size also permutes its last
+        record, which has no switches.
+
+        Parameters:
+            - permutation (list) : The output of each input of the network.
+            - indices (list[int]) : The indices of the records the network permutes.
+
+        Returns:
+            :raises
+            - layers (list[list[tuple[bool, int, int]]]) : The switches of each layer, in program order.
+    """
+
+    if len(indices) == 1:
+        return []
+    if len(indices) == 2:
+        return [[(permutation[0] == 1, indices[0], indices[1])]]
+
+    subnetworks = get_subnetworks(permutation)
+
+    # Sets the input switches, and the output of each subnetwork input.
+    input_layer, upper_permutation, lower_permutation = [], [], []
+    for switch in range(len(indices) // 2):
+        swap = subnetworks[2 * switch] == 1
+        input_layer.append((swap, indices[2 * switch], indices[2 * switch + 1]))
+
+        upper_input, lower_input = (2 * switch + 1, 2 * switch) if swap else (2 * switch, 2 * switch + 1)
+        upper_permutation.append(permutation[upper_input] // 2)
+        lower_permutation.append(permutation[lower_input] // 2)
+    if len(indices) % 2:
+        lower_permutation.append(permutation[-1] // 2)
+
+    # Sets the output switches from where the output of the upper subnetwork should end, leaving out the last one of
+    # a network of even size.
+    output_layer = []
+    for switch, output in enumerate(sorted(permutation[index] for index in range(len(indices))
+                                           if subnetworks[index] == 0)):
+        if switch < (len(indices) - 1) // 2:
+            output_layer.append((output == 2 * switch + 1, indices[2 * switch], indices[2 * switch + 1]))
+
+    # The subnetworks permute every other record, the last record of a network of odd size going to the lower one.
+    paired_records = 2 * (len(indices) // 2)
+    upper_indices, lower_indices = indices[0:paired_records:2], indices[1::2] + indices[paired_records:]
+
+    return ([input_layer] +
+            merge_layers(route(upper_permutation, upper_indices), route(lower_permutation, lower_indices)) +
+            [output_layer])
+
+
+def get_waksman_network(permutation: list) -> list[list[tuple[bool, int, int]]]:
+    """
+        Compiles the Waksman network moving every record to its place in the permutation, layer by layer, for any number
+        of records. The network has about n * log(n) switches, where a sorting network has about n * log(n)^2 / 4
+        compare-exchanges, and the first layer holds every record when there is an even number of them. The switches are
+        set while compiling, as the client knows the whole permutation.
+
+        Parameters:
+            - permutation (list) : The order the records will be shuffled.
+
+        Returns:
+            :raises
+            - layers (list[list[tuple[bool, int, int]]]) : The switches of each layer, as compare-exchanges in program
+                                                           order.
+    """
+
+    return route(permutation, list(range(len(permutation))))
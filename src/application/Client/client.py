@@ -2,10 +2,16 @@
 
 # Imports.
 from time import sleep
-from json import dump, loads
-from threading import Thread
-from socket import socket, AF_INET, SOCK_STREAM, SOL_SOCKET, SO_REUSEADDR, timeout, SHUT_WR
-from ssl import SSLContext, PROTOCOL_TLS_CLIENT, PROTOCOL_TLS_SERVER, SSLSocket
+from json import loads
+from collections import deque
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+from random import shuffle
+from typing import Iterator
+from pathlib import Path
+from socket import socket, AF_INET, SOCK_STREAM
+from ssl import SSLContext, SSLSocket, PROTOCOL_TLS_CLIENT
 
 # Local getter imports.
 from application.getters import (get_server_ip as
@@ -22,11 +28,19 @@ from application.getters import (get_client_networking_certificate_path as
                                  client_networking_certificate_path)
 from application.getters import (get_server_networking_certificate_path as
                                  server_networking_certificate_path)
-from application.getters import (get_client_encrypted_inverted_index_matrix_directory as
-                                 encrypted_inverted_index_matrix_directory)
 from application.getters import (get_client_number_of_dummy_items_path as
                                  number_of_dummy_items_path)
-
+from application.getters import (get_client_session_id_path as
+                                 session_id_path)
+from application.getters import (get_client_mpc_metrics_path as
+                                 client_mpc_metrics_path)
+from application.getters import (get_maximum_number_of_search_query_terms as
+                                 maximum_number_of_search_query_terms)
+from application.getters import (get_client_record_connections as
+                                 client_record_connections)
+
+# Networking imports.
+from application.networking import Connection, MessageType, Phase, SessionState, encode_integers, decode_integers
 
 # Client utility imports.
 from application.Client.Utilities.client_utilities import Utilities
@@ -39,46 +53,24 @@ class Communicator(Utilities):
 
     def __init__(self) -> None:
         super().__init__()
-        self.HEADER = 1024
-        self.LISTEN_PORT = client_port()
         self.HOST = client_ip()
-        self.ADDR = (self.HOST, self.LISTEN_PORT)
+        self.ADDR = (self.HOST, client_port())
         self.SERVER_ADDR = (server_ip(), server_port())
-        self.FORMAT = 'utf-8'
-
-        self.ONLINE_MESSAGE = '<ONLINE>'
-        self.SENDING_NUMBER_OF_DUMMY_ITEMS = '<SENDING NUMBER OF DUMMY ITEMS>'
-        self.RECORDS_PREPROCESSING_MESSAGE = '<RECORDS PRE-PROCESSING>'
-        self.ENCRYPT_RECORDS_MESSAGE = '<ENCRYPT RECORDS>'
-        self.REENCRYPT_RECORDS_MESSAGE = '<REENCRYPT RECORDS>'
-        self.RECORDS_PREPROCESSING_FINISHED_MESSAGE = '<RECORDS PRE-PROCESSING FINISHED>'
-        self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MESSAGE = '<SENDING ENCRYPTED INVERTED INDEX MATRIX>'
-        self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED_MESSAGE = \
-            '<SENDING ENCRYPTED INVERTED INDEX MATRIX FINISHED>'
-        self.SEMANTIC_SEARCH_MESSAGE = '<SEMANTIC SEARCH>'
-        self.ENCRYPT_QUERY_MESSAGE = '<ENCRYPT QUERY>'
-        self.REQUEST_ENCRYPTED_RECORD_MESSAGE = '<REQUESTING ENCRYPTED RECORD>'
-        self.DISCONNECT_MESSAGE = '<DISCONNECT>'
-        self.END_FILE_MESSAGE = '<END FILE>'
-        self.SHUTDOWN_MESSAGE = '<SHUTTING DOWN>'
-
-        self.client_context = SSLContext(PROTOCOL_TLS_SERVER)
-        self.client_context.load_cert_chain(certfile=client_networking_certificate_path(),
-                                            keyfile=client_networking_key_path())
+
+        # The client authenticates itself to the server with the client certificate.
         self.server_context = SSLContext(PROTOCOL_TLS_CLIENT)
         self.server_context.load_verify_locations(server_networking_certificate_path())
-        self.listen_host = self.client_context.wrap_socket(socket(AF_INET, SOCK_STREAM), server_side=True)
-        self.listen_host.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
-        self.listen_host.settimeout(0.1)
+        self.server_context.load_cert_chain(certfile=client_networking_certificate_path(),
+                                            keyfile=client_networking_key_path())
+        self.connection = None
+        self.session_id = None
+        self.state = SessionState()
 
-        self.close = False
-        self.run_thread = Thread(target=self.run)
-        self.run_thread.start()
+        # Records are fetched concurrently over a pool of further connections attached to the session.
+        self.record_connections = Queue(maxsize=client_record_connections())
+        self.record_fetch_executor = ThreadPoolExecutor(max_workers=client_record_connections())
 
-        self.server_online = False
-        self.dummy_items_sent = False
-        self.encrypted_inverted_index_matrix_part = 0
-        self.encrypted_inverted_index_matrix_received = False
+        self.pending_encrypted_inverted_index_matrix_parts = deque()
 
         return
 
@@ -110,7 +102,8 @@ class Communicator(Utilities):
 
     def wait_for_server(self) -> None:
         """
-            Waiting for the server to connect, then sends if it should resume from previous pre-processing.
+            Waiting for the server to come online, then opens the session and sends if it should resume from previous
+            pre-processing.
 
             Parameters:
                 -
@@ -119,19 +112,18 @@ class Communicator(Utilities):
                 :raises
                 -
         """
-        
-        # Tries to send online message to the server.
-        try:
-            self.send_online_message_and_user_response()
-        except ConnectionRefusedError:
-            print(f'[CONNECTING] Waiting for the server.')
-        
-        # Waits until the server is online.
-        while not self.server_online:
-            sleep(0.1)
+
+        # Tries to connect to the server until it is online.
+        while not self.connection:
+            try:
+                self.connect()
+            except ConnectionRefusedError:
+                print(f'[CONNECTING] Waiting for the server.')
+                sleep(1)
 
         # Sends online message and user response on whether to resume from previous pre-processing or not.
         self.send_online_message_and_user_response()
+        self.attach_record_connections()
 
         self.resume()
 
@@ -139,10 +131,10 @@ class Communicator(Utilities):
 
         return
 
-    def send_online_message_and_user_response(self) -> None:
+    def start_serving(self) -> None:
         """
-            Sends online message to the server together with the resume from previous preprocessing response from
-            the user.
+            Marks the session as ready for searches and record requests, and warms the workers of the search query
+            program.
 
             Parameters:
                 -
@@ -152,52 +144,120 @@ class Communicator(Utilities):
                 -
         """
 
-        # Sends the online message to the server.
+        self.state.advance(Phase.SERVING)
+        address, port = self.ADDR
+        self.warm_query_workers(address)
+
+        return
+
+    def open_socket(self) -> SSLSocket:
+        """
+            Connects and authenticates to the server.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ConnectionRefusedError
+                - connection (SSLSocket) : The authenticated connection.
+        """
+
         connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
                                                      server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.ONLINE_MESSAGE))
-        connection.sendall(self.add_padding(str(self.is_semantic_search)))
-        connection.sendall(self.add_padding(str(self.resume_from_previous_preprocessing)))
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        try:
+            connection.connect(self.SERVER_ADDR)
+        except ConnectionRefusedError:
+            connection.close()
+            raise
+
+        return connection
+
+    def connect(self) -> None:
+        """
+            Opens the persistent session with the server.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ConnectionRefusedError
+                -
+        """
+
+        # Parts of the encrypted inverted index matrix are received straight to disk.
+        self.connection = Connection(self.open_socket(), self.receive, {
+            MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX: self.get_next_encrypted_inverted_index_matrix_part_path
+        })
 
         return
 
-    def add_padding(self, message: str) -> bytes:
+    def attach_record_connections(self) -> None:
         """
-            Encodes and adds the appropriate padding to a message to match the header size.
+            Opens the pool of connections that records are fetched over, attaching each one to the session.
 
             Parameters:
-                - message (str) : The message to be padded.
+                -
 
             Returns:
-                message (bytes) : The padded message.
+                :raises ConnectionError
+                -
         """
 
-        # Encodes and pads the message with null bytes.
-        message = message.encode(self.FORMAT)
-        message += b'\x00' * (self.HEADER - len(message))
-        
-        return message
+        for _ in range(client_record_connections()):
+            record_connection = Connection(self.open_socket(), self.receive)
+            record_connection.request(MessageType.ATTACH, self.session_id.encode())
+            self.record_connections.put(record_connection)
+
+        return
 
-    def wait(self, connection: SSLSocket) -> None:
+    def send_online_message_and_user_response(self) -> None:
         """
-            Waits until the disconnect message is received from the server.
+            Sends online message to the server together with the resume from previous preprocessing response from
+            the user.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
+                -
 
             Returns:
                 :raises
                 -
         """
 
-        # Waits until the disconnect message is received from the server.
-        while (connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))) != self.DISCONNECT_MESSAGE:
-            sleep(0.01)
-            
-        return 
+        # Sends the online message to the server and receives the port base of the session's MP-SPDZ executions.
+        self.load_session_id()
+        payload = encode_integers(self.is_semantic_search, self.resume_from_previous_preprocessing)
+        response = self.connection.request(MessageType.ONLINE, payload + self.session_id.encode())
+        self.mp_spdz_port_base, = decode_integers(response)
+        self.state.advance(Phase.ONLINE)
+
+        return
+
+    def load_session_id(self) -> None:
+        """
+            Loads the ID of the session from previous pre-processing when resuming, otherwise starts a new session.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Reuses the session of the previous pre-processing, so the server can find the session's files.
+        if self.resume_from_previous_preprocessing and session_id_path().exists():
+            with session_id_path().open('r') as f:
+                self.session_id = f.read().strip()
+                f.close()
+            return
+
+        # Starts a new session.
+        self.session_id = uuid4().hex
+        with session_id_path().open('w') as f:
+            f.write(self.session_id)
+            f.close()
+
+        return
 
     def waiting_to_send_number_of_dummy_items(self) -> None:
         """
@@ -212,26 +272,27 @@ class Communicator(Utilities):
         """
 
         # Waits until the requesting dummy items message is received from the server.
-        while not self.dummy_items_sent:
-            sleep(0.1)
+        self.state.wait_for(Phase.DUMMY_COUNT)
             
         return 
 
-    def receive_number_of_dummy_items(self, connection: SSLSocket) -> None:
+    def receive_number_of_dummy_items(self, connection: Connection, tag: int, payload: bytearray) -> None:
         """
             Receives the number of dummy items in the database from the server.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
+                - connection (Connection) : Connection with the server.
+                - tag (int) : Tag of the request.
+                - payload (bytearray) : The number of dummy items.
 
             Returns:
                 :raises
                 -
         """
         
-        # Receives and creates the requested amount of dummy items and sends them to the server.
-        number_of_dummy_items = int(connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0)))
-        connection.sendall(self.add_padding(self.DISCONNECT_MESSAGE))
+        # Receives the requested amount of dummy items.
+        number_of_dummy_items, = decode_integers(payload)
+        connection.respond(tag)
 
         # Writes the number of dummy items to a file.
         with number_of_dummy_items_path().open('w') as f:
@@ -240,7 +301,7 @@ class Communicator(Utilities):
         
         # Updates internal values.
         self.number_of_dummy_items = number_of_dummy_items
-        self.dummy_items_sent = True
+        self.state.advance(Phase.DUMMY_COUNT)
         
         return 
 
@@ -256,39 +317,65 @@ class Communicator(Utilities):
                 -
         """
 
-        # Waits until the sending encrypted inverted index matrix message is received from the server.
-        while not self.encrypted_inverted_index_matrix_received:
-            sleep(0.1)
+        # Waits until the sending encrypted inverted index matrix finished message is received from the server.
+        self.state.wait_for(Phase.INDEX_SENT)
             
         return 
 
-    def receive_encrypted_inverted_index_matrix(self, connection: SSLSocket) -> None:
+    def receive_encrypted_inverted_index_matrix_manifest(self, connection: Connection, tag: int,
+                                                         payload: bytearray) -> None:
         """
-            Receives the encrypted inverted index matrix and stores it.
+            Receives the manifest of the encrypted inverted index matrix and answers with the parts that are missing or
+            corrupt, which the server sends next in that order.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
+                - connection (Connection) : Connection with the server.
+                - tag (int) : Tag of the request.
+                - payload (bytearray) : The size and digest of each part.
 
             Returns:
                 :raises
                 -
         """
 
-        # Receives a part of the encrypted inverted index matrix.
-        encrypted_inverted_index_matrix_part = ''
-        while (message := connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))) != self.END_FILE_MESSAGE:
-            encrypted_inverted_index_matrix_part += message
+        missing_parts = self.get_missing_encrypted_inverted_index_matrix_parts(loads(payload))
+        self.pending_encrypted_inverted_index_matrix_parts.extend(missing_parts)
 
-        # Writes a part of the encrypted inverted index matrix into its own file.
-        with open(encrypted_inverted_index_matrix_directory() /
-                  f'Encrypted_Inverted_Index{self.encrypted_inverted_index_matrix_part}.json', 'w') as f:
-            dump(loads(encrypted_inverted_index_matrix_part), f, indent=4)
-            f.close()
+        connection.respond(tag, encode_integers(*missing_parts))
 
-        connection.sendall(self.add_padding(self.DISCONNECT_MESSAGE))
+        return
 
-        # Updates object variables.
-        self.encrypted_inverted_index_matrix_part += 1
+    def get_next_encrypted_inverted_index_matrix_part_path(self) -> Path:
+        """
+            Gets the path the next part of the encrypted inverted index matrix is received to.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - part_path (Path) : The path of the part.
+        """
+
+        return self.get_encrypted_inverted_index_matrix_part_path(
+            self.pending_encrypted_inverted_index_matrix_parts.popleft())
+
+    def receive_encrypted_inverted_index_matrix(self, connection: Connection, tag: int, part_path: Path) -> None:
+        """
+            Acknowledges a part of the encrypted inverted index matrix, which the connection has already written to
+            disk as it was received.
+
+            Parameters:
+                - connection (Connection) : Connection with the server.
+                - tag (int) : Tag of the request.
+                - part_path (Path) : The path of the received part.
+
+            Returns:
+                :raises
+                -
+        """
+
+        connection.respond(tag)
 
         return
 
@@ -305,80 +392,72 @@ class Communicator(Utilities):
         """
 
         # Sends pre-processing message to the server.
-        connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.RECORDS_PREPROCESSING_MESSAGE))
-        print(f'[SENT] {self.RECORDS_PREPROCESSING_MESSAGE} to server.')
+        print(f'[SENT] {MessageType.RECORDS_PREPROCESSING} to server.')
+        self.connection.request(MessageType.RECORDS_PREPROCESSING)
 
         # Performs the client side of the records pre-processing.
-        self.records_preprocessing(self, connection)
+        self.records_preprocessing(self, self.connection)
 
         # Sends records preprocessing finished message to the server.
-        connection.sendall(self.add_padding(self.RECORDS_PREPROCESSING_FINISHED_MESSAGE))
-        print(f'[SENT] {self.RECORDS_PREPROCESSING_FINISHED_MESSAGE} to server.')
-
-        # Waits until the server disconnects.
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        self.connection.request(MessageType.RECORDS_PREPROCESSING_FINISHED)
+        print(f'[SENT] {MessageType.RECORDS_PREPROCESSING_FINISHED} to server.')
+        self.state.advance(Phase.PREPROCESSING)
 
         return
 
-    def send_indices_and_encrypt(self, connection: SSLSocket, swap: bool, index_a: int, index_b: int) -> None:
+    def send_indices_and_encrypt(self, connection: Connection, compare_exchanges: list[tuple[bool, int, int]],
+                                 worker: int) -> None:
         """
-            Obliviously sorts and encrypts two of the server's records with the client's key.
+            Obliviously sorts and encrypts pairs of the server's records with the client's keys, in a single job on a
+            worker of both parties. Returns once the server has written the records.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
-                - swap (bool) : Indicator to whether the records should be swapped or not.
-                - index_a (int) : Index to a server side pointer to a record.
-                - index_b (int) : Index to a server side pointer to a record.
-                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
-                - connection (SSLSocket) : Connection with the server.
+                - connection (Connection) : Connection with the server.
+                - compare_exchanges (list[tuple[bool, int, int]]) : The swap indicator and the indices of the server
+                                                                    side pointers to the two records of each pair.
+                - worker (int) : The number of the worker to run the job on.
 
             Returns:
-                :raises
+                :raises ConnectionError
                 -
         """
 
-        # Sends which two records should be considered.
-        connection.sendall(self.add_padding(self.ENCRYPT_RECORDS_MESSAGE))
-        connection.sendall(self.add_padding(str(index_a)))
-        connection.sendall(self.add_padding(str(index_b)))
-        self.wait(connection)
-
-        # Obliviously encrypts and sorts the two of the server's records with the client's key.
+        # Sends which worker should run the job and which pairs of records should be considered. The server answers
+        # once its party is ready, and again once the records are written.
         host_address = self.SERVER_ADDR[0]
-        self.encrypt_records(swap, index_a, index_b, host_address)
+        for _ in connection.request_stream(MessageType.ENCRYPT_RECORDS,
+                                           encode_integers(worker, *[index for _, index_a, index_b in compare_exchanges
+                                                                     for index in (index_a, index_b)])):
+            # Obliviously encrypts and sorts the pairs of the server's records with the client's keys.
+            self.encrypt_records(compare_exchanges, host_address, worker)
 
         return
 
-    def send_indices_and_reencrypt(self, connection: SSLSocket, swap: bool, index_a: int, index_b: int) -> None:
+    def send_indices_and_reencrypt(self, connection: Connection, compare_exchanges: list[tuple[bool, int, int]],
+                                   worker: int) -> None:
         """
-            Obliviously sorts and re-encrypts two of the server's records with the client's key.
+            Obliviously sorts and re-encrypts pairs of the server's records with the client's keys, in a single job on a
+            worker of both parties. Returns once the server has written the records.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
-                - swap (bool) : Indicator to whether the records should be swapped or not.
-                - index_a (int) : Index to a server side pointer to a record.
-                - index_b (int) : Index to a server side pointer to a record.
-                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
-                - connection (SSLSocket) : Connection with the server.
+                - connection (Connection) : Connection with the server.
+                - compare_exchanges (list[tuple[bool, int, int]]) : The swap indicator and the indices of the server
+                                                                    side pointers to the two records of each pair.
+                - worker (int) : The number of the worker to run the job on.
 
             Returns:
-                :raises
+                :raises ConnectionError
                 -
         """
 
-        # Sends which two records should be considered.
-        connection.sendall(self.add_padding(self.REENCRYPT_RECORDS_MESSAGE))
-        connection.sendall(self.add_padding(str(index_a)))
-        connection.sendall(self.add_padding(str(index_b)))
-        self.wait(connection)
-
-        # Obliviously re-encrypts and sorts the two of the server's records with the client's key.
+        # Sends which worker should run the job and which pairs of records should be considered. The server answers
+        # once its party is ready, and again once the records are written.
         host_address = self.SERVER_ADDR[0]
-        self.reencrypt_records(swap, index_a, index_b, host_address)
+        for _ in connection.request_stream(MessageType.REENCRYPT_RECORDS,
+                                           encode_integers(worker, *[index for _, index_a, index_b in compare_exchanges
+                                                                     for index in (index_a, index_b)])):
+            # Obliviously re-encrypts and sorts the pairs of the server's records with the client's keys.
+            self.reencrypt_records(compare_exchanges, host_address, worker)
 
         return
 
@@ -400,16 +479,8 @@ class Communicator(Utilities):
             raise Exception('Insufficient amount of dummy items. Please redo pre-processing of the database.')
 
         # Sends search query to the server.
-        connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.SEMANTIC_SEARCH_MESSAGE))
-        print(f'[SENT] {self.SEMANTIC_SEARCH_MESSAGE} to server.')
-
-        # Waits until the server disconnects.
-        self.wait(connection)
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        print(f'[SENT] {MessageType.SEMANTIC_SEARCH} to server.')
+        self.connection.request(MessageType.SEMANTIC_SEARCH)
 
         # Gets the embedding of the search query and sets it locally.
         self.get_search_query_embedding(search_query)
@@ -422,32 +493,29 @@ class Communicator(Utilities):
 
     def send_encrypt_query_message(self, search_query: str) -> None:
         """
-            Obliviously sorts and re-encrypts two of the server's records with the client's key.
+            Obliviously encrypts the terms of the search query with the server's keys.
 
             Parameters:
-                - search_query (str) : Search query from the user.
+                - search_query (str) : Search query from the user, whose terms are separated by
+                                       search_query_term_separator.
 
             Returns:
-                :raises
+                :raises ValueError
                 -
         """
 
+        # Validates the number of terms, as every search query is padded to the maximum number of terms.
+        if len(self.get_search_query_terms(search_query)) > maximum_number_of_search_query_terms():
+            raise ValueError(f'A search query has at most {maximum_number_of_search_query_terms()} terms.')
+
         # Validates the there are enough unrequested dummy items left.
         if self.get_number_of_requests_to_make() > len(self.dummy_item_indices):
             self.kill()
             raise Exception('Insufficient amount of dummy items. Please redo pre-processing of the database.')
         
-        # Sends search query to the server.
-        connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.ENCRYPT_QUERY_MESSAGE))
-        print(f'[SENT] {self.ENCRYPT_QUERY_MESSAGE} to server.')
-        
-        # Waits until the server disconnects.
-        self.wait(connection)
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        # Sends search query to the server, which encrypts the same number of terms for every search query.
+        print(f'[SENT] {MessageType.ENCRYPT_QUERY} to server.')
+        self.connection.request(MessageType.ENCRYPT_QUERY)
 
         # Obliviously encrypts the search query with the server's key.
         address, port = self.ADDR
@@ -457,7 +525,8 @@ class Communicator(Utilities):
 
     def request_records(self) -> None:
         """
-            Obliviously sorts and re-encrypts two of the server's records with the client's key.
+            Requests the records matching the search, together with dummy items, from the server in one batch, and
+            decrypts the matching records while the rest of the batch is still being received.
 
             Parameters:
                 -
@@ -466,72 +535,90 @@ class Communicator(Utilities):
                 :raises
                 -
         """
-        
-        # Gets the result from the search.
+
+        # Gets the result from the search, of which at most the number of requests to make are retrieved at once.
         indices = self.get_indices()
-        
-        # Requests each record for each pointer of the indices.
-        for index in indices:
-            
-            # Gets the server side index of the pointer to a record.
-            database_index = self.permuted_indices[index]
+        if len(indices) > self.get_number_of_requests_to_make():
+            print(f'[PARTIAL RESULT] {self.get_number_of_requests_to_make()} of {len(indices)} records are retrieved, '
+                  f'search again for the rest.')
+            indices = sorted(indices, key=int)[:self.get_number_of_requests_to_make()]
 
-            # Gets the corresponding encryption key streams.
-            encryption_keys = self.get_stored_key_stream(database_index)
-            
-            # Requests the encrypted record from the server.
-            encrypted_records = self.request_encrypted_record(database_index)
-            
-            # Decrypts and stores the record.
-            decrypt_and_store_files(encrypted_records, encryption_keys)
-            
-            # Updates the object variable requested pointers.
-            self.requested_indices.add(str(index))
-            
-        # Requests dummy items.
+        # Pairs the server side index of each pointer with the index of the result it belongs to.
+        requests = [(self.permuted_indices[index], index) for index in indices]
+
+        # Pads the batch with dummy items, which are not decrypted.
         for _ in range(self.get_number_of_requests_to_make() - len(indices)):
-            
-            # Gets a random dummy item on the server.
             random_dummy_item_index = self.get_random_dummy_item_index()
-            dummy_item_database_index = self.permuted_indices[random_dummy_item_index]
+            requests.append((self.permuted_indices[random_dummy_item_index], None))
+            self.requested_indices.add(str(random_dummy_item_index))
 
-            # Requests the dummy item from the server.
-            self.request_encrypted_record(dummy_item_database_index)
+        # Hides which of the requests are for the matching records.
+        shuffle(requests)
+
+        # Splits the batch over the pool of connections and fetches the slices concurrently.
+        number_of_slices = min(client_record_connections(), len(requests))
+        fetches = [self.record_fetch_executor.submit(self.fetch_and_store_records, requests[i::number_of_slices])
+                   for i in range(number_of_slices)]
+
+        # Updates the object variable requested pointers.
+        for fetch in fetches:
+            self.requested_indices.update(str(index) for index in fetch.result())
 
-            # Updates the object variable requested pointers.
-            self.requested_indices.add(str(random_dummy_item_index))
-            
         return
 
-    def request_encrypted_record(self, index: int) -> list[str]:
+    def fetch_and_store_records(self, requests: list[tuple[int, int | None]]) -> list[int]:
         """
-            Requests an encrypted record from the server.
+            Fetches a slice of the batch over a connection from the pool, decrypting each matching record as it
+            arrives.
 
             Parameters:
-                - index (int) : Index to the pointer of the encrypted record on the server.
+                - requests (list[tuple[int, int | None]]) : The server side index of each record, paired with the index
+                                                           of the result it belongs to, or None for dummy items.
 
             Returns:
-                :raises
-                - encrypted_record (list[str]) : Encrypted record from the server.
+                :raises ConnectionError
+                - stored_indices (list[int]) : The indices of the results that were decrypted and stored.
         """
 
-        # Sends the pointer to the server.
-        connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.REQUEST_ENCRYPTED_RECORD_MESSAGE))
-        print(f'[SENT] {self.REQUEST_ENCRYPTED_RECORD_MESSAGE} to server.')
-        connection.sendall(self.add_padding(str(index)))
+        stored_indices = []
+        record_connection = self.record_connections.get()
+        try:
+            encrypted_records = self.request_encrypted_records(record_connection,
+                                                               [database_index for database_index, index in requests])
+            for (database_index, index), encrypted_record in zip(requests, encrypted_records):
+                if index is None:
+                    continue
 
-        # Receives the encrypted record.
-        encrypted_record = ''
-        while (message := connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))) != self.END_FILE_MESSAGE:
-            encrypted_record += message
+                # Decrypts and stores the record with the corresponding encryption key streams.
+                decrypt_and_store_files(encrypted_record, self.get_stored_key_stream(database_index))
+                stored_indices.append(index)
+        finally:
+            self.record_connections.put(record_connection)
 
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        return stored_indices
 
-        return encrypted_record.split(' ')
+    @staticmethod
+    def request_encrypted_records(connection: Connection, indices: list[int]) -> Iterator[bytearray]:
+        """
+            Requests a batch of encrypted records from the server.
+
+            Parameters:
+                - connection (Connection) : Connection with the server.
+                - indices (list[int]) : Indices to the pointers of the encrypted records on the server.
+
+            Returns:
+                :raises ConnectionError
+                - encrypted_records (Iterator[bytearray]) : Encrypted records from the server as raw blocks, in the
+                                                           requested order, as they are received.
+        """
+
+        # Sends the pointers to the server and receives the encrypted records.
+        print(f'[SENT] {MessageType.REQUESTING_ENCRYPTED_RECORDS} to server.')
+        for encrypted_record in connection.request_stream(MessageType.REQUESTING_ENCRYPTED_RECORDS,
+                                                          encode_integers(*indices)):
+            yield encrypted_record
+
+        return
 
     def send_shutdown_message(self) -> None:
         """
@@ -546,71 +633,42 @@ class Communicator(Utilities):
         """
         
         # Sends the shutdown message.
-        connection = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=server_networking_certificate_path().stem)
-        connection.connect(self.SERVER_ADDR)
-        connection.sendall(self.add_padding(self.SHUTDOWN_MESSAGE))
-        print(f'[SENT] {self.SHUTDOWN_MESSAGE} from server.')
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        self.connection.request(MessageType.SHUTTING_DOWN)
+        print(f'[SENT] {MessageType.SHUTTING_DOWN} to server.')
         
         return 
 
-    def receive(self, connection: SSLSocket) -> None:
+    def receive(self, connection: Connection, tag: int, message_type: MessageType, payload: bytearray) -> None:
         """
             Handling of received messages from the server.
             
             Parameters:
-                - connection (SSLSocket) : Connection with the server.
+                - connection (Connection) : Connection with the server.
+                - tag (int) : Tag of the request.
+                - message_type (MessageType) : The type of the request.
+                - payload (bytearray) : The payload of the request.
 
             Returns:
                 :raises
                 -
         """
 
-        # Receives a message from the server and handles it accordingly.
-        message = connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))
-        if message == self.ONLINE_MESSAGE:
-            print(f'[RECEIVED] {message} from server.')
-            self.server_online = True
-        elif message == self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MESSAGE:
-            self.receive_encrypted_inverted_index_matrix(connection)
-        elif message == self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED_MESSAGE:
-            print(f'[RECEIVED] {message} from server.')
-            self.encrypted_inverted_index_matrix_received = True
-        elif message == self.SENDING_NUMBER_OF_DUMMY_ITEMS:
-            print(f'[RECEIVED] {message} from server.')
-            self.receive_number_of_dummy_items(connection)
+        # Handles the message from the server accordingly.
+        if message_type == MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX:
+            self.receive_encrypted_inverted_index_matrix(connection, tag, payload)
+        elif message_type == MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MANIFEST:
+            print(f'[RECEIVED] {message_type} from server.')
+            self.receive_encrypted_inverted_index_matrix_manifest(connection, tag, payload)
+        elif message_type == MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED:
+            print(f'[RECEIVED] {message_type} from server.')
+            connection.respond(tag)
+            self.state.advance(Phase.INDEX_SENT)
+        elif message_type == MessageType.SENDING_NUMBER_OF_DUMMY_ITEMS:
+            print(f'[RECEIVED] {message_type} from server.')
+            self.receive_number_of_dummy_items(connection, tag, payload)
             
         return 
 
-    def run(self) -> None:
-        """
-            Starts the listening and handles incoming connections.
-
-            Parameters:
-                -
-
-            Returns:
-                :raises
-                - 
-        """
-
-        # Binds the client to a socket and listens for connections.
-        self.listen_host.bind(self.ADDR)
-        self.listen_host.listen()
-        print(f'[LISTENING] on (\'{self.HOST}\', {self.LISTEN_PORT})')
-        while True:
-            if self.close:
-                self.listen_host.close()
-                return
-
-            try:
-                connection, address = self.listen_host.accept()
-                self.receive(connection)
-            except timeout:
-                continue
-
     def kill(self) -> None:
         """
             Closes the client.
@@ -623,11 +681,20 @@ class Communicator(Utilities):
                 -
         """
 
-        # Closes all threads and processes associated with the client.
+        # Closes the session with the server, unless the server has already closed it when shutting down.
         self.write_requested_indices()
-        self.send_shutdown_message()
-        self.close = True
-        self.run_thread.join()
+        try:
+            self.send_shutdown_message()
+        except OSError:
+            print(f'[DISCONNECTED] The server already closed the session.')
+        if self.mpc_workers is not None:
+            self.mpc_workers.close()
+            self.mpc_workers.metrics.write(client_mpc_metrics_path())
+        self.record_fetch_executor.shutdown()
+        while not self.record_connections.empty():
+            self.record_connections.get().close()
+        self.connection.close()
+        self.state.advance(Phase.SHUTDOWN)
         print(f'[CLOSED] {self.ADDR}')
         
-        return 
+        return
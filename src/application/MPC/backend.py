@@ -0,0 +1,31 @@
+""" Selection of the backend that runs the secure computations. """
+
+# Local getters imports.
+from application.getters import (get_mpc_backend as
+                                 mpc_backend)
+
+# MPC imports.
+from application.MPC.worker import WorkerPool
+
+
+def get_mpc_workers(port_base: int) -> WorkerPool:
+    """
+        Gets the workers of a session for the configured backend. Every backend runs the sort-and-encrypt,
+        sort-and-reencrypt, AES-128-ECB and embedding distance programs with the same inputs and outputs.
+
+        Parameters:
+            - port_base (int) : The port base of the session.
+
+        Returns:
+            :raises ValueError
+            - mpc_workers (WorkerPool) : The workers of the session.
+    """
+
+    if mpc_backend() == 'mp-spdz':
+        return WorkerPool(port_base)
+    elif mpc_backend() == 'simulated':
+        # Only imported when used, so MP-SPDZ runs do not depend on the reference implementations.
+        from application.MPC.simulated_worker import SimulatedWorkerPool
+        return SimulatedWorkerPool(port_base)
+
+    raise ValueError(f'Unknown MPC backend: {mpc_backend()}')
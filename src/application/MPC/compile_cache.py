@@ -0,0 +1,135 @@
+""" Caches the compiled MP-SPDZ programs by the content they are compiled from. """
+
+# Imports.
+from hashlib import sha256
+from json import dumps
+from os import environ
+from pathlib import Path
+from shutil import copy2, rmtree
+from subprocess import run
+
+# Local getters imports.
+from application.getters import (get_mp_spdz_directory as
+                                 mp_spdz_directory)
+from application.getters import (get_mp_spdz_compile_path as
+                                 mp_spdz_compile_path)
+from application.getters import (get_mp_spdz_scripts_directory as
+                                 mp_spdz_scripts_directory)
+from application.getters import (get_mp_spdz_circuits_directory as
+                                 mp_spdz_circuits_directory)
+from application.getters import (get_mp_spdz_schedules_directory as
+                                 mp_spdz_schedules_directory)
+from application.getters import (get_mp_spdz_bytecode_directory as
+                                 mp_spdz_bytecode_directory)
+from application.getters import (get_mp_spdz_compile_cache_directory as
+                                 mp_spdz_compile_cache_directory)
+from application.getters import (get_mpc_program_parameters_variable as
+                                 mpc_program_parameters_variable)
+from application.getters import (get_mpc_program_parameters as
+                                 mpc_program_parameters)
+
+
+def get_program_key(mpc_script_path: Path, circuit_paths: list[Path], compiler_options: list[str],
+                    program_arguments: list[str], parameters: dict[str, int]) -> str:
+    """
+        Gets the key of a compiled program, a digest of everything the compilation depends on.
+
+        Parameters:
+            - mpc_script_path (Path) : Path to the .mpc script.
+            - circuit_paths (list[Path]) : Paths to the circuits the script uses.
+            - compiler_options (list[str]) : The options the script is compiled with.
+            - program_arguments (list[str]) : The arguments the script is compiled with.
+            - parameters (dict[str, int]) : The parameters the script is compiled for.
+
+        Returns:
+            :raises
+            - key (str) : The key of the compiled program.
+    """
+
+    digest = sha256(mpc_script_path.read_bytes())
+    for circuit_path in circuit_paths:
+        digest.update(circuit_path.read_bytes())
+    digest.update(dumps([compiler_options, program_arguments, parameters], sort_keys=True).encode())
+
+    return digest.hexdigest()
+
+
+def get_program_files(program_name: str) -> list[Path]:
+    """
+        Gets the files MP-SPDZ runs a compiled program from.
+
+        Parameters:
+            - program_name (str) : The name of the compiled program.
+
+        Returns:
+            :raises
+            - program_files (list[Path]) : The schedule and the bytecode of the program.
+    """
+
+    return ([mp_spdz_schedules_directory() / f'{program_name}.sch'] +
+            sorted(mp_spdz_bytecode_directory().glob(f'{program_name}-*.bc')))
+
+
+def compile_program(mpc_script_path: Path, circuit_paths: list[Path], compiler_options: list[str],
+                    program_arguments: list[str], parameter_overrides: dict[str, int] | None = None) -> str:
+    """
+        Installs a compiled program in MP-SPDZ. The program is left as it is if it is already installed for the same
+        content, restored from the cache if it has been compiled for the same content before, and otherwise compiled
+        and added to the cache.
+
+        Parameters:
+            - mpc_script_path (Path) : Path to the .mpc script.
+            - circuit_paths (list[Path]) : Paths to the circuits the script uses.
+            - compiler_options (list[str]) : The options the script is compiled with.
+            - program_arguments (list[str]) : The arguments the script is compiled with, which name the program.
+            - parameter_overrides (dict[str, int] | None) : Parameters to compile the script for instead of the
+                                                            configured ones.
+
+        Returns:
+            :raises ChildProcessError
+            - outcome (str) : Whether the program was 'installed', 'restored' or 'compiled'.
+    """
+
+    parameters = mpc_program_parameters(parameter_overrides)
+    key = get_program_key(mpc_script_path, circuit_paths, compiler_options, program_arguments, parameters)
+    program_name = '-'.join([mpc_script_path.stem, *program_arguments])
+    key_path = mp_spdz_schedules_directory() / f'{program_name}.key'
+    cached_program_directory = mp_spdz_compile_cache_directory() / key
+
+    # The installed program was compiled from the same content.
+    if key_path.is_file() and key_path.read_text() == key:
+        return 'installed'
+
+    # The program was compiled from the same content before.
+    if cached_program_directory.is_dir():
+        outcome = 'restored'
+        copy2(cached_program_directory / f'{program_name}.sch', mp_spdz_schedules_directory())
+        for bytecode_path in cached_program_directory.glob('*.bc'):
+            copy2(bytecode_path, mp_spdz_bytecode_directory())
+    else:
+        outcome = 'compiled'
+
+        # Moves the script and its circuits over to MP-SPDZ and compiles it for the parameters.
+        for circuit_path in circuit_paths:
+            copy2(circuit_path, mp_spdz_circuits_directory() / circuit_path.name)
+        copy2(mpc_script_path, mp_spdz_scripts_directory() / mpc_script_path.name)
+        for stale_program_path in [key_path, *get_program_files(program_name)]:
+            stale_program_path.unlink(missing_ok=True)
+        compilation = run([f'{mp_spdz_compile_path()}', mpc_script_path.name, *compiler_options, *program_arguments],
+                          cwd=mp_spdz_directory(),
+                          env={**environ, mpc_program_parameters_variable(): dumps(parameters)})
+        if compilation.returncode != 0:
+            raise ChildProcessError(f'Compiling {mpc_script_path.name} failed.')
+
+        # Adds the compiled program to the cache.
+        cached_program_directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for program_path in get_program_files(program_name):
+                copy2(program_path, cached_program_directory)
+        except OSError:
+            rmtree(cached_program_directory)
+            raise
+
+    key_path.write_text(key)
+
+    return outcome
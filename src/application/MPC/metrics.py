@@ -0,0 +1,142 @@
+""" Collects the execution statistics of the MPC jobs, aggregated per operation. """
+
+# Imports.
+from json import dump
+from pathlib import Path
+from threading import Lock
+
+# Local getters imports.
+from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_path as
+                                 sort_and_encrypt_with_circuit_mpc_script_path)
+from application.getters import (get_sort_and_reencrypt_with_circuit_mpc_script_path as
+                                 sort_and_reencrypt_with_circuit_mpc_script_path)
+from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
+                                 aes_128_ecb_mpc_script_path)
+from application.getters import (get_semantic_search_mpc_script_path as
+                                 semantic_search_mpc_script_path)
+
+
+class MetricsSink:
+    """
+        Sums the statistics of the MPC executions of a session per operation. The jobs, failures, wall time and CPU
+        time are recorded per job as it finishes, and the workers, their exit statuses and the data sent and rounds
+        they report once a worker stops.
+
+        The workers started in the background ahead of the queries, whether first started or replacing workers that
+        stopped, are recorded as refills, with the time taken to start them, and the jobs that found their worker
+        already started as warm jobs. The pool level, the number of started workers of an operation when its workers
+        were last warmed, is kept as it is rather than summed.
+    """
+
+    OPERATIONS = {sort_and_encrypt_with_circuit_mpc_script_path().stem: 'encrypt',
+                  sort_and_reencrypt_with_circuit_mpc_script_path().stem: 'reencrypt',
+                  aes_128_ecb_mpc_script_path().stem: 'aes_128_ecb',
+                  semantic_search_mpc_script_path().stem: 'semantic_search'}
+    MEASUREMENTS = ['jobs', 'failures', 'wall_time', 'cpu_time', 'bytes_sent', 'rounds', 'workers', 'failed_workers',
+                    'warm_jobs', 'refills', 'refill_time']
+
+    def __init__(self) -> None:
+        self.operations = {}
+        self.pool_levels = {}
+        self.lock = Lock()
+
+        return
+
+    def record(self, mpc_script_name: str, **measurements: float) -> None:
+        """
+            Adds measurements of a program to the totals of its operation.
+
+            Parameters:
+                - mpc_script_name (str) : Name of the .mpc script that was run.
+                - measurements (float) : The measurements, named as in MEASUREMENTS.
+
+            Returns:
+                :raises KeyError
+                -
+        """
+
+        operation = self.OPERATIONS.get(mpc_script_name, mpc_script_name)
+        with self.lock:
+            totals = self.operations.setdefault(operation, dict.fromkeys(self.MEASUREMENTS, 0))
+            for measurement, value in measurements.items():
+                if measurement not in totals:
+                    raise KeyError(f'Unknown measurement {measurement}.')
+                totals[measurement] += value
+
+        return
+
+    def record_exit(self, mpc_script_name: str, exit_status: int) -> None:
+        """
+            Records a worker of a program that has stopped.
+
+            Parameters:
+                - mpc_script_name (str) : Name of the .mpc script that was run.
+                - exit_status (int) : The exit status of the party.
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.record(mpc_script_name, workers=1, failed_workers=int(exit_status != 0))
+
+        return
+
+    def set_pool_level(self, mpc_script_name: str, pool_level: int) -> None:
+        """
+            Sets the number of started workers of a program.
+
+            Parameters:
+                - mpc_script_name (str) : Name of the .mpc script the workers run.
+                - pool_level (int) : The number of started workers.
+
+            Returns:
+                :raises
+                -
+        """
+
+        with self.lock:
+            self.pool_levels[self.OPERATIONS.get(mpc_script_name, mpc_script_name)] = pool_level
+
+        return
+
+    def get_summary(self) -> dict[str, dict[str, float]]:
+        """
+            Gets the totals of every operation.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - summary (dict[str, dict[str, float]]) : The totals of each operation, with the pool level and the
+                                                          refill rate in workers started per second of the operations
+                                                          whose workers were started ahead of the queries.
+        """
+
+        with self.lock:
+            summary = {operation: dict(totals) for operation, totals in self.operations.items()}
+            for operation, pool_level in self.pool_levels.items():
+                totals = summary.setdefault(operation, dict.fromkeys(self.MEASUREMENTS, 0))
+                totals['pool_level'] = pool_level
+                totals['refill_rate'] = totals['refills'] / totals['refill_time'] if totals['refill_time'] else 0.0
+
+        return summary
+
+    def write(self, path: Path) -> None:
+        """
+            Writes the totals of every operation as a file.
+
+            Parameters:
+                - path (Path) : Where the totals should be written.
+
+            Returns:
+                :raises
+                -
+        """
+
+        with path.open('w') as f:
+            dump(self.get_summary(), f, indent=4)
+            f.close()
+
+        return
@@ -0,0 +1,132 @@
+""" Dispatches a dependency graph of MPC jobs to the workers of a program as soon as their inputs are ready. """
+
+# Imports.
+from collections import deque
+from threading import Condition, Thread
+from time import perf_counter
+from typing import Callable, Hashable
+
+
+def get_dependencies(tasks: list[list[Hashable]]) -> list[set[int]]:
+    """
+        Compiles tasks, given in program order with the items each of them reads and writes, into a dependency graph. A
+        task depends on the last earlier task that touched each of its items, so tasks on disjoint items are
+        independent regardless of where they are in the program.
+
+        Parameters:
+            - tasks (list[list[Hashable]]) : The items touched by each task.
+
+        Returns:
+            :raises
+            - dependencies (list[set[int]]) : The indices of the tasks each task depends on.
+    """
+
+    dependencies, last_tasks = [], {}
+    for task, items in enumerate(tasks):
+        dependencies.append({last_tasks[item] for item in items if item in last_tasks})
+        last_tasks.update(dict.fromkeys(items, task))
+
+    return dependencies
+
+
+def get_critical_path_length(dependencies: list[set[int]]) -> int:
+    """
+        Gets the number of tasks on the longest chain of dependent tasks, which bounds how few rounds the graph can be
+        run in with any number of workers.
+
+        Parameters:
+            - dependencies (list[set[int]]) : The indices of the tasks each task depends on, which are all earlier.
+
+        Returns:
+            :raises
+            - critical_path_length (int) : The number of tasks on the critical path.
+    """
+
+    depths = []
+    for task_dependencies in dependencies:
+        depths.append(1 + max((depths[dependency] for dependency in task_dependencies), default=0))
+
+    return max(depths, default=0)
+
+
+def run_schedule(tasks: list, dependencies: list[set[int]], run_task: Callable[[object, int], None],
+                 number_of_workers: int) -> dict[str, float]:
+    """
+        Runs a dependency graph of tasks on a number of workers. Every worker takes the next ready task as soon as it is
+        free, and a task becomes ready once every task it depends on has finished. Each worker runs its tasks one at a
+        time, so a task is always run by a single worker from start to end.
+
+        Parameters:
+            - tasks (list) : The tasks, in program order.
+            - dependencies (list[set[int]]) : The indices of the tasks each task depends on, which are all earlier.
+            - run_task (Callable[[object, int], None]) : Runs a task on the given worker.
+            - number_of_workers (int) : The number of workers.
+
+        Returns:
+            :raises Exception
+            - metrics (dict[str, float]) : The number of tasks, the critical path length in tasks, the running time in
+                                           seconds, the share of the workers' time spent running tasks, and the average
+                                           and maximum number of ready tasks waiting for a worker.
+    """
+
+    dependents = [[] for _ in tasks]
+    for task, task_dependencies in enumerate(dependencies):
+        for dependency in task_dependencies:
+            dependents[dependency].append(task)
+    remaining_dependencies = [len(task_dependencies) for task_dependencies in dependencies]
+    ready_tasks = deque(task for task, count in enumerate(remaining_dependencies) if count == 0)
+
+    condition = Condition()
+    finished_tasks, errors, queue_depths, busy_times = 0, [], [], [0.0] * number_of_workers
+
+    def work(worker: int) -> None:
+        nonlocal finished_tasks
+
+        while True:
+            # Waits for a ready task, or for the schedule to be over.
+            with condition:
+                while not ready_tasks and finished_tasks < len(tasks) and not errors:
+                    condition.wait()
+                if finished_tasks == len(tasks) or errors:
+                    return
+                queue_depths.append(len(ready_tasks))
+                task = ready_tasks.popleft()
+
+            start = perf_counter()
+            try:
+                run_task(tasks[task], worker)
+            except Exception as error:
+                with condition:
+                    errors.append(error)
+                    condition.notify_all()
+                return
+            busy_times[worker] += perf_counter() - start
+
+            # Releases the tasks that were only waiting on this one.
+            with condition:
+                finished_tasks += 1
+                for dependent in dependents[task]:
+                    remaining_dependencies[dependent] -= 1
+                    if remaining_dependencies[dependent] == 0:
+                        ready_tasks.append(dependent)
+                condition.notify_all()
+
+    start = perf_counter()
+    threads = [Thread(target=work, args=(worker,)) for worker in range(number_of_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    running_time = perf_counter() - start
+
+    if errors:
+        raise errors[0]
+
+    metrics = {'tasks': len(tasks),
+               'critical_path_length': get_critical_path_length(dependencies),
+               'running_time': running_time,
+               'utilization': sum(busy_times) / (number_of_workers * running_time) if running_time else 0.0,
+               'average_queue_depth': sum(queue_depths) / len(queue_depths) if queue_depths else 0.0,
+               'maximum_queue_depth': max(queue_depths, default=0)}
+
+    return metrics
@@ -0,0 +1,339 @@
+""" In-process reference implementations of the MP-SPDZ programs, for running the application without MP-SPDZ. """
+
+# Imports.
+from socket import create_server, create_connection, SHUT_RDWR
+from time import perf_counter, sleep, thread_time
+from numpy import array
+from cryptography.hazmat.primitives.ciphers import (Cipher, algorithms, modes)
+
+# Local getters imports.
+from application.getters import (get_number_of_blocks as
+                                 number_of_blocks)
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
+from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_path as
+                                 sort_and_encrypt_with_circuit_mpc_script_path)
+from application.getters import (get_sort_and_reencrypt_with_circuit_mpc_script_path as
+                                 sort_and_reencrypt_with_circuit_mpc_script_path)
+from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
+                                 aes_128_ecb_mpc_script_path)
+from application.getters import (get_semantic_search_mpc_script_path as
+                                 semantic_search_mpc_script_path)
+from application.getters import (get_semantic_search_request_threshold as
+                                 request_threshold)
+
+# Binary encoding imports.
+from application.binary_encoding import encode_words, decode_words
+
+# Networking imports.
+from application.networking import INTEGER
+
+# MPC imports.
+from application.MPC.worker import PartyWorker, WorkerPool
+from application.MPC.metrics import MetricsSink
+
+
+def xor(a: bytes, b: bytes) -> bytes:
+    """
+        XORs two equally long byte strings at once.
+
+        Parameters:
+            - a (bytes) : A byte string.
+            - b (bytes) : A byte string.
+
+        Returns:
+            :raises
+            - c (bytes) : The XOR of the byte strings.
+    """
+
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+
+def sort_and_encrypt(inputs_0: bytes, inputs_1: bytes) -> bytes:
+    """
+        Swaps pairs of records if indicated and encrypts them with the key streams, as the sort_and_encrypt circuit.
+
+        Parameters:
+            - inputs_0 (bytes) : The blocks of the two records of each pair.
+            - inputs_1 (bytes) : The swap indicator and the two key streams of each pair.
+
+        Returns:
+            :raises
+            - output (bytes) : The blocks of the two ciphertexts of each pair.
+    """
+
+    record_length = number_of_blocks() * number_of_bytes()
+    pair_length_0, pair_length_1 = 2 * record_length, number_of_bytes() + 2 * record_length
+
+    ciphertexts = []
+    for pair in range(len(inputs_0) // pair_length_0):
+        plaintexts = inputs_0[pair * pair_length_0: (pair + 1) * pair_length_0]
+        swap = inputs_1[pair * pair_length_1: pair * pair_length_1 + number_of_bytes()]
+        key_streams = inputs_1[pair * pair_length_1 + number_of_bytes(): (pair + 1) * pair_length_1]
+
+        # Sorts the plaintexts.
+        if any(swap):
+            plaintexts = plaintexts[record_length:] + plaintexts[:record_length]
+
+        ciphertexts.append(xor(plaintexts, key_streams))
+
+    return b''.join(ciphertexts)
+
+
+def sort_and_reencrypt(inputs_0: bytes, inputs_1: bytes) -> bytes:
+    """
+        Decrypts pairs of records, swaps them if indicated and encrypts them with new key streams, as the
+        sort_and_reencrypt circuit.
+
+        Parameters:
+            - inputs_0 (bytes) : The blocks of the two ciphertexts of each pair.
+            - inputs_1 (bytes) : The swap indicator, the two decryption and the two encryption key streams of each
+                                 pair.
+
+        Returns:
+            :raises
+            - output (bytes) : The blocks of the two new ciphertexts of each pair.
+    """
+
+    record_length = number_of_blocks() * number_of_bytes()
+    pair_length_0, pair_length_1 = 2 * record_length, number_of_bytes() + 4 * record_length
+
+    new_ciphertexts = []
+    for pair in range(len(inputs_0) // pair_length_0):
+        ciphertexts = inputs_0[pair * pair_length_0: (pair + 1) * pair_length_0]
+        swap = inputs_1[pair * pair_length_1: pair * pair_length_1 + number_of_bytes()]
+        key_streams = inputs_1[pair * pair_length_1 + number_of_bytes(): (pair + 1) * pair_length_1]
+
+        # Decrypts and sorts the plaintexts.
+        plaintexts = xor(ciphertexts, key_streams[:2 * record_length])
+        if any(swap):
+            plaintexts = plaintexts[record_length:] + plaintexts[:record_length]
+
+        new_ciphertexts.append(xor(plaintexts, key_streams[2 * record_length:]))
+
+    return b''.join(new_ciphertexts)
+
+
+def aes_128_ecb(inputs_0: bytes, inputs_1: bytes) -> bytes:
+    """
+        Encrypts query digests with two keys with AES-128 in ECB mode, as the aes_128 circuit.
+
+        Parameters:
+            - inputs_0 (bytes) : The query digests.
+            - inputs_1 (bytes) : The two encryption keys.
+
+        Returns:
+            :raises
+            - output (bytes) : The ciphertexts under the first key followed by those under the second key.
+    """
+
+    ciphertexts = []
+    for key in (inputs_1[:number_of_bytes()], inputs_1[number_of_bytes():]):
+        encryptor = Cipher(
+            algorithms.AES(key),
+            modes.ECB(),
+        ).encryptor()
+        ciphertexts.append(encryptor.update(inputs_0) + encryptor.finalize())
+
+    return b''.join(ciphertexts)
+
+
+def closest_embeddings(inputs_0: bytes, inputs_1: bytes) -> bytes:
+    """
+        Computes the squared euclidean distances between the search query embedding and every record embedding at
+        once, and gets the pointers of the closest records, as the semantic_search program.
+
+        Parameters:
+            - inputs_0 (bytes) : The search query embedding.
+            - inputs_1 (bytes) : The record pointers followed by the record embeddings.
+
+        Returns:
+            :raises
+            - output (bytes) : The pointers of the closest records, closest first.
+    """
+
+    # The distances exceed 64 bits, so they are summed with Python integers.
+    query_embedding = array(decode_words(inputs_0, signed=True), dtype=object)
+    values = decode_words(inputs_1, signed=True)
+    number_of_embeddings = len(values) // (len(query_embedding) + 1)
+    record_pointers = values[:number_of_embeddings]
+    records_embedding = array(values[number_of_embeddings:], dtype=object).reshape(number_of_embeddings, -1)
+    difference = records_embedding - query_embedding
+    distances = (difference * difference).sum(axis=1)
+
+    # Ties are won by the earlier record, as in the compare-exchanges of the program.
+    closest = sorted(range(number_of_embeddings), key=lambda record: distances[record])
+
+    return encode_words([record_pointers[record] for record in closest[:request_threshold()]], signed=True)
+
+
+class SimulatedPartyWorker(PartyWorker):
+    """
+        A party that computes the programs in-process instead of through MP-SPDZ. Party 1 sends its inputs of every job
+        to party 0 over a plain connection, and party 0 computes the output from the inputs of both parties. The
+        outputs are identical to those of MP-SPDZ, but party 0 learns the inputs of party 1, so this is only meant for
+        testing and benchmarking the rest of the application. The inputs party 1 sends are recorded as the data sent,
+        in one round per job, and the time party 0 computes the output as the CPU time. Closing the connection between
+        the parties is recorded as the exit of the worker, failed if the other party disconnected.
+    """
+
+    OPERATIONS = {sort_and_encrypt_with_circuit_mpc_script_path().stem: sort_and_encrypt,
+                  sort_and_reencrypt_with_circuit_mpc_script_path().stem: sort_and_reencrypt,
+                  aes_128_ecb_mpc_script_path().stem: aes_128_ecb,
+                  semantic_search_mpc_script_path().stem: closest_embeddings}
+
+    def __init__(self, player_id: int, mpc_script_name: str, host_address: str, port_base: int,
+                 metrics: MetricsSink) -> None:
+        super().__init__(player_id, mpc_script_name, host_address, port_base, metrics)
+        self.listener = None
+        self.connection = None
+
+        return
+
+    def start(self) -> None:
+        """
+            Starts the party, party 0 listening on the worker's host address and port, which is the loopback address
+            unless configured otherwise, and party 1 connecting to it. Closing the worker stops either from waiting for
+            the other party.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ChildProcessError
+                -
+        """
+
+        if self.player_id == 0:
+            self.listener = create_server((self.host_address, self.port_base))
+            try:
+                self.connection, address = self.listener.accept()
+            except OSError:
+                self.close_connection()
+                raise ChildProcessError(f'{self.mpc_script_name} was closed before the other party connected.')
+        else:
+            # Waits for party 0 to listen, as MP-SPDZ does.
+            while self.connection is None:
+                if self.closed:
+                    raise ChildProcessError(f'{self.mpc_script_name} was closed before the other party listened.')
+                try:
+                    self.connection = create_connection((self.host_address, self.port_base))
+                except ConnectionRefusedError:
+                    sleep(0.1)
+        self.process = self.connection.makefile('rwb')
+
+        return
+
+    def run(self, inputs: bytes) -> bytes:
+        """
+            Runs a job on the party. Party 0 waits for the inputs of party 1 and returns the output, while party 1
+            returns as soon as its inputs are sent.
+
+            Parameters:
+                - inputs (bytes) : The party's inputs to the job as words.
+
+            Returns:
+                :raises ChildProcessError
+                - output (bytes) : The output of the job as words, empty for party 1.
+        """
+
+        with self.lock:
+            self.metrics.record(self.mpc_script_name, warm_jobs=int(self.process is not None))
+            if self.process is None:
+                self.start()
+
+            # Sends the inputs of party 1.
+            start = perf_counter()
+            if self.player_id != 0:
+                try:
+                    self.process.write(INTEGER.pack(len(inputs)) + inputs)
+                    self.process.flush()
+                except OSError:
+                    self.metrics.record(self.mpc_script_name, jobs=1, failures=1)
+                    self.raise_exit_error()
+                self.metrics.record(self.mpc_script_name, jobs=1, wall_time=perf_counter() - start,
+                                    bytes_sent=INTEGER.size + len(inputs), rounds=1)
+                return b''
+
+            # Receives the inputs of party 1.
+            length = self.process.read(INTEGER.size)
+            if len(length) < INTEGER.size:
+                self.metrics.record(self.mpc_script_name, jobs=1, failures=1)
+                self.raise_exit_error()
+            other_inputs = self.process.read(*INTEGER.unpack(length))
+            cpu_start = thread_time()
+            output = self.OPERATIONS[self.mpc_script_name](inputs, other_inputs)
+            self.metrics.record(self.mpc_script_name, jobs=1, wall_time=perf_counter() - start,
+                                cpu_time=thread_time() - cpu_start)
+
+        return output
+
+    def raise_exit_error(self) -> None:
+        """
+            Raises the error of a party whose other party has disconnected.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ChildProcessError
+                -
+        """
+
+        self.close_connection()
+        self.metrics.record_exit(self.mpc_script_name, 1)
+
+        raise ChildProcessError(f'{self.mpc_script_name} exited: the other party disconnected.')
+
+    def close_connection(self) -> None:
+        """
+            Closes the connection between the parties.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        for closable in (self.process, self.connection, self.listener):
+            if closable is not None:
+                closable.close()
+        self.process, self.connection, self.listener = None, None, None
+
+        return
+
+    def close(self) -> None:
+        """
+            Stops the party, waking party 0 up if it is still waiting for party 1 to connect.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.closed = True
+        if (listener := self.listener) is not None:
+            try:
+                listener.shutdown(SHUT_RDWR)
+            except OSError:
+                pass
+        with self.lock:
+            if self.process is not None:
+                self.metrics.record_exit(self.mpc_script_name, 0)
+            self.close_connection()
+
+        return
+
+
+class SimulatedWorkerPool(WorkerPool):
+    """
+        The workers of a session when the programs are computed in-process.
+    """
+
+    # The parties compute the programs in-process.
+    worker_type = SimulatedPartyWorker
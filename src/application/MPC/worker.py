@@ -0,0 +1,556 @@
+""" Long-lived MP-SPDZ parties that run one job after another. """
+
+# Imports.
+from collections import deque
+from os import sysconf
+from pathlib import Path
+from re import findall, search
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, PIPE, TimeoutExpired
+from threading import Lock, Thread
+from typing import TextIO
+
+# Local getters imports.
+from application.getters import (get_mp_spdz_directory as
+                                 mp_spdz_directory)
+from application.getters import (get_mp_spdz_protocol as
+                                 mp_spdz_protocol)
+from application.getters import (get_mp_spdz_service_argument as
+                                 service_argument)
+from application.getters import (get_mp_spdz_job_end_marker as
+                                 job_end_marker)
+from application.getters import (get_mp_spdz_service_programs as
+                                 service_programs)
+from application.getters import (get_mp_spdz_ports_per_worker as
+                                 ports_per_worker)
+from application.getters import (get_mp_spdz_workers_per_program as
+                                 workers_per_program)
+from application.getters import (get_mp_spdz_warm_workers_per_program as
+                                 warm_workers_per_program)
+from application.getters import (get_mp_spdz_shutdown_timeout as
+                                 shutdown_timeout)
+from application.getters import (get_mp_spdz_error_lines as
+                                 error_lines)
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
+from application.getters import (get_semantic_search_mpc_script_path as
+                                 semantic_search_mpc_script_path)
+
+# Binary encoding imports.
+from application.binary_encoding import encode_words, decode_words
+
+# MPC imports.
+from application.MPC.metrics import MetricsSink
+
+
+class PartyWorker:
+    """
+        A party of an MP-SPDZ program compiled as a service, which keeps running jobs until its input is closed. The
+        party is started once and then fed the inputs of each job through its standard input, while its outputs are
+        read from its standard output up to the end marker of the job, as the inputs are being written. The
+        process start-up, the connection set-up between the parties and the loading of the program are thereby paid
+        once per worker rather than once per job.
+
+        The inputs and outputs of a job are words of number_of_bytes each, which the worker translates to and from the
+        decimal inputs MP-SPDZ reads and the hexadecimals it reveals. Programs on integers rather than blocks take
+        signed decimals and reveal decimals. Party 0 precedes the inputs of every job with a one, and inputs a zero
+        instead to stop both parties.
+
+        Every job is recorded in the MPC metrics of the pool once its end marker is read, with its wall time and the
+        CPU time the party used since its previous job finished. Party 0 reads its outputs while running the job,
+        while the outputs of party 1 are read in the background, as party 1 returns as soon as its inputs are handed
+        over. The data a party sent and the rounds of communication it took are only reported by MP-SPDZ once the
+        party exits, so they are recorded over all the jobs of the worker. The standard error of a party is read
+        throughout its life, keeping its last mp_spdz_error_lines lines, so that a party writing more than the pipe
+        holds never blocks on it.
+
+        A worker can be warmed, started in the background ahead of its first job, so that a query only waits for the
+        online part of its job.
+    """
+
+    DECIMAL_PROGRAMS = [semantic_search_mpc_script_path().stem]
+
+    def __init__(self, player_id: int, mpc_script_name: str, host_address: str, port_base: int,
+                 metrics: MetricsSink) -> None:
+        self.player_id = player_id
+        self.mpc_script_name = mpc_script_name
+        self.host_address = host_address
+        self.port_base = port_base
+        self.metrics = metrics
+
+        self.is_decimal = mpc_script_name in self.DECIMAL_PROGRAMS
+        self.process = None
+        self.job_usage = None
+        self.job_starts = deque()
+        self.error = deque(maxlen=error_lines())
+        self.error_reader = None
+        self.output_reader = None
+        self.closed = False
+        self.lock = Lock()
+
+        return
+
+    def start(self) -> None:
+        """
+            Starts the party, which connects to the other party once it is started as well.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Runs the party in interactive mode, so the inputs are read from the standard input, with every party printing
+        # the outputs, so that the end of a job can be read by the other parties too.
+        self.process = Popen([f'{mp_spdz_directory() / mp_spdz_protocol()}',
+                              f'{self.mpc_script_name}-{service_argument()}',
+                              '-p', f'{self.player_id}',
+                              '-h', f'{self.host_address}',
+                              '-pn', f'{self.port_base}',
+                              '-I',
+                              '-OF', '.'],
+                             stdin=PIPE, stdout=PIPE, stderr=PIPE,
+                             cwd=mp_spdz_directory(), text=True
+                             )
+
+        # Reads the standard error as it is written, which is only needed once the party has exited.
+        self.error = deque(maxlen=error_lines())
+        self.error_reader = Thread(target=self.error.extend, args=(self.process.stderr,), daemon=True)
+        self.error_reader.start()
+
+        # Reads the outputs of the other parties in the background, as they do not wait for their jobs to finish.
+        self.job_usage = None
+        self.job_starts.clear()
+        if self.player_id != 0:
+            self.output_reader = Thread(target=self.read_job_ends, args=(self.process.stdout,), daemon=True)
+            self.output_reader.start()
+
+        return
+
+    def warm(self) -> None:
+        """
+            Starts the party ahead of its first job, or again once it has stopped, unless it is already started or
+            the worker is closed. The start is recorded as a refill.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ChildProcessError
+                -
+        """
+
+        with self.lock:
+            if self.process is None and not self.closed:
+                start = perf_counter()
+                self.start()
+                self.metrics.record(self.mpc_script_name, refills=1, refill_time=perf_counter() - start)
+
+        return
+
+    def run(self, inputs: bytes) -> bytes:
+        """
+            Runs a job on the party. Party 0 waits for the job to finish and returns its output, while the other
+            parties return as soon as their inputs are handed over.
+
+            Parameters:
+                - inputs (bytes) : The party's inputs to the job as words.
+
+            Returns:
+                :raises ChildProcessError
+                - output (bytes) : The output of the job as words, empty for the parties other than party 0.
+        """
+
+        with self.lock:
+            self.metrics.record(self.mpc_script_name, warm_jobs=int(self.process is not None))
+            if self.process is None:
+                self.start()
+
+            # The CPU time of a job is measured from the end of the previous one, or from the start of the first one.
+            if self.job_usage is None:
+                self.job_usage = self.get_usage()
+
+            # Hands over the inputs of the job, preceded by the indicator to run it for party 0.
+            start = perf_counter()
+            running = '1 ' if self.player_id == 0 else ''
+            job_inputs = running + ' '.join(map(str, decode_words(inputs, signed=self.is_decimal))) + '\n'
+
+            if self.player_id != 0:
+                self.job_starts.append(start)
+                if not self.write_inputs(job_inputs):
+                    self.metrics.record(self.mpc_script_name, jobs=1, failures=1)
+                    self.raise_exit_error()
+                self.metrics.record(self.mpc_script_name, jobs=1)
+                return b''
+
+            # Party 0 prints the outputs of a job while it is still reading the inputs, so the inputs are written in a
+            # thread of their own while the output is read, for neither pipe to fill up with the party blocked on it.
+            writer = Thread(target=self.write_inputs, args=(job_inputs,), daemon=True)
+            writer.start()
+
+            # Reads the output of the job.
+            output = []
+            while (line := self.process.stdout.readline()).strip() != job_end_marker():
+                if not line:
+                    writer.join()
+                    self.metrics.record(self.mpc_script_name, jobs=1, failures=1)
+                    self.raise_exit_error()
+                output.append(line)
+            writer.join()
+            self.metrics.record(self.mpc_script_name, jobs=1)
+            self.record_job(start)
+
+        return self.decode_output(output)
+
+    def write_inputs(self, job_inputs: str) -> bool:
+        """
+            Writes the inputs of a job to the standard input of the party.
+
+            Parameters:
+                - job_inputs (str) : The inputs of the job as MP-SPDZ reads them.
+
+            Returns:
+                :raises
+                - written (bool) : Whether the inputs were written, rather than the party having exited.
+        """
+
+        try:
+            self.process.stdin.write(job_inputs)
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            return False
+
+        return True
+
+    def read_job_ends(self, output: TextIO) -> None:
+        """
+            Reads the outputs of a party other than party 0 until it exits, recording every job whose end marker is
+            read.
+
+            Parameters:
+                - output (TextIO) : The standard output of the party.
+
+            Returns:
+                :raises
+                -
+        """
+
+        for line in output:
+            if line.strip() == job_end_marker() and self.job_starts:
+                self.record_job(self.job_starts.popleft())
+
+        return
+
+    def get_usage(self) -> float | None:
+        """
+            Gets the CPU time the party has used so far.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - usage (float | None) : The CPU time in seconds, or None if the system does not report it.
+        """
+
+        try:
+            stat = Path(f'/proc/{self.process.pid}/stat').read_text()
+        except (AttributeError, OSError):
+            return None
+
+        # The user and system CPU times follow the name of the process, in clock ticks.
+        fields = stat[stat.rindex(')') + 2:].split()
+        usage = (int(fields[11]) + int(fields[12])) / sysconf('SC_CLK_TCK')
+
+        return usage
+
+    def record_job(self, start: float) -> None:
+        """
+            Records the wall time of a job that has just finished, and the CPU time the party used since the previous
+            job finished.
+
+            Parameters:
+                - start (float) : The time the inputs of the job started to be handed over.
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.metrics.record(self.mpc_script_name, wall_time=perf_counter() - start)
+        if (usage := self.get_usage()) is not None:
+            if self.job_usage is not None:
+                self.metrics.record(self.mpc_script_name, cpu_time=usage - self.job_usage)
+            self.job_usage = usage
+
+        return
+
+    def record_communication(self, error: str) -> None:
+        """
+            Records the data a party sent and the rounds of communication it took over all its jobs, which MP-SPDZ
+            reports on its standard error once the party exits.
+
+            Parameters:
+                - error (str) : The standard error of the party.
+
+            Returns:
+                :raises
+                -
+        """
+
+        if (report := search(r'Data sent = ([0-9.e+-]+) MB in ~(\d+) rounds', error)) is not None:
+            self.metrics.record(self.mpc_script_name, bytes_sent=round(float(report[1]) * 10 ** 6),
+                                rounds=int(report[2]))
+
+        return
+
+    def decode_output(self, output: list[str]) -> bytes:
+        """
+            Decodes the lines a job printed into words.
+
+            Parameters:
+                - output (list[str]) : The lines of the output.
+
+            Returns:
+                :raises
+                - output (bytes) : The output as words.
+        """
+
+        # The decimals are printed on the last line of the output.
+        if self.is_decimal:
+            return encode_words(map(int, output[-1].split()), signed=True)
+
+        # The hexadecimals are joined into one string of full blocks and converted at once.
+        return bytes.fromhex(''.join(hexadecimal.zfill(2 * number_of_bytes())
+                                     for hexadecimal in findall(r'0x([a-fA-F0-9]+)', ''.join(output))))
+
+    def raise_exit_error(self) -> None:
+        """
+            Raises the error of a party that has exited.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises ChildProcessError
+                -
+        """
+
+        self.process.stdin.close()
+        error = self.wait()
+
+        raise ChildProcessError(f'{self.mpc_script_name} exited: {error}')
+
+    def wait(self) -> str:
+        """
+            Waits for the party to exit, killing it if it has not exited within the shutdown timeout, and records the
+            communication it reported and its exit status.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - error (str) : The standard error of the party.
+        """
+
+        try:
+            self.process.wait(timeout=shutdown_timeout())
+        except TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+        self.error_reader.join()
+        if self.output_reader is not None:
+            self.output_reader.join()
+            self.output_reader = None
+        error = ''.join(self.error)
+        self.record_communication(error)
+        self.metrics.record_exit(self.mpc_script_name, self.process.returncode)
+        self.process = None
+
+        return error
+
+    def close(self) -> None:
+        """
+            Stops the party, party 0 ending the job loop of both parties.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.closed = True
+        with self.lock:
+            if self.process is not None:
+                try:
+                    if self.player_id == 0:
+                        self.process.stdin.write('0\n')
+                    self.process.stdin.close()
+                except BrokenPipeError:
+                    pass
+                self.wait()
+
+        return
+
+
+class WorkerPool:
+    """
+        The workers of a session, a fixed number per program and party so that independent jobs of a program run
+        concurrently. Every worker is given its own ports within the port base of the session, so both sides derive the
+        same ports for the same worker. The workers record their jobs in the MPC metrics of the pool, so that every
+        session has metrics of its own.
+    """
+
+    # The parties run as MP-SPDZ programs.
+    worker_type = PartyWorker
+
+    def __init__(self, port_base: int) -> None:
+        self.port_base = port_base
+        self.workers = {}
+        self.warm_programs = set()
+        self.closed = False
+        self.metrics = MetricsSink()
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers_per_program())
+
+        return
+
+    def get_worker(self, player_id: int, mpc_script_name: str, host_address: str, worker: int) -> PartyWorker:
+        """
+            Gets a worker running a program, creating it on first use.
+
+            Parameters:
+                - player_id (int) : The player ID of the party.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - worker (int) : The number of the worker among the workers of the program.
+
+            Returns:
+                :raises ValueError
+                - worker (PartyWorker) : The worker.
+        """
+
+        with self.lock:
+            key = (player_id, mpc_script_name, host_address, worker)
+            if key not in self.workers:
+                port_offset = (service_programs().index(mpc_script_name) * workers_per_program() + worker) * \
+                              ports_per_worker()
+                self.workers[key] = self.worker_type(player_id, mpc_script_name, host_address,
+                                                     self.port_base + port_offset, self.metrics)
+
+        return self.workers[key]
+
+    def run(self, player_id: int, mpc_script_name: str, host_address: str, inputs: bytes, worker: int = 0) -> bytes:
+        """
+            Runs a job on a worker of a program.
+
+            Parameters:
+                - player_id (int) : The player ID of the party.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - inputs (bytes) : The party's inputs to the job as words.
+                - worker (int) : The number of the worker among the workers of the program.
+
+            Returns:
+                :raises ChildProcessError
+                - output (bytes) : The output of the job as words, empty for the parties other than party 0.
+        """
+
+        try:
+            return self.get_worker(player_id, mpc_script_name, host_address, worker).run(inputs)
+        except ChildProcessError:
+            # Replaces a warmed worker that stopped in the background, so the next query finds it started again.
+            if (player_id, mpc_script_name, host_address) in self.warm_programs:
+                self.warm(player_id, mpc_script_name, host_address)
+            raise
+
+    def warm(self, player_id: int, mpc_script_name: str, host_address: str) -> None:
+        """
+            Starts the first mp_spdz_warm_workers_per_program workers of a program in the background, or those that
+            have stopped since, and records the pool level of the program once they are started. The other party warms
+            the same workers, as the workers of both parties only finish starting once they are connected.
+
+            Parameters:
+                - player_id (int) : The player ID of the party.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+
+            Returns:
+                :raises
+                -
+        """
+
+        if self.closed:
+            return
+
+        self.warm_programs.add((player_id, mpc_script_name, host_address))
+        workers = [self.get_worker(player_id, mpc_script_name, host_address, worker)
+                   for worker in range(min(warm_workers_per_program(), workers_per_program()))]
+
+        def warm_workers() -> None:
+            for worker in workers:
+                try:
+                    worker.warm()
+                except (ChildProcessError, OSError) as error:
+                    print(f'[WARMING] {mpc_script_name} failed: {error}')
+            self.metrics.set_pool_level(mpc_script_name, sum(worker.process is not None for worker in workers))
+
+        Thread(target=warm_workers, daemon=True).start()
+
+        return
+
+    def map(self, player_id: int, mpc_script_name: str, host_address: str, jobs: list[bytes]) -> list[bytes]:
+        """
+            Runs independent jobs concurrently on the workers of a program. The jobs are dealt out to the workers in
+            turn and every worker runs its jobs in order, so the two parties pair up the same jobs on the same worker.
+
+            Parameters:
+                - player_id (int) : The player ID of the party.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - jobs (list[bytes]) : The party's inputs to each job as words.
+
+            Returns:
+                :raises ChildProcessError
+                - outputs (list[bytes]) : The output of each job as words, empty for the parties other than party 0.
+        """
+
+        def run_worker(worker: int) -> list[bytes]:
+            return [self.run(player_id, mpc_script_name, host_address, inputs, worker)
+                    for inputs in jobs[worker::workers_per_program()]]
+
+        # Runs the jobs of each worker in a thread of its own.
+        outputs = [b''] * len(jobs)
+        worker_outputs = self.executor.map(run_worker, range(min(len(jobs), workers_per_program())))
+        for worker, output in enumerate(worker_outputs):
+            outputs[worker::workers_per_program()] = output
+
+        return outputs
+
+    def close(self) -> None:
+        """
+            Stops every worker.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.closed = True
+        with self.lock:
+            for worker in self.workers.values():
+                worker.close()
+            self.workers = {}
+        self.executor.shutdown(wait=False)
+
+        return
@@ -2,7 +2,8 @@
 
 # Imports
 from os import urandom
-from json import load, dump
+from pathlib import Path
+from json import load
 from hashlib import shake_128
 from random import shuffle
 from cryptography.hazmat.primitives.ciphers import (Cipher, algorithms, modes)
@@ -10,13 +11,14 @@ from cryptography.hazmat.primitives.ciphers import (Cipher, algorithms, modes)
 # Local getters imports.
 from application.getters import (get_inverted_index_matrix_path as
                                  inverted_index_matrix_path)
-from application.getters import (get_server_encrypted_inverted_index_matrix_directory as
-                                 encrypted_inverted_index_matrix_directory)
 from application.getters import (get_number_of_bytes as
                                  number_of_bytes)
 from application.getters import (get_encrypted_inverted_index_matrix_attribute_limit as
                                  encrypted_inverted_index_matrix_attribute_limit)
 
+# Binary encoding imports.
+from application.binary_encoding import write_encrypted_inverted_index_matrix_part
+
 
 def aes_128_ecb(key: bytes, plaintext: bytes) -> str:
     """
@@ -155,12 +157,14 @@ def shuffle_dictionary(encrypted_inverted_index_matrix: dict[str, list[str]]) ->
     return shuffled_encrypted_inverted_index_matrix
 
 
-def write_encrypted_inverted_index_matrix(encrypted_inverted_index_matrix: dict[str, list[str]]) -> None:
+def write_encrypted_inverted_index_matrix(encrypted_inverted_index_matrix: dict[str, list[str]],
+                                          encrypted_inverted_index_matrix_directory: Path) -> None:
     """
-        Writes the encrypted inverted index matrix to multiple records depending on its length.
+        Writes the encrypted inverted index matrix to multiple binary parts depending on its length.
 
         Parameters:
             - encrypted_inverted_index_matrix (dict) : The dictionary to be written.
+            - encrypted_inverted_index_matrix_directory (Path) : The directory the parts are written to.
 
         Returns:
             :raises
@@ -176,30 +180,26 @@ def write_encrypted_inverted_index_matrix(encrypted_inverted_index_matrix: dict[
 
         if counter == encrypted_inverted_index_matrix_attribute_limit():
             # Writes part of the encrypted inverted index matrix.
-            with open(encrypted_inverted_index_matrix_directory() /
-                      f'Encrypted_Inverted_Index_Matrix{file_counter}.json', 'w') as f:
-                dump(temp_dictionary, f, indent=4)
-                f.close()
+            write_encrypted_inverted_index_matrix_part(temp_dictionary, encrypted_inverted_index_matrix_directory /
+                                                       f'Encrypted_Inverted_Index_Matrix{file_counter}.bin')
 
             file_counter += 1
             temp_dictionary = {}
             counter = 0
 
     # Writes the remaining part of the encrypted inverted index matrix.
-    with open(encrypted_inverted_index_matrix_directory() /
-              f'Encrypted_Inverted_Index_Matrix{file_counter}.json', 'w') as f:
-        dump(temp_dictionary, f, indent=4)
-        f.close()
+    write_encrypted_inverted_index_matrix_part(temp_dictionary, encrypted_inverted_index_matrix_directory /
+                                               f'Encrypted_Inverted_Index_Matrix{file_counter}.bin')
 
     return
 
 
-def run() -> tuple[str, str]:
+def run(encrypted_inverted_index_matrix_directory: Path) -> tuple[str, str]:
     """
         Encrypts the attributes of the inverted index matrix.
 
         Parameters:
-            -
+            - encrypted_inverted_index_matrix_directory (Path) : The directory the encrypted parts are written to.
 
         Returns:
             :raises
@@ -222,6 +222,6 @@ def run() -> tuple[str, str]:
     encrypted_inverted_index_matrix = shuffle_dictionary(encrypted_inverted_index_matrix)
 
     # Writes the encrypted inverted index matrix.
-    write_encrypted_inverted_index_matrix(encrypted_inverted_index_matrix)
+    write_encrypted_inverted_index_matrix(encrypted_inverted_index_matrix, encrypted_inverted_index_matrix_directory)
 
     return encryption_key1.hex(), encryption_key2.hex()
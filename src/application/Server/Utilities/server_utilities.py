@@ -1,34 +1,32 @@
 """ Functionality of the server. """
 
 # Imports.
-from os import chdir
-from re import findall
+from shutil import rmtree, copytree
 from pathlib import Path, PosixPath
-from subprocess import Popen, PIPE
-from json import loads
+from json import loads, dump, load
 from random import shuffle
 
 # Local getters imports.
 from application.getters import (get_database_size as
                                  database_size)
-from application.getters import (get_mp_spdz_protocol as
-                                 mp_spdz_protocol)
-from application.getters import (get_encoding_base as
-                                 encoding_base)
-from application.getters import (get_mp_spdz_directory as
-                                 mp_spdz_directory)
-from application.getters import (get_working_directory as
-                                 working_directory)
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
 from application.getters import (get_number_of_blocks as
                                  number_of_blocks)
+from application.getters import (get_compare_exchanges_per_job as
+                                 compare_exchanges_per_job)
 from application.getters import (get_number_of_records as
                                  number_of_records)
+from application.getters import (get_number_of_query_jobs as
+                                 number_of_query_jobs)
+from application.getters import (get_embedding_dimension as
+                                 embedding_dimension)
 from application.getters import (get_encrypted_records_directory as
                                  encrypted_records_directory)
-from application.getters import (get_server_mp_spdz_input_path as
-                                 mp_spdz_input_path)
-from application.getters import (get_server_mp_spdz_output_path as
-                                 mp_spdz_output_path)
+from application.getters import (get_scratch_directory as
+                                 scratch_directory)
+from application.getters import (get_server_scratch_records_directory as
+                                 scratch_records_directory)
 from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
                                  aes_128_ecb_mpc_script_path)
 from application.getters import (get_inverted_index_matrix_encryption_key_path as
@@ -37,35 +35,73 @@ from application.getters import (get_server_semantic_indexing_path as
                                  semantic_indexing_path)
 from application.getters import (get_semantic_search_mpc_script_path as
                                  semantic_search_mpc_script_path)
-from application.getters import (get_records_directory as
-                                 records_directory)
-from application.getters import (get_excluded_records as
-                                 excluded_records)
 from application.getters import (get_server_record_pointers_path as
                                  record_indexing_path)
+from application.getters import (get_server_session_directory as
+                                 session_directory)
+from application.getters import (get_server_encrypted_inverted_index_matrix_directory as
+                                 encrypted_inverted_index_matrix_directory)
+from application.getters import (get_server_encryption_keys_directory as
+                                 encryption_keys_directory)
+from application.getters import (get_server_encrypted_inverted_index_matrix_manifest_path as
+                                 encrypted_inverted_index_matrix_manifest_path)
+from application.getters import (get_server_mpc_metrics_path as
+                                 server_mpc_metrics_path)
+
+# Binary encoding imports.
+from application.binary_encoding import encode_blocks, encode_words
+
+# Networking imports.
+from application.networking import get_file_digest
+
+# MPC imports.
+from application.MPC.backend import get_mpc_workers
 
 # Server imports.
 from application.Server.Utilities.key_stream_generator import get_key_stream
-from application.Server.Utilities.Data_Generation.generate_passenger_number_records import run as generate_passenger_number_records
-from application.Server.Utilities.semantic_indexing import run as create_semantic_indexing
-from application.Server.Utilities.inverted_index_matrix import run as create_inverted_index_matrix
 from application.Server.Utilities.record_encoder import encode_record
 from application.Server.Utilities.inverted_index_matrix_encryptor import run as encrypt_inverted_index_matrix
 
 
 class Utilities:
     """
-        Implements the functionality of the server.
+        Implements the functionality of the server for the session with one client. The plaintext records are shared
+        between the sessions, while the encrypted records and keys are kept apart in the session's own directory and
+        the MP-SPDZ parties run as the session's own workers.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, session_id: str, record_pointers: list[Path], port_base: int) -> None:
+        self.session_id = session_id
+        self.port_base = port_base
         self.is_semantic_search = None
         self.resume_from_previous_preprocessing = None
-        self.indexing_finished = False
-        self.record_pointers = None
+        self.record_pointers = record_pointers
         self.encrypted_record_pointers = None
         self.inverted_index_matrix_encryption_key1 = None
         self.inverted_index_matrix_encryption_key2 = None
+        self.encrypted_inverted_index_matrix_manifest = None
+        self.preprocessing_records_directory = encrypted_records_directory(session_id)
+        self.mpc_workers = get_mpc_workers(port_base)
+
+        return
+
+    def create_session_directories(self) -> None:
+        """
+            Creates the directories of the session, removing the files from a previous pre-processing.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        rmtree(session_directory(self.session_id), ignore_errors=True)
+        session_directory(self.session_id).mkdir(parents=True)
+        encrypted_records_directory(self.session_id).mkdir()
+        encrypted_inverted_index_matrix_directory(self.session_id).mkdir()
+        encryption_keys_directory(self.session_id).mkdir()
 
         return
 
@@ -84,27 +120,30 @@ class Utilities:
         # Tries to load the encryption key used to encrypt the inverted index matrix.
         try:
             if not self.inverted_index_matrix_encryption_key1 and not self.is_semantic_search:
-                with inverted_index_matrix_encryption_key_path().open('r') as f:
+                with inverted_index_matrix_encryption_key_path(self.session_id).open('r') as f:
                     keys = f.read().split(' ')
                     self.inverted_index_matrix_encryption_key1 = keys[0]
                     self.inverted_index_matrix_encryption_key2 = keys[1]
                     f.close()
 
             if not self.encrypted_record_pointers:
-                with record_indexing_path().open('r') as f:
+                with record_indexing_path(self.session_id).open('r') as f:
                     self.encrypted_record_pointers = eval(f.read())
                     f.close()
 
-            if self.is_semantic_search:
-                self.indexing_finished = True
+            if not self.encrypted_inverted_index_matrix_manifest and not self.is_semantic_search:
+                with encrypted_inverted_index_matrix_manifest_path(self.session_id).open('r') as f:
+                    self.encrypted_inverted_index_matrix_manifest = load(f)
+                    f.close()
         except FileNotFoundError:
             pass
 
         return
 
-    def generate_records(self) -> None:
+    def setup_and_encode_records(self) -> None:
         """
-            Generates the PNR records.
+            Encodes the records and stores them as raw blocks in the encrypted records directory. Additionally, fills
+            the database with dummy items.
 
             Parameters:
                 -
@@ -114,20 +153,56 @@ class Utilities:
                 -
         """
 
-        generate_passenger_number_records(number_of_records())
+        # Keeps the records in the scratch directory of the session during the pre-processing, when there is one,
+        # which only the user running the server can access.
+        if scratch_directory() is not None:
+            self.preprocessing_records_directory = scratch_records_directory(self.session_id)
+            rmtree(self.preprocessing_records_directory.parent, ignore_errors=True)
+            self.preprocessing_records_directory.parent.mkdir(mode=0o700, parents=True)
+            self.preprocessing_records_directory.mkdir(mode=0o700)
+
+        # Copies and encodes all records and dummy items into a new directory.
+        self.encrypted_record_pointers = list(self.record_pointers)
+        for i in range(len(self.record_pointers)):
+            record_path = self.record_pointers[i]
+            # Encodes records.
+            if record_path.suffix == ".json":
+                encoded_record = encode_record(record_path)
+            # Encodes dummy items.
+            else:
+                print('ranElse')
+                with record_path.open("r") as f:
+                    encoded_record = f.read()
+                    f.close()
+
+            # Stores the encoded copy.
+            new_path = self.preprocessing_records_directory / f"{i}.bin"
+            with new_path.open("wb") as f:
+                f.write(encode_blocks(encoded_record.split(' ')))
+                f.close()
+
+            # Updates the local pointers.
+            self.encrypted_record_pointers[i] = new_path
+
+        # Fills the remainder of the database with dummy items.
+        for i in range(number_of_records(), database_size()):
+            dummy_item = encode_blocks(get_key_stream()[0])
 
-        # Creates a list of pointers of the records and shuffles them.
-        record_paths = [path for path in records_directory().glob('*') if
-                        (path.name not in excluded_records()) and (path.suffix == '.json')]
+            # Writes the dummy item.
+            file_path = self.preprocessing_records_directory / f'{i}.bin'
+            with file_path.open('wb') as f:
+                f.write(dummy_item)
+                f.close()
 
-        self.record_pointers = record_paths.copy()
-        self.encrypted_record_pointers = record_paths
+            # Updates database pointers with the dummy item.
+            self.encrypted_record_pointers.append(file_path)
 
         return
 
-    def semantic_indexing(self) -> None:
+    def commit_encrypted_records(self) -> None:
         """
-            Creates a semantic indexing of the records.
+            Moves the shuffled records from the scratch directory to the encrypted records directory once the
+            pre-processing is finished, so the pre-processing itself does not write to the disk.
 
             Parameters:
                 -
@@ -137,13 +212,21 @@ class Utilities:
                 -
         """
 
-        create_semantic_indexing(self.record_pointers)
+        if self.preprocessing_records_directory == encrypted_records_directory(self.session_id):
+            return
+
+        # Copies the records and points to the copies.
+        copytree(self.preprocessing_records_directory, encrypted_records_directory(self.session_id),
+                 dirs_exist_ok=True)
+        self.encrypted_record_pointers = [encrypted_records_directory(self.session_id) / record_path.name
+                                          for record_path in self.encrypted_record_pointers]
+        self.remove_scratch_records()
 
         return
 
-    def create_inverted_index_matrix(self) -> None:
+    def remove_scratch_records(self) -> None:
         """
-            Creates an inverted index matrix of the records.
+            Removes the records of the session from the scratch directory.
 
             Parameters:
                 -
@@ -153,15 +236,16 @@ class Utilities:
                 -
         """
 
-        print('[INDEXING] Creating the inverted index matrix of the records.')
-        create_inverted_index_matrix(self.record_pointers)
+        if self.preprocessing_records_directory != encrypted_records_directory(self.session_id):
+            rmtree(self.preprocessing_records_directory.parent, ignore_errors=True)
+            self.preprocessing_records_directory = encrypted_records_directory(self.session_id)
 
         return
 
-    def setup_and_encode_records(self) -> None:
+    def close(self) -> None:
         """
-            Encodes the records and stores them in the encrypted records directory. Additionally, fills the database
-            with dummy items.
+            Stops the MPC workers of the session, writes the MPC metrics of the session and removes what is left in the
+            scratch directory.
 
             Parameters:
                 -
@@ -171,40 +255,10 @@ class Utilities:
                 -
         """
 
-        # Copies and encodes all records and dummy items into a new directory.
-        for i in range(len(self.record_pointers)):
-            record_path = self.record_pointers[i]
-            # Encodes records.
-            if record_path.suffix == ".json":
-                encoded_record = encode_record(record_path)
-            # Encodes dummy items.
-            else:
-                print('ranElse')
-                with record_path.open("r") as f:
-                    encoded_record = f.read()
-                    f.close()
-
-            # Stores the encoded copy.
-            new_path = encrypted_records_directory() / f"{i}.txt"
-            with new_path.open("w") as f:
-                f.write(encoded_record)
-                f.close()
-
-            # Updates the local pointers.
-            self.encrypted_record_pointers[i] = new_path
-
-        # Fills the remainder of the database with dummy items.
-        for i in range(number_of_records(), database_size()):
-            dummy_item = ' '.join(get_key_stream()[0])
-
-            # Writes the dummy item.
-            file_path = encrypted_records_directory() / f'{i}.txt'
-            with file_path.open('w') as f:
-                f.write(dummy_item)
-                f.close()
-
-            # Updates database pointers with the dummy item.
-            self.encrypted_record_pointers.append(file_path)
+        self.mpc_workers.close()
+        session_directory(self.session_id).mkdir(parents=True, exist_ok=True)
+        self.mpc_workers.metrics.write(server_mpc_metrics_path(self.session_id))
+        self.remove_scratch_records()
 
         return
 
@@ -220,21 +274,23 @@ class Utilities:
                 -
         """
 
-        with record_indexing_path().open('w') as f:
+        with record_indexing_path(self.session_id).open('w') as f:
             f.write(f'{self.encrypted_record_pointers}')
             f.close()
 
         return
 
-    def encrypt_records(self, index_a: int, index_b: int, mpc_script_name: str, host_address: str) -> None:
+    def encrypt_records(self, index_pairs: list[tuple[int, int]], mpc_script_name: str, host_address: str,
+                        worker: int) -> None:
         """
-            Obliviously encrypts the records with the client's keys.
+            Obliviously encrypts pairs of records with the client's keys, in a single job. A job of fewer than
+            compare_exchanges_per_job pairs is padded with pairs of zero blocks, whose outputs are discarded.
 
             Parameters:
-                - index_a (int) : Index to the pointer of a record.
-                - index_b (int) : Index of the pointer of a record.
+                - index_pairs (list[tuple[int, int]]) : The indices to the pointers of the two records of each pair.
                 - mpc_script_name (str) : Name of the .mpc script to be used.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - worker (int) : The number of the worker to run the job on.
 
             Returns:
                 :raises
@@ -242,22 +298,29 @@ class Utilities:
         """
 
         # Fetches the records.
-        record_a, record_b = self.get_records(index_a, index_b)
+        records = []
+        for index_a, index_b in index_pairs:
+            records.extend(self.get_records(index_a, index_b))
 
-        # Runs MP-SPDZ to obliviously encrypt the records with the client's keys then overwrites it.
+        # Runs MP-SPDZ to obliviously encrypt the records with the client's keys, then overwrites them.
         player_id = 0
-        self.write_mp_spdz_input(player_id, [record_a, record_b])
-        self.run_mp_spdz(player_id, mpc_script_name, host_address)
-        record_path_a = encrypted_records_directory() / f"{index_a}.txt"
-        record_path_b = encrypted_records_directory() / f"{index_b}.txt"
-        self.encrypted_record_pointers[index_a], self.encrypted_record_pointers[index_b] = record_path_a, record_path_b
-        self.write_mp_spdz_output_to_encrypted_records([record_path_a, record_path_b])
+        record_length = number_of_blocks() * number_of_bytes()
+        inputs = b''.join(records).ljust(compare_exchanges_per_job() * 2 * record_length, b'\0')
+        output = self.mpc_workers.run(player_id, mpc_script_name, host_address, inputs, worker)
+        record_paths = []
+        for index_a, index_b in index_pairs:
+            record_path_a = self.preprocessing_records_directory / f"{index_a}.bin"
+            record_path_b = self.preprocessing_records_directory / f"{index_b}.bin"
+            self.encrypted_record_pointers[index_a] = record_path_a
+            self.encrypted_record_pointers[index_b] = record_path_b
+            record_paths.extend([record_path_a, record_path_b])
+        self.write_mp_spdz_output_to_encrypted_records(output, record_paths)
 
         return
 
-    def get_records(self, index_a: int, index_b: int) -> tuple[list[str], list[str]]:
+    def get_records(self, index_a: int, index_b: int) -> tuple[bytes, bytes]:
         """
-            Obliviously encrypts the records with the client's keys.
+            Reads two records, which are the raw blocks the MPC jobs take as inputs.
 
             Parameters:
                 - index_a (int) : Index to the pointer of a record.
@@ -265,57 +328,40 @@ class Utilities:
 
             Returns:
                 :raises
-                - record_a (bytes) : The encrypted record.
-                - record_b (bytes) : The encrypted record.
+                - record_a (bytes) : The blocks of the encrypted record as raw bytes.
+                - record_b (bytes) : The blocks of the encrypted record as raw bytes.
         """
 
         # Fetches the records.
         record_path_a, record_path_b = self.encrypted_record_pointers[index_a], self.encrypted_record_pointers[index_b]
 
-        # Reads the record.
-        with record_path_a.open("r") as f:
-            record_a = f.read().split(' ')
-            f.close()
-
-        # Reads the record.
-        with record_path_b.open("r") as f:
-            record_b = f.read().split(' ')
-            f.close()
-
-        return record_a, record_b
+        return record_path_a.read_bytes(), record_path_b.read_bytes()
 
-    @staticmethod
-    def write_mp_spdz_input(player_id: int, records: list[list[str]]) -> None:
+    def run_mp_spdz(self, player_id: int, mpc_script_name: str, host_address: str, inputs: bytes) -> bytes:
         """
-            Writes records as correctly formatted inputs to be used with MP-SPDZ.
+            Runs a job on the session's worker for the server party of the MP-SPDZ execution. The workers use the
+            session's own port base, so that the executions of different sessions do not collide.
 
             Parameters:
-                - player_id (int) : The player ID the records will be written to.
-                - records (list[list[str]]) : The records is lists of blocks.
+                - player_id (int) : The player ID of the server.
+                - mpc_script_name (str) : Name of the .mpc script to be used.
+                - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
+                - inputs (bytes) : The server's inputs to the job as words.
 
             Returns:
-                :raises
-                -
+                :raises ChildProcessError
+                - output (bytes) : The output of the job as words, empty unless the server is party 0.
         """
 
-        # Writes every block of the records as decimals to the server's MP-SPDZ input file.
-        with open(mp_spdz_input_path().parent / f'{mp_spdz_input_path()}-P{player_id}-0', 'w') as f:
-            for i in range(len(records)):
-                for block in range(len(records[i])):
-                    f.write(f'{int(records[i][block], encoding_base())} ')
-                f.write('\n')
-            f.close()
-
-        return
+        return self.mpc_workers.run(player_id, mpc_script_name, host_address, inputs)
 
-    @staticmethod
-    def run_mp_spdz(player_id: int, mpc_script_name: str, host_address: str) -> None:
+    def warm_query_workers(self, host_address: str) -> None:
         """
-            Runs the server party and an additional empty party of the MP-SPDZ execution.
+            Starts the session's workers of the search query program in the background once the session is ready for
+            searches, so a search query only waits for the online part of its job. The workers then keep running
+            between the searches. The client warms its workers at the same point.
 
             Parameters:
-                - player_id (int) : The player ID the records will be written to.
-                - mpc_script_name (str) : Name of the .mpo script to be used.
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
 
             Returns:
@@ -323,37 +369,22 @@ class Utilities:
                 -
         """
 
-        # Temporarily sets a new working directory
-        chdir(mp_spdz_directory())
-
-        # Runs the server party.
-        server_mp_spdz_process = Popen([f"{mp_spdz_directory() / mp_spdz_protocol()}",
-                                        f"{mpc_script_name}",
-                                        "-p", f"{player_id}",
-                                        '-h', f'{host_address}',
-                                        "-IF", f"{mp_spdz_input_path()}",
-                                        "-OF", f"{mp_spdz_output_path()}"],
-                                       stdout=PIPE, stderr=PIPE
-                                       )
-
-        # Blocks until the process is finished and captures the standard out and standard error of the processes.
-        server_output, server_error = server_mp_spdz_process.communicate()
-
-        # Terminates the processes.
-        server_mp_spdz_process.kill()
-
-        # Changes back to the original working directory.
-        chdir(working_directory())
+        player_id = 1
+        if self.is_semantic_search:
+            mpc_script_name = semantic_search_mpc_script_path().stem
+        else:
+            mpc_script_name = aes_128_ecb_mpc_script_path().stem
+        self.mpc_workers.warm(player_id, mpc_script_name, host_address)
 
         return
 
-    @staticmethod
-    def write_mp_spdz_output_to_encrypted_records(record_paths: list[Path]) -> None:
+    def write_mp_spdz_output_to_encrypted_records(self, output: bytes, record_paths: list[Path]) -> None:
         """
-            Takes the output of the MP-SPDZ execution and writes it as an encrypted record to the encrypted records'
-            directory.
+            Takes the output of the MP-SPDZ execution and writes it as encrypted records to the directory of the records
+            during the pre-processing.
 
             Parameters:
+                - output (bytes) : The output of the MP-SPDZ execution as raw blocks.
                 - record_paths (list[Path]) : The paths of the records.
 
             Returns:
@@ -361,16 +392,11 @@ class Utilities:
                 -
         """
 
-        # Finds all the hexadecimal blocks in the server's output.
-        with open(mp_spdz_output_path().parent / f"{mp_spdz_output_path().name}-P0-0", "r") as f:
-            hexadecimals_pattern = r"0x([a-fA-F0-9]+)"
-            ciphertexts = findall(hexadecimals_pattern, f.read())
-            f.close()
-
         # Writes the new records back to the encrypted records' directory.
+        record_length = number_of_blocks() * number_of_bytes()
         for i in range(len(record_paths)):
-            with open(encrypted_records_directory() / record_paths[i], "w") as f:
-                f.write(' '.join(ciphertexts[i * number_of_blocks(): (i + 1) * number_of_blocks()]))
+            with record_paths[i].open("wb") as f:
+                f.write(output[i * record_length: (i + 1) * record_length])
                 f.close()
 
         return
@@ -388,12 +414,55 @@ class Utilities:
         """
 
         # Encrypts the inverted index matrix.
-        encryption_key1, encryption_key2 = encrypt_inverted_index_matrix()
+        directory = encrypted_inverted_index_matrix_directory(self.session_id)
+        encryption_key1, encryption_key2 = encrypt_inverted_index_matrix(directory)
 
         # Updates object variables.
         self.inverted_index_matrix_encryption_key1 = encryption_key1
         self.inverted_index_matrix_encryption_key2 = encryption_key2
         self.write_indexing_encryption_key()
+        self.write_encrypted_inverted_index_matrix_manifest()
+
+        return
+
+    def get_encrypted_inverted_index_matrix_part_path(self, part: int) -> Path:
+        """
+            Gets the path of a part of the encrypted inverted index matrix.
+
+            Parameters:
+                - part (int) : The number of the part.
+
+            Returns:
+                :raises
+                - part_path (Path) : The path of the part.
+        """
+
+        return encrypted_inverted_index_matrix_directory(self.session_id) / f'Encrypted_Inverted_Index_Matrix{part}.bin'
+
+    def write_encrypted_inverted_index_matrix_manifest(self) -> None:
+        """
+            Writes the size and digest of every part of the encrypted inverted index matrix, in the order of the parts,
+            so that the client can verify which parts it holds.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Describes each part of the encrypted inverted index matrix.
+        number_of_parts = len(list(encrypted_inverted_index_matrix_directory(self.session_id).glob('*.bin')))
+        self.encrypted_inverted_index_matrix_manifest = []
+        for part in range(number_of_parts):
+            part_path = self.get_encrypted_inverted_index_matrix_part_path(part)
+            self.encrypted_inverted_index_matrix_manifest.append([part_path.stat().st_size, get_file_digest(part_path)])
+
+        # Writes the manifest.
+        with encrypted_inverted_index_matrix_manifest_path(self.session_id).open('w') as f:
+            dump(self.encrypted_inverted_index_matrix_manifest, f)
+            f.close()
 
         return
 
@@ -409,7 +478,7 @@ class Utilities:
         """
 
         # Writes the encryption key.
-        with inverted_index_matrix_encryption_key_path().open("w") as f:
+        with inverted_index_matrix_encryption_key_path(self.session_id).open("w") as f:
             f.write(f'{self.inverted_index_matrix_encryption_key1} {self.inverted_index_matrix_encryption_key2}')
             f.close()
 
@@ -431,39 +500,37 @@ class Utilities:
             semantic_indexing = loads(f.read())
             f.close()
 
+        # Compares the search query embedding with the embedding of every record in a single job.
         player_id = 1
-        for index in semantic_indexing.keys():
-            self.write_embeddings_mp_spdz_input(player_id, semantic_indexing, index)
-            self.run_mp_spdz(player_id, semantic_search_mpc_script_path().stem, host_address)
+        self.run_mp_spdz(player_id, semantic_search_mpc_script_path().stem, host_address,
+                         self.get_embeddings_mp_spdz_input(semantic_indexing, list(semantic_indexing.keys())))
 
         return
 
     @staticmethod
-    def write_embeddings_mp_spdz_input(player_id: int, semantic_indexing: dict[str, list[int]], index: str) -> None:
+    def get_embeddings_mp_spdz_input(semantic_indexing: dict[str, list[int]], indices: list[str]) -> bytes:
         """
-            Writes an embedding vectory to the MP-SPDZ input file.
+            Encodes the embedding vectors of the records as inputs to be used with MPC. The records are padded up to
+            number_of_records with records of index -1 and an embedding of zeros, which the client disregards.
 
             Parameters:
-                - player_id (int) : The player ID the key streams will be written to.
                 - semantic_indexing (dict[str, list[int]]) : The embedding indexing of the records.
-                - index (str) : Index of the record.
+                - indices (list[str]) : Indices of the records.
             Returns:
                 :raises
-                -
+                - inputs (bytes) : The record indices followed by the values of their vector embeddings as words.
         """
 
-        # Writes each record indices and value of the vector embeddings.
-        with open(mp_spdz_input_path().parent / f'{mp_spdz_input_path()}-P{player_id}-0', 'w') as f:
-            f.write(f'{index} ')
-            for value in semantic_indexing[index]:
-                f.write(f'{value} ')
-            f.close()
+        padding = number_of_records() - len(indices)
+        embeddings = [value for index in indices for value in semantic_indexing[index]]
 
-        return
+        return encode_words([int(index) for index in indices] + [-1] * padding +
+                            embeddings + [0] * (padding * embedding_dimension()), signed=True)
 
     def encrypt_query(self, host_address: str) -> None:
         """
-            Obliviously encrypts the client's search query with the server's inverted index matrix encryption key.
+            Obliviously encrypts the terms of the client's search query with both of the server's inverted index matrix
+            encryption keys, in the number_of_query_jobs jobs every search query is padded to.
 
             Parameters:
                 - host_address (str) : The hostname of the party to host the MP-SPDZ execution.
@@ -473,14 +540,11 @@ class Utilities:
                 -
         """
 
-        # Runs MP-SPDZ to obliviously encrypt the client's search query.
+        # Runs MP-SPDZ to obliviously encrypt the client's search query, with both keys in every job and the jobs
+        # running concurrently.
         player_id = 1
-        self.write_mp_spdz_input(player_id, [[self.inverted_index_matrix_encryption_key1]])
-        mpc_script_name = aes_128_ecb_mpc_script_path().stem
-        self.run_mp_spdz(player_id, mpc_script_name, host_address)
-
-        self.write_mp_spdz_input(player_id, [[self.inverted_index_matrix_encryption_key2]])
         mpc_script_name = aes_128_ecb_mpc_script_path().stem
-        self.run_mp_spdz(player_id, mpc_script_name, host_address)
+        keys = bytes.fromhex(self.inverted_index_matrix_encryption_key1 + self.inverted_index_matrix_encryption_key2)
+        self.mpc_workers.map(player_id, mpc_script_name, host_address, [keys] * number_of_query_jobs())
 
         return
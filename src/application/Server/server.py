@@ -1,20 +1,20 @@
 """ Handling the communication with the client. """
 
 # Imports.
-from time import sleep
-from threading import Thread
-from socket import socket, AF_INET, SOCK_STREAM, SOL_SOCKET, SO_REUSEADDR, timeout, SHUT_WR
-from ssl import SSLContext, PROTOCOL_TLS_CLIENT, PROTOCOL_TLS_SERVER, SSLSocket
+from pathlib import Path
+from threading import Thread, Lock as ThreadLock
+from asyncio import StreamReader, StreamWriter, Event, Lock, new_event_loop, set_event_loop, start_server
+from asyncio import Task, create_task, current_task, gather
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps
+from ssl import SSLContext, PROTOCOL_TLS_SERVER, CERT_REQUIRED
 
 # Local getter imports.
 from application.getters import (get_server_ip as
                                  server_ip)
 from application.getters import (get_server_port as
                                  server_port)
-from application.getters import (get_client_ip as
-                                 client_ip)
-from application.getters import (get_client_port as
-                                 client_port)
 from application.getters import (get_number_of_dummy_items as
                                  number_of_dummy_items)
 from application.getters import (get_server_networking_key_path as
@@ -27,102 +27,139 @@ from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_pa
                                  sort_and_encrypt_with_circuit_mpc_script_path)
 from application.getters import (get_sort_and_reencrypt_with_circuit_mpc_script_path as
                                  sort_and_reencrypt_with_circuit_mpc_script_path)
-from application.getters import (get_server_encrypted_inverted_index_matrix_directory as
-                                 encrypted_inverted_index_matrix_directory)
+from application.getters import (get_index_synchronization_rounds as
+                                 index_synchronization_rounds)
+from application.getters import (get_number_of_records as
+                                 number_of_records)
+from application.getters import (get_records_directory as
+                                 records_directory)
+from application.getters import (get_excluded_records as
+                                 excluded_records)
+from application.getters import (get_inverted_index_matrix_path as
+                                 inverted_index_matrix_path)
+from application.getters import (get_server_semantic_indexing_path as
+                                 semantic_indexing_path)
+from application.getters import (get_server_worker_pool_size as
+                                 server_worker_pool_size)
+from application.getters import (get_maximum_number_of_sessions as
+                                 maximum_number_of_sessions)
+from application.getters import (get_mp_spdz_port_base as
+                                 mp_spdz_port_base)
+from application.getters import (get_mp_spdz_ports_per_session as
+                                 mp_spdz_ports_per_session)
+from application.getters import (get_mp_spdz_workers_per_program as
+                                 mp_spdz_workers_per_program)
+from application.getters import (get_compare_exchanges_per_job as
+                                 compare_exchanges_per_job)
+
+# Networking imports.
+from application.networking import AsyncConnection, MessageType, Phase, SessionState
+from application.networking import INTEGER, encode_integers, decode_integers
 
 # Server utility imports.
 from application.Server.Utilities.server_utilities import Utilities
+from application.Server.Utilities.Data_Generation.generate_passenger_number_records import run as generate_passenger_number_records
+from application.Server.Utilities.semantic_indexing import run as create_semantic_indexing
+from application.Server.Utilities.inverted_index_matrix import run as create_inverted_index_matrix
 
 
-class Communicator(Utilities):
+class Session(Utilities):
     """
-        Establishes a secure communication channel between the server and client.
+        Holds the state of the session with one client.
     """
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, session_id: str, record_pointers: list[Path], port_slot: int, connection: AsyncConnection,
+                 client_address: str) -> None:
+        super().__init__(session_id, record_pointers, mp_spdz_port_base() + port_slot * mp_spdz_ports_per_session())
+
+        self.port_slot = port_slot
+        self.connection = connection
+        self.attached_connections = set()
+        self.client_address = client_address
+        self.state = SessionState()
+        self.task = None
+
+        # The searches of a session run one at a time on the session's ports, whereas the record encryptions are
+        # scheduled onto the workers by the client.
+        self.mpc_lock = Lock()
+
+        return
+
+
+class Communicator:
+    """
+        Establishes secure communication channels between the server and its clients, serving each client in a session
+        of its own.
+    """
 
-        self.HEADER = 1024
+    def __init__(self) -> None:
         self.LISTEN_PORT = server_port()
         self.HOST = server_ip()
         self.ADDR = (self.HOST, self.LISTEN_PORT)
-        self.CLIENT_ADDR = (client_ip(), client_port())
-        self.FORMAT = 'utf-8'
-
-        self.ONLINE_MESSAGE = '<ONLINE>'
-        self.SENDING_NUMBER_OF_DUMMY_ITEMS = '<SENDING NUMBER OF DUMMY ITEMS>'
-        self.RECORDS_PREPROCESSING_MESSAGE = '<RECORDS PRE-PROCESSING>'
-        self.ENCRYPT_RECORDS_MESSAGE = '<ENCRYPT RECORDS>'
-        self.REENCRYPT_RECORDS_MESSAGE = '<REENCRYPT RECORDS>'
-        self.RECORDS_PREPROCESSING_FINISHED_MESSAGE = '<RECORDS PRE-PROCESSING FINISHED>'
-        self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MESSAGE = '<SENDING ENCRYPTED INVERTED INDEX MATRIX>'
-        self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED_MESSAGE = \
-            '<SENDING ENCRYPTED INVERTED INDEX MATRIX FINISHED>'
-        self.SEMANTIC_SEARCH_MESSAGE = '<SEMANTIC SEARCH>'
-        self.ENCRYPT_QUERY_MESSAGE = '<ENCRYPT QUERY>'
-        self.REQUEST_ENCRYPTED_RECORD_MESSAGE = '<REQUESTING ENCRYPTED RECORD>'
-        self.DISCONNECT_MESSAGE = '<DISCONNECT>'
-        self.END_FILE_MESSAGE = '<END FILE>'
-        self.SHUTDOWN_MESSAGE = '<SHUTTING DOWN>'
 
+        # Only clients holding the client certificate are accepted.
         self.server_context = SSLContext(PROTOCOL_TLS_SERVER)
         self.server_context.load_cert_chain(certfile=server_networking_certificate_path(),
                                             keyfile=server_networking_key_path())
-        self.client_context = SSLContext(PROTOCOL_TLS_CLIENT)
-        self.client_context.load_verify_locations(client_networking_certificate_path())
-        self.listen_host = self.server_context.wrap_socket(socket(AF_INET, SOCK_STREAM), server_side=True)
-        self.listen_host.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
-        self.listen_host.settimeout(0.1)
+        self.server_context.verify_mode = CERT_REQUIRED
+        self.server_context.load_verify_locations(client_networking_certificate_path())
 
-        self.close = False
+        # The event loop serves the connections while blocking work is offloaded to the executor.
+        self.loop = new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=server_worker_pool_size())
+        self.closed = Event()
         self.run_thread = Thread(target=self.run)
-        self.run_thread.start()
 
-        self.client_online = False
-        self.records_preprocessing_finished = False
+        # The records and their indexing are shared by all sessions.
+        self.record_pointers = None
+        self.indexing_lock = ThreadLock()
+
+        # The task handling each open connection. Every active session holds one of the slots of MP-SPDZ ports.
+        self.connections = {}
+        self.sessions = {}
+        self.free_port_slots = list(range(maximum_number_of_sessions()))
 
         return
 
-    def wait_for_client(self) -> None:
+    def setup_records(self, generate_records: bool) -> None:
         """
-            Waiting for the client to connect, then receives if it should resume from previous pre-processing.
+            Sets up the records shared by all sessions, generating new ones if requested or if there are none.
 
             Parameters:
-                -
+                - generate_records (bool) : Whether to generate new records.
 
             Returns:
                 :raises
                 -
         """
-    
-        # Tries to send online message to the client.
-        try:
-            self.send_online_message()
-        except ConnectionRefusedError:
-            print(f'[CONNECTING] Waiting for the client.')
-        
-        # Waits until the client is online.
-        while not self.client_online:
-            sleep(0.1)
-        
-        # Sends online message and receives response on whether to resume form previous pre-processing or not.
-        self.send_online_message()
-        while self.is_semantic_search is None:
-            sleep(0.1)
-        while self.resume_from_previous_preprocessing is None:
-            sleep(0.1)
-
-        # If true resumes from previous pre-processing.
-        if self.resume_from_previous_preprocessing:
-            self.resume()
-
-        print(f'[CONNECTED] Connected to the client.')
+
+        if generate_records or not self.get_record_paths():
+            generate_passenger_number_records(number_of_records())
+
+        # The pointers are sorted so that the indices of the records are the same for every session.
+        self.record_pointers = sorted(self.get_record_paths())
 
         return
 
-    def send_online_message(self) -> None:
+    @staticmethod
+    def get_record_paths() -> list[Path]:
         """
-            Sends online message to the client.
+            Finds the paths of the stored records.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - record_paths (list[Path]) : The paths of the records.
+        """
+
+        return [path for path in records_directory().glob('*') if
+                (path.name not in excluded_records()) and (path.suffix == '.json')]
+
+    def start(self) -> None:
+        """
+            Starts listening for clients.
 
             Parameters:
                 -
@@ -132,19 +169,13 @@ class Communicator(Utilities):
                 -
         """
 
-        # Sends online message to the client.
-        connection = self.client_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=client_networking_certificate_path().stem)
-        connection.connect(self.CLIENT_ADDR)
-        connection.sendall(self.add_padding(self.ONLINE_MESSAGE))
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        self.run_thread.start()
 
         return
 
-    def wait_for_records_preprocessing(self) -> None:
+    def wait_for_close(self) -> None:
         """
-            Waits until the client is ready to start the records pre-processing.
+            Blocks until the server is closed.
 
             Parameters:
                 -
@@ -154,15 +185,13 @@ class Communicator(Utilities):
                 -
         """
 
-        # Waits until the pre-processing finished message is received from the client.
-        while not self.records_preprocessing_finished:
-            sleep(0.1)
+        self.run_thread.join()
 
         return
 
-    def wait_for_client_shutdown(self) -> None:
+    def create_inverted_index_matrix(self) -> None:
         """
-            Waits until the client shuts down.
+            Creates the inverted index matrix of the records, unless another session already has.
 
             Parameters:
                 -
@@ -172,15 +201,16 @@ class Communicator(Utilities):
                 -
         """
 
-        # Waits until the shutdown message is received from the client.
-        while self.client_online:
-            sleep(1)
+        with self.indexing_lock:
+            if not inverted_index_matrix_path().exists():
+                print('[INDEXING] Creating the inverted index matrix of the records.')
+                create_inverted_index_matrix(self.record_pointers)
 
         return
 
-    def wait_for_indexing(self) -> None:
+    def create_semantic_indexing(self) -> None:
         """
-            Waits until the indexing is complete.
+            Creates a semantic indexing of the records, unless another session already has.
 
             Parameters:
                 -
@@ -190,129 +220,229 @@ class Communicator(Utilities):
                 -
         """
 
-        # Waits until the shutdown message is received from the client.
-        while not self.indexing_finished:
-            sleep(1)
+        with self.indexing_lock:
+            if not semantic_indexing_path().exists():
+                print('[INDEXING] Creating the semantic indexing of the records.')
+                create_semantic_indexing(self.record_pointers)
+                print('[INDEXING FINISHED] Finished creating the semantic indexing.')
 
         return
 
-    def add_padding(self, message: str) -> bytes:
+    async def serve_session(self, session: Session) -> None:
         """
-            Encodes and adds the appropriate padding to a message to match the header size.
+            Runs the pre-processing of a session, then starts serving the client's searches and record requests.
 
             Parameters:
-                - message (str) : The message to be padded.
+                - session (Session) : The session with the client.
 
             Returns:
                 :raises
-                - message (bytes) : The padded message.
+                -
         """
 
-        # Encodes the message and pads it with null bytes.
-        message = message.encode(self.FORMAT)
-        message += b'\x00' * (self.HEADER - len(message))
+        # If true resumes from previous pre-processing, completes the client's copy of the encrypted inverted index
+        # matrix, then starts serving the client.
+        if session.resume_from_previous_preprocessing:
+            await self.loop.run_in_executor(self.executor, session.resume)
+            if not session.is_semantic_search:
+                await self.send_encrypted_inverted_index_matrix(session)
+            session.state.advance(Phase.SERVING)
+            session.warm_query_workers(session.client_address)
+            return
+
+        # Removes the files of the previous pre-processing of the session.
+        await self.loop.run_in_executor(self.executor, session.create_session_directories)
+
+        # Requests dummy items from the client to fill the database to the required size.
+        await self.send_number_of_dummy_items(session)
 
-        return message
+        # Waits for the client to finish the records pre-processing.
+        await session.state.reached(Phase.PREPROCESSING)
 
-    def wait(self, connection: SSLSocket) -> None:
+        if not session.is_semantic_search:
+            # Creates the inverted index matrix of the records and encrypts it under the session's keys.
+            await self.loop.run_in_executor(self.executor, self.create_inverted_index_matrix)
+            await self.loop.run_in_executor(self.executor, session.encrypt_inverted_index_matrix)
+
+            # Sends the encrypted inverted index matrix to the client.
+            await self.send_encrypted_inverted_index_matrix(session)
+        else:
+            # Creates a semantic indexing of the records.
+            await self.loop.run_in_executor(self.executor, self.create_semantic_indexing)
+            session.state.advance(Phase.INDEX_SENT)
+
+        # Standby for searching and sending encrypted records until the client goes offline, with the workers of the
+        # search query program warmed.
+        session.state.advance(Phase.SERVING)
+        session.warm_query_workers(session.client_address)
+
+        return
+
+    async def send_number_of_dummy_items(self, session: Session) -> None:
         """
-            Waits until the disconnect message is received from the client.
+            Sends the number of dummy items in the database to the client.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - session (Session) : The session with the client.
 
             Returns:
                 :raises
                 -
         """
 
-        # Waits until the disconnect message is received from the client.
-        while (connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))) != self.DISCONNECT_MESSAGE:
-            sleep(0.01)
+        # Sends the amount of dummy items needed.
+        print(f'[SENT] {MessageType.SENDING_NUMBER_OF_DUMMY_ITEMS} to client {session.session_id}.')
+        await session.connection.request(MessageType.SENDING_NUMBER_OF_DUMMY_ITEMS,
+                                         encode_integers(number_of_dummy_items()))
+        session.state.advance(Phase.DUMMY_COUNT)
 
         return
 
-    def send_number_of_dummy_items(self) -> None:
+    async def send_encrypted_inverted_index_matrix(self, session: Session) -> None:
         """
-            Sends the number of dummy items in the database to the client.
+            Synchronizes the encrypted inverted index matrix with the client. The client compares the manifest of the
+            parts with the parts it holds and answers with the parts that are missing or corrupt, which are then sent.
+            This repeats until the client holds every part intact, so an interrupted transfer is resumed rather than
+            redone.
 
             Parameters:
+                - session (Session) : The session with the client.
+
+            Returns:
+                :raises ConnectionError
                 -
+        """
+
+        manifest = dumps(session.encrypted_inverted_index_matrix_manifest or []).encode()
+
+        for _ in range(index_synchronization_rounds()):
+
+            # Sends the manifest and receives the parts the client needs.
+            print(f'[SENT] {MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MANIFEST} to client '
+                  f'{session.session_id}.')
+            response = await session.connection.request(MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MANIFEST,
+                                                        manifest)
+            if not (parts := decode_integers(response)):
+                break
+
+            # Streams each requested part of the encrypted inverted index matrix from disk to the client.
+            print(f'[SENT] {MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX} to client {session.session_id}.')
+            for part in parts:
+                await session.connection.request_file(MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX,
+                                                      session.get_encrypted_inverted_index_matrix_part_path(part))
+        else:
+            raise ConnectionError(f'The encrypted inverted index matrix of {session.session_id} could not be synced.')
+
+        # Sends the sending encrypted inverted index matrix finished message to the client.
+        await session.connection.request(MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED)
+        print(f'[SENT] {MessageType.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED} to client {session.session_id}.')
+        session.state.advance(Phase.INDEX_SENT)
+
+        return
+
+    async def received_online_message(self, connection: AsyncConnection, tag: int, payload: bytes) -> None:
+        """
+            Receives the client's session ID and whether it performs semantic searches and resumes from previous
+            pre-processing, then opens the session. Clients are refused when the server is full or the session is
+            already active.
+
+            Parameters:
+                - connection (AsyncConnection) : Connection with the client.
+                - tag (int) : Tag of the request.
+                - payload (bytes) : The client's responses followed by its session ID.
 
             Returns:
                 :raises
                 -
         """
 
-        # Sends the amount of dummy items needed.
-        connection = self.client_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=client_networking_certificate_path().stem)
-        connection.connect(self.CLIENT_ADDR)
-        connection.sendall(self.add_padding(self.SENDING_NUMBER_OF_DUMMY_ITEMS))
-        connection.sendall(self.add_padding(str(number_of_dummy_items())))
-        print(f'[SENT] {self.SENDING_NUMBER_OF_DUMMY_ITEMS} to client.')
+        # Reads the client's responses and session ID.
+        is_semantic_search, resume_from_previous_preprocessing = decode_integers(payload[:2 * INTEGER.size])
+        session_id = payload[2 * INTEGER.size:].decode()
+
+        # Refuses the client if the session ID is not valid or there is no room for another session.
+        if (not session_id.isalnum()) or (session_id in self.sessions) or (not self.free_port_slots):
+            print(f'[REFUSED] Client {session_id}.')
+            await connection.close()
+            return
+
+        # Opens the session on a free slot of MP-SPDZ ports.
+        client_address, client_port = connection.writer.get_extra_info('peername')[:2]
+        session = Session(session_id, self.record_pointers, self.free_port_slots.pop(0), connection, client_address)
+        session.is_semantic_search = bool(is_semantic_search)
+        session.resume_from_previous_preprocessing = bool(resume_from_previous_preprocessing)
+        self.sessions[session_id] = session
+        connection.session = session
 
-        self.wait(connection)
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        # Answers with the port base of the session's MP-SPDZ executions.
+        await connection.respond(tag, encode_integers(session.port_base))
+        session.state.advance(Phase.ONLINE)
+        print(f'[CONNECTED] Connected to client {session_id}.')
+
+        # Runs the pre-processing of the session alongside the handling of the client's requests.
+        session.task = create_task(self.serve_session(session))
+        session.task.add_done_callback(partial(self.session_task_done, session))
 
         return
 
-    def send_encrypted_inverted_index_matrix(self) -> None:
+    @staticmethod
+    def session_task_done(session: Session, task: Task) -> None:
         """
-            Sends the encrypted inverted index matrix to the client.
+            Logs the error of a session whose pre-processing failed and closes its connection, so the client's pending
+            requests fail instead of waiting forever.
 
             Parameters:
-                -
+                - session (Session) : The session with the client.
+                - task (Task) : The finished task serving the session.
 
             Returns:
                 :raises
                 -
         """
 
-        encrypted_inverted_index_matrix_part_paths = [path for path in
-                                                      encrypted_inverted_index_matrix_directory().glob('*')]
-        print(f'[SENT] {self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MESSAGE} to client.')
+        if task.cancelled() or (error := task.exception()) is None:
+            return
+
+        print(f'[ERROR] Serving client {session.session_id} failed: {error!r}')
+        session.connection.writer.close()
 
-        # Sends each part of the encrypted inverted index matrix to the client.
-        for encrypted_inverted_index_matrix_part_path in encrypted_inverted_index_matrix_part_paths:
-            connection = self.client_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                         server_hostname=client_networking_certificate_path().stem)
-            connection.connect(self.CLIENT_ADDR)
-            connection.sendall(self.add_padding(self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MESSAGE))
+        return
 
-            # Reads the encrypted inverted index matrix.
-            with encrypted_inverted_index_matrix_part_path.open('r') as f:
-                encrypted_inverted_index_matrix_part = f.read()
-                f.close()
+    async def received_attach_message(self, connection: AsyncConnection, tag: int, payload: bytes) -> None:
+        """
+            Attaches a further connection from a client to its active session, which the client fetches records over.
+            Connections to sessions that are not active are refused.
 
-            # Sends the encrypted inverted index matrix part to the client.
-            message_bytes = str.encode(encrypted_inverted_index_matrix_part)
-            for i in range(0, len(message_bytes), self.HEADER):
-                connection.sendall(self.add_padding((message_bytes[i: i + self.HEADER]).decode(self.FORMAT)))
-            connection.sendall(self.add_padding(self.END_FILE_MESSAGE))
+            Parameters:
+                - connection (AsyncConnection) : Connection with the client.
+                - tag (int) : Tag of the request.
+                - payload (bytes) : The client's session ID.
 
-            self.wait(connection)
-            connection.shutdown(SHUT_WR)
-            connection.close()
+            Returns:
+                :raises
+                -
+        """
 
-        # Sends the sending encrypted inverted index matrix finished message to the client.
-        connection = self.client_context.wrap_socket(socket(AF_INET, SOCK_STREAM),
-                                                     server_hostname=client_networking_certificate_path().stem)
-        connection.connect(self.CLIENT_ADDR)
-        connection.sendall(self.add_padding(self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED_MESSAGE))
-        print(f'[SENT] {self.SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED_MESSAGE} to client.')
-        connection.shutdown(SHUT_WR)
-        connection.close()
+        # Refuses the connection if the session is not active.
+        if (session := self.sessions.get(payload.decode())) is None:
+            await connection.close()
+            return
+
+        connection.session = session
+        session.attached_connections.add(connection)
+        await connection.respond(tag)
 
         return
 
-    def received_records_preprocessing_message(self, connection: SSLSocket) -> None:
+    async def received_records_preprocessing_message(self, session: Session, connection: AsyncConnection,
+                                                     tag: int) -> None:
         """
-            Performs the server side of the records pre-processing.
+            Prepares the server side of the records pre-processing.
 
             Parameters:
-                - connection (SSLSocket) : The connection with the client.
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
 
             Returns:
                 :raises
@@ -320,26 +450,47 @@ class Communicator(Utilities):
         """
 
         # Server side of the records pre-processing
-        self.setup_and_encode_records()
+        await self.loop.run_in_executor(self.executor, session.setup_and_encode_records)
+
+        await connection.respond(tag)
+
+        return
+
+    async def received_records_preprocessing_finished_message(self, session: Session, connection: AsyncConnection,
+                                                              tag: int) -> None:
+        """
+            Finishes the server side of the records pre-processing.
+
+            Parameters:
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
 
-        while (message := connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))) != self.RECORDS_PREPROCESSING_FINISHED_MESSAGE:
-            if message == self.ENCRYPT_RECORDS_MESSAGE:
-                self.mp_spdz_record_encryption(connection, sort_and_encrypt_with_circuit_mpc_script_path().stem)
-            elif message == self.REENCRYPT_RECORDS_MESSAGE:
-                self.mp_spdz_record_encryption(connection, sort_and_reencrypt_with_circuit_mpc_script_path().stem)
+            Returns:
+                :raises
+                -
+        """
 
-        print(f'[RECEIVED] {message} from client.')
-        self.write_encrypted_record_pointers()
-        self.records_preprocessing_finished = True
+        # The client only finishes once every record encryption is written, so the records can be committed.
+        await self.loop.run_in_executor(self.executor, session.commit_encrypted_records)
+        await self.loop.run_in_executor(self.executor, session.write_encrypted_record_pointers)
+
+        await connection.respond(tag)
+        session.state.advance(Phase.PREPROCESSING)
 
         return
 
-    def mp_spdz_record_encryption(self, connection: SSLSocket, mpc_script_name: str) -> None:
+    async def mp_spdz_record_encryption(self, session: Session, connection: AsyncConnection, tag: int, payload: bytes,
+                                        mpc_script_name: str) -> None:
         """
-            Obliviously encrypts, with the client's keys, two records of the client's choosing.
+            Obliviously encrypts, with the client's keys, pairs of records of the client's choosing. The jobs of
+            different workers run concurrently, the client only sending jobs on records whose previous jobs are done.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
+                - payload (bytes) : The worker to run the job on, then the two indices of the records of each pair.
                 - mp_spdz_script_name (str): Name of the .mpc script to be used.
 
             Returns:
@@ -347,149 +498,221 @@ class Communicator(Utilities):
                 -
         """
 
-        # Receives two indices from the client.
-        index_a = int(connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0)))
-        index_b = int(connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0)))
-        connection.sendall(self.add_padding(self.DISCONNECT_MESSAGE))
-
-        # Obliviously encrypts the requested records, with the client's key.
-        if index_a is not None and index_b is not None:
-            address, port = self.ADDR
-            self.encrypt_records(index_a, index_b, mpc_script_name, address)
-        else:
+        # Receives the worker and the pairs of indices from the client, which must be distinct records of the database.
+        worker, *indices = decode_integers(payload)
+        index_pairs = list(zip(indices[0::2], indices[1::2]))
+        if (not index_pairs or len(indices) % 2 != 0 or len(index_pairs) > compare_exchanges_per_job() or
+                worker >= mp_spdz_workers_per_program() or len(set(indices)) != len(indices) or
+                max(indices) >= len(session.encrypted_record_pointers)):
             raise ValueError('The received indices are not valid.')
 
+        # Obliviously encrypts the requested records with the client's key, then tells the client they are written.
+        await connection.respond_stream(tag, b'')
+        address, port = self.ADDR
+        await self.loop.run_in_executor(self.executor, session.encrypt_records,
+                                        index_pairs, mpc_script_name, address, worker)
+        await connection.respond(tag)
+
         return
 
-    def create_semantic_indexing(self) -> None:
+    async def received_semantic_search_message(self, session: Session, connection: AsyncConnection, tag: int) -> None:
         """
-            Creates a semantic indexing of the records.
+            Obliviously compares the search query embedding to the embedding of each record.
 
             Parameters:
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
+
+            Returns:
+                :raises
                 -
+        """
+
+        # Answers the client and runs the server side of the semantic search.
+        async with session.mpc_lock:
+            await connection.respond(tag)
+            await self.loop.run_in_executor(self.executor, session.semantic_search, session.client_address)
+
+        return
+
+    async def received_encrypt_query_message(self, session: Session, connection: AsyncConnection, tag: int) -> None:
+        """
+            Oblivious encrypts the client's search query under the server's key.
+
+            Parameters:
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
 
             Returns:
                 :raises
                 -
         """
-        print('[INDEXING] Creating the semantic indexing of the records.')
-        self.semantic_indexing()
 
-        print('[INDEXING FINISHED] Finished creating the semantic indexing.')
-        self.indexing_finished = True
+        # Answers the client and obliviously encrypts the client's search query with the server's key.
+        async with session.mpc_lock:
+            await connection.respond(tag)
+            await self.loop.run_in_executor(self.executor, session.encrypt_query, session.client_address)
 
         return
 
-    def received_semantic_search_message(self, connection: SSLSocket) -> None:
+    async def send_encrypted_records(self, session: Session, connection: AsyncConnection,
+                                     tag: int, payload: bytes) -> None:
         """
-            Obliviously compares the search query embedding to the embedding of each record.
+            Streams a batch of requested encrypted records to the client, in the order they were requested.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - session (Session) : The session with the client.
+                - connection (AsyncConnection) : Connection the request was received on.
+                - tag (int) : Tag of the request.
+                - payload (bytes) : Indices to the pointers of the encrypted records.
 
             Returns:
                 :raises
                 -
         """
 
-        # Closes the connection with the client.
-        connection.sendall(self.add_padding(self.DISCONNECT_MESSAGE))
+        indices = decode_integers(payload)
+        if any(index >= len(session.encrypted_record_pointers) for index in indices):
+            raise ValueError('The requested indices are not valid.')
+
+        # Starts reading every requested encrypted record, so that the later reads overlap with sending the earlier.
+        encrypted_record_reads = [self.loop.run_in_executor(self.executor,
+                                                            session.encrypted_record_pointers[index].read_bytes)
+                                  for index in indices]
 
-        # Runs the server side of the semantic search.
-        address, port = self.CLIENT_ADDR
-        self.semantic_search(address)
+        # Streams the encrypted records to the client, then ends the stream.
+        for encrypted_record_read in encrypted_record_reads:
+            await connection.respond_stream(tag, await encrypted_record_read)
+        await connection.respond(tag)
 
         return
 
-    def received_encrypt_query_message(self, connection: SSLSocket) -> None:
+    async def receive(self, connection: AsyncConnection, tag: int, message_type: MessageType, payload: bytes) -> None:
         """
-            Oblivious encrypts the client's search query under the server's key.
+            Handling of received messages from a client.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - connection (AsyncConnection) : Connection with the client.
+                - tag (int) : Tag of the request.
+                - message_type (MessageType) : The type of the request.
+                - payload (bytes) : The payload of the request.
 
             Returns:
                 :raises
                 -
         """
 
-        # Closes the connection with the client.
-        connection.sendall(self.add_padding(self.DISCONNECT_MESSAGE))
-
-        # Obliviously encrypts the client's search query with the server's key.
-        address, port = self.CLIENT_ADDR
-        self.encrypt_query(address)
+        # Messages other than the online and attach messages belong to the session of the connection.
+        if message_type == MessageType.ONLINE:
+            print(f'[RECEIVED] {message_type} from client.')
+            await self.received_online_message(connection, tag, payload)
+            return
+        elif message_type == MessageType.ATTACH:
+            await self.received_attach_message(connection, tag, payload)
+            return
+        elif (session := connection.session) is None:
+            return
+
+        # Handles the message from the client accordingly.
+        if message_type == MessageType.RECORDS_PREPROCESSING:
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await self.received_records_preprocessing_message(session, connection, tag)
+        elif message_type == MessageType.ENCRYPT_RECORDS:
+            await self.mp_spdz_record_encryption(session, connection, tag, payload,
+                                                 sort_and_encrypt_with_circuit_mpc_script_path().stem)
+        elif message_type == MessageType.REENCRYPT_RECORDS:
+            await self.mp_spdz_record_encryption(session, connection, tag, payload,
+                                                 sort_and_reencrypt_with_circuit_mpc_script_path().stem)
+        elif message_type == MessageType.RECORDS_PREPROCESSING_FINISHED:
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await self.received_records_preprocessing_finished_message(session, connection, tag)
+        elif message_type == MessageType.SEMANTIC_SEARCH:
+            await session.state.reached(Phase.SERVING)
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await self.received_semantic_search_message(session, connection, tag)
+        elif message_type == MessageType.ENCRYPT_QUERY:
+            await session.state.reached(Phase.SERVING)
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await self.received_encrypt_query_message(session, connection, tag)
+        elif message_type == MessageType.REQUESTING_ENCRYPTED_RECORDS:
+            await session.state.reached(Phase.SERVING)
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await self.send_encrypted_records(session, connection, tag, payload)
+        elif message_type == MessageType.SHUTTING_DOWN:
+            print(f'[RECEIVED] {message_type} from client {session.session_id}.')
+            await connection.respond(tag)
+            session.state.advance(Phase.SHUTDOWN)
 
         return
 
-    def send_encrypted_record(self, connection: SSLSocket) -> None:
+    async def close_session(self, session: Session) -> None:
         """
-            Sends a requested encrypted record to the client.
+            Closes a session, stopping its MP-SPDZ workers and freeing its slot of MP-SPDZ ports. A session is closed
+            once, whether its client disconnects or the server shuts down.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - session (Session) : The session with the client.
 
             Returns:
                 :raises
                 -
         """
 
-        # Fetches the requested encrypted record.
-        index = int(connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0)))
-        encrypted_record_path = self.encrypted_record_pointers[index]
-        with encrypted_record_path.open('r') as f:
-            encrypted_record = f.read()
-            f.close()
+        if self.sessions.get(session.session_id) is not session:
+            return
 
-        # Sends the encrypted record to the client.
-        connection.sendall(self.add_padding(encrypted_record))
-        connection.sendall(self.add_padding(self.END_FILE_MESSAGE))
+        # A client that disconnects without the shutdown message is considered shut down as well.
+        session.state.advance(Phase.SHUTDOWN)
+        if session.task is not None:
+            session.task.cancel()
+        del self.sessions[session.session_id]
+        for attached_connection in session.attached_connections:
+            attached_connection.writer.close()
+        print(f'[DISCONNECTED] Client {session.session_id}.')
+
+        # Frees the slot of MP-SPDZ ports only once the session's workers have stopped listening on them.
+        try:
+            await self.loop.run_in_executor(self.executor, session.close)
+        finally:
+            self.free_port_slots.append(session.port_slot)
 
         return
 
-    def receive(self, connection: SSLSocket) -> None:
+    async def handle_connection(self, reader: StreamReader, writer: StreamWriter) -> None:
         """
-            Handling of received messages from the client.
+            Keeps a persistent session with a client that connects.
 
             Parameters:
-                - connection (SSLSocket) : Connection with the client.
+                - reader (StreamReader) : The reading end of the connection.
+                - writer (StreamWriter) : The writing end of the connection.
 
             Returns:
                 :raises
                 -
         """
 
-        # Receives a message from the client and handles it accordingly.
-        message = connection.recv(self.HEADER).decode(self.FORMAT).strip(chr(0))
-        if message == self.ONLINE_MESSAGE:
-            print(f'[RECEIVED] {message} from client.')
-            self.client_online = True
-            self.is_semantic_search = eval(connection.recv(
-                                           self.HEADER).decode(self.FORMAT).strip(chr(0)))
-            self.resume_from_previous_preprocessing = eval(connection.recv(
-                                                           self.HEADER).decode(self.FORMAT).strip(chr(0)))
-        elif message == self.RECORDS_PREPROCESSING_MESSAGE:
-            print(f'[RECEIVED] {message} from client.')
-            self.received_records_preprocessing_message(connection)
-        elif message == self.SEMANTIC_SEARCH_MESSAGE:
-            self.wait_for_indexing()
-            print(f'[RECEIVED] {message} from client.')
-            self.received_semantic_search_message(connection)
-        elif message == self.ENCRYPT_QUERY_MESSAGE:
-            print(f'[RECEIVED] {message} from client.')
-            self.received_encrypt_query_message(connection)
-        elif message == self.REQUEST_ENCRYPTED_RECORD_MESSAGE:
-            print(f'[RECEIVED] {message} from client.')
-            self.send_encrypted_record(connection)
-        elif message == self.SHUTDOWN_MESSAGE:
-            print(f'[RECEIVED] {message} from client.')
-            self.client_online = False
+        connection = AsyncConnection(reader, writer, self.receive)
+        self.connections[connection] = current_task()
+        try:
+            await connection.receive()
+        finally:
+            del self.connections[connection]
+            await connection.close()
+
+            # The session ends with its first connection, however it ends, while attached connections only detach.
+            if (session := connection.session) is not None:
+                if connection is session.connection:
+                    await self.close_session(session)
+                else:
+                    session.attached_connections.discard(connection)
 
         return
 
-    def run(self) -> None:
+    async def serve(self) -> None:
         """
-            Starts the listening and handles incoming connections.
+            Listens for connections until the server is closed.
 
             Parameters:
                 -
@@ -500,19 +723,37 @@ class Communicator(Utilities):
         """
 
         # Binds the server to a socket and listens for connections.
-        self.listen_host.bind(self.ADDR)
-        self.listen_host.listen()
+        listen_host = await start_server(self.handle_connection, self.HOST, self.LISTEN_PORT,
+                                         ssl=self.server_context, reuse_address=True)
         print(f'[LISTENING] on (\'{self.HOST}\', {self.LISTEN_PORT})')
-        while True:
-            if self.close:
-                self.listen_host.close()
-                return
+        async with listen_host:
+            await self.closed.wait()
 
-            try:
-                connection, address = self.listen_host.accept()
-                self.receive(connection)
-            except timeout:
-                continue
+            # Aborts every connection and waits for its handling to end, which closes every active session once its
+            # MP-SPDZ workers have stopped.
+            for connection in list(self.connections):
+                connection.abort()
+            await gather(*self.connections.values(), return_exceptions=True)
+
+        return
+
+    def run(self) -> None:
+        """
+            Runs the event loop of the server.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        set_event_loop(self.loop)
+        self.loop.run_until_complete(self.serve())
+        self.loop.close()
+
+        return
 
     def kill(self) -> None:
         """
@@ -527,8 +768,10 @@ class Communicator(Utilities):
         """
 
         # Closes all threads and processes associated with the server.
-        self.close = True
-        self.run_thread.join()
+        if self.run_thread.is_alive():
+            self.loop.call_soon_threadsafe(self.closed.set)
+            self.run_thread.join()
+        self.executor.shutdown()
         print(f'[CLOSED] {self.ADDR}')
 
         return
@@ -2,6 +2,8 @@
 
 # Local getters imports.
 from application.getters import working_directory_validation, mp_spdz_directory_validation
+from application.getters import (get_mpc_backend as
+                                 mpc_backend)
 from application.getters import (get_client_indexing_directory as
                                  client_indexing_directory)
 from application.getters import (get_records_encryption_key_streams_directory as
@@ -46,7 +48,8 @@ def clean_up_files() -> None:
 def main() -> None:
     # Sets the working directory and validates it and MP-SPDZ's path.
     working_directory_validation()
-    mp_spdz_directory_validation()
+    if mpc_backend() == 'mp-spdz':
+        mp_spdz_directory_validation()
 
     # Perform a semantic search input from the user.
     semantic_search_response = input("Perform a sematic search? (y/n): ")
@@ -76,11 +79,12 @@ def main() -> None:
         # Shuffles and encrypts the server's records.
         client.send_records_preprocessing_message()
 
-        if not client.is_semantic_search:
-            # Waits for the server to send the inverted index matrix.
-            client.wait_for_encrypted_inverted_index_matrix()
+    if not client.is_semantic_search:
+        # Waits for the server to send the inverted index matrix, or the parts missing from previous pre-processing.
+        client.wait_for_encrypted_inverted_index_matrix()
 
     # Executes searching and retrievals of the server's records.
+    client.start_serving()
     while True:
 
         # Takes a search query from the user.
@@ -4,16 +4,21 @@
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
+# Imports.
+from shutil import rmtree
+
 # Local getters imports.
 from application.getters import working_directory_validation, mp_spdz_directory_validation
-from application.getters import (get_encrypted_records_directory as
-                                 encrypted_pnr_records_directory)
+from application.getters import (get_mpc_backend as
+                                 mpc_backend)
 from application.getters import (get_excluded_records as
                                  excluded_records)
 from application.getters import (get_records_directory as
                                  records_directory)
 from application.getters import (get_server_indexing_directory as
                                  server_indexing_directory)
+from application.getters import (get_server_sessions_directory as
+                                 server_sessions_directory)
 
 # Server import.
 from application.Server.server import Communicator as Server
@@ -21,7 +26,7 @@ from application.Server.server import Communicator as Server
 
 def clean_up_files() -> None:
     """
-        Removes records created from previous pre-processing.
+        Removes records created from previous pre-processing, together with the sessions of the clients that used them.
 
         Parameters:
             -
@@ -31,10 +36,9 @@ def clean_up_files() -> None:
             -
     """
 
-    # Removes the stored encrypted PNR records.
-    file_paths = [path for path in encrypted_pnr_records_directory().glob('*')]
-    for file_path in file_paths:
-        file_path.unlink()
+    # Removes the sessions with their stored encrypted PNR records.
+    rmtree(server_sessions_directory(), ignore_errors=True)
+    server_sessions_directory().mkdir()
 
     # Removes the stored PNR records.
     file_paths = [path for path in records_directory().glob('*') if (path.name not in excluded_records())]
@@ -52,43 +56,26 @@ def clean_up_files() -> None:
 def main() -> None:
     # Sets the working directory and validates it and MP-SPDZ's path
     working_directory_validation()
-    mp_spdz_directory_validation()
+    if mpc_backend() == 'mp-spdz':
+        mp_spdz_directory_validation()
 
-    # Starts the server and waits for the client to connect.
-    server = Server()
-    server.wait_for_client()
-
-    # Executes a new pre-processing of the database.
-    if not server.resume_from_previous_preprocessing:
+    # Generating new records input from the user.
+    generate_records_response = input("Generate new records? (y/n): ")
 
-        # Removes records from the previous pre-processing.
+    # Removes records from the previous pre-processing.
+    if generate_records_response == 'y':
         clean_up_files()
 
-        # Initializes the database with PNR records.
-        server.generate_records()
-
-        # Requests dummy items from the client to fill the database to the required size.
-        server.send_number_of_dummy_items()
-
-        # Waits for the client to start the records pre-processing.
-        server.wait_for_records_preprocessing()
-
-        if not server.is_semantic_search:
-            # Creates an inverted index matrix of the records.
-            server.create_inverted_index_matrix()
-
-            # Encryption of the inverted index matrix.
-            server.encrypt_inverted_index_matrix()
-
-            # Sends the encrypted inverted index matrix to the client.
-            server.send_encrypted_inverted_index_matrix()
-        else:
-            # Creates a semantic indexing of the records.
-            server.create_semantic_indexing()
-
-    # Standby for searching and sending encrypted records until the client goes offline.
-    while server.client_online:
-        server.wait_for_client_shutdown()
+    # Initializes the database with PNR records, then starts the server.
+    server = Server()
+    server.setup_records(generate_records_response == 'y')
+    server.start()
+
+    # Serves the clients, each in a session of its own, until the server is interrupted.
+    try:
+        server.wait_for_close()
+    except KeyboardInterrupt:
+        pass
 
     # Shutdown of the server.
     server.kill()
@@ -0,0 +1,137 @@
+""" Compact binary encoding of the encrypted records, the encrypted inverted index matrix and the MPC jobs. """
+
+# Imports.
+from pathlib import Path
+from struct import Struct
+
+# Local getters imports.
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
+
+
+# A part of the encrypted inverted index matrix starts with its number of attributes and the number of indices per
+# attribute, which is the same for every attribute because of the padding.
+INVERTED_INDEX_MATRIX_PART_HEADER = Struct('!QQ')
+
+
+def encode_blocks(blocks: list[str]) -> bytes:
+    """
+        Encodes hexadecimal blocks as raw bytes.
+
+        Parameters:
+            - blocks (list[str]) : The blocks as hexadecimals.
+
+        Returns:
+            :raises
+            - encoded_blocks (bytes) : The blocks as raw bytes, number_of_bytes each.
+    """
+
+    return b''.join(int(block, 16).to_bytes(number_of_bytes(), 'big') for block in blocks)
+
+
+def write_encrypted_inverted_index_matrix_part(encrypted_inverted_index_matrix_part: dict[str, list[str]],
+                                               part_path: Path) -> None:
+    """
+        Writes a part of the encrypted inverted index matrix as the header followed by one row per attribute, each row
+        being the encrypted attribute followed by its encrypted indices.
+
+        Parameters:
+            - encrypted_inverted_index_matrix_part (dict[str, list[str]]) : The part with hexadecimal ciphertexts.
+            - part_path (Path) : The path of the part.
+
+        Returns:
+            :raises
+            -
+    """
+
+    number_of_indices = max(map(len, encrypted_inverted_index_matrix_part.values()), default=0)
+
+    with part_path.open('wb') as f:
+        f.write(INVERTED_INDEX_MATRIX_PART_HEADER.pack(len(encrypted_inverted_index_matrix_part), number_of_indices))
+        for attribute, indices in encrypted_inverted_index_matrix_part.items():
+            f.write(encode_blocks([attribute] + indices))
+        f.close()
+
+    return
+
+
+def read_encrypted_inverted_index_matrix_part_header(part_path: Path) -> tuple[int, int]:
+    """
+        Reads the header of a part of the encrypted inverted index matrix.
+
+        Parameters:
+            - part_path (Path) : The path of the part.
+
+        Returns:
+            :raises
+            - number_of_attributes (int) : The number of attributes in the part.
+            - number_of_indices (int) : The number of indices per attribute.
+    """
+
+    with part_path.open('rb') as f:
+        number_of_attributes, number_of_indices = INVERTED_INDEX_MATRIX_PART_HEADER.unpack(
+            f.read(INVERTED_INDEX_MATRIX_PART_HEADER.size))
+        f.close()
+
+    return number_of_attributes, number_of_indices
+
+
+def read_encrypted_inverted_index_matrix_part(part_path: Path) -> dict[bytes, list[bytes]]:
+    """
+        Reads a part of the encrypted inverted index matrix.
+
+        Parameters:
+            - part_path (Path) : The path of the part.
+
+        Returns:
+            :raises
+            - encrypted_inverted_index_matrix_part (dict[bytes, list[bytes]]) : The part with raw ciphertexts.
+    """
+
+    encoded_part = memoryview(part_path.read_bytes())
+    number_of_attributes, number_of_indices = INVERTED_INDEX_MATRIX_PART_HEADER.unpack(
+        encoded_part[:INVERTED_INDEX_MATRIX_PART_HEADER.size])
+
+    # Splits every row into the encrypted attribute and its encrypted indices.
+    encrypted_inverted_index_matrix_part = {}
+    row_length = (number_of_indices + 1) * number_of_bytes()
+    for row_start in range(INVERTED_INDEX_MATRIX_PART_HEADER.size,
+                           INVERTED_INDEX_MATRIX_PART_HEADER.size + number_of_attributes * row_length, row_length):
+        ciphertexts = [bytes(encoded_part[i: i + number_of_bytes()])
+                       for i in range(row_start, row_start + row_length, number_of_bytes())]
+        encrypted_inverted_index_matrix_part[ciphertexts[0]] = ciphertexts[1:]
+
+    return encrypted_inverted_index_matrix_part
+
+
+def encode_words(integers: list[int], signed: bool = False) -> bytes:
+    """
+        Encodes integers as the words of an MPC job, number_of_bytes each.
+
+        Parameters:
+            - integers (list[int]) : The integers.
+            - signed (bool) : Whether the integers may be negative.
+
+        Returns:
+            :raises OverflowError
+            - words (bytes) : The integers as words.
+    """
+
+    return b''.join(integer.to_bytes(number_of_bytes(), 'big', signed=signed) for integer in integers)
+
+
+def decode_words(words: bytes, signed: bool = False) -> list[int]:
+    """
+        Decodes the words of an MPC job into integers.
+
+        Parameters:
+            - words (bytes) : The integers as words, number_of_bytes each.
+            - signed (bool) : Whether the integers may be negative.
+
+        Returns:
+            :raises
+            - integers (list[int]) : The integers.
+    """
+
+    return [int.from_bytes(words[i: i + number_of_bytes()], 'big', signed=signed)
+            for i in range(0, len(words), number_of_bytes())]
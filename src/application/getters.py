@@ -1,8 +1,9 @@
 """ The getters for the different variables used by the application. """
 
 # Imports.
+from json import loads
 from pathlib import Path
-from os import chdir
+from os import chdir, environ
 
 
 def working_directory_validation() -> None:
@@ -185,60 +186,12 @@ def get_excluded_records() -> list:
     return excluded_records
 
 
-def get_encrypted_records_directory() -> Path:
+def get_encrypted_records_directory(session_id: str) -> Path:
     """ Getter for the encrypted_records_directory variable. """
-    encrypted_records_directory = get_server_directory() / 'Encrypted_Records'
+    encrypted_records_directory = get_server_session_directory(session_id) / 'Encrypted_Records'
     return encrypted_records_directory
 
 
-def get_client_mp_spdz_input_directory() -> Path:
-    """ Getter for the client_mp_spdz_input_directory variable. """
-    client_mp_spdz_input_directory = get_client_directory() / 'MP_SPDZ_Inputs'
-    return client_mp_spdz_input_directory
-
-
-def get_client_mp_spdz_input_path() -> Path:
-    """ Getter for the client_mp_spdz_input_file variable. """
-    client_mp_spdz_input_path = get_client_mp_spdz_input_directory() / 'Client_Input'
-    return client_mp_spdz_input_path
-
-
-def get_client_mp_spdz_output_directory() -> Path:
-    """ Getter for the client_mp_spdz_output_directory variable. """
-    client_mp_spdz_output_directory = get_client_directory() / 'MP_SPDZ_Outputs'
-    return client_mp_spdz_output_directory
-
-
-def get_client_mp_spdz_output_path() -> Path:
-    """ Getter for the client_mp_spdz_output_path variable. """
-    client_mp_spdz_output_path = get_client_mp_spdz_output_directory() / 'Client_Output'
-    return client_mp_spdz_output_path
-
-
-def get_server_mp_spdz_input_directory() -> Path:
-    """ Getter for the server_mp_spdz_input_directory variable. """
-    server_mp_spdz_input_directory = get_server_directory() / 'MP_SPDZ_Inputs'
-    return server_mp_spdz_input_directory
-
-
-def get_server_mp_spdz_input_path() -> Path:
-    """ Getter for the server_mp_spdz_input_path variable. """
-    server_mp_spdz_input_path = get_server_mp_spdz_input_directory() / 'Server_Input'
-    return server_mp_spdz_input_path
-
-
-def get_server_mp_spdz_output_directory() -> Path:
-    """ Getter for the server_mp_spdz_output_directory variable. """
-    server_mp_spdz_output_directory = get_server_directory() / 'MP_SPDZ_Outputs'
-    return server_mp_spdz_output_directory
-
-
-def get_server_mp_spdz_output_path() -> Path:
-    """ Getter for the server_mp_spdz_output_path variable. """
-    server_mp_spdz_output_path = get_server_mp_spdz_output_directory() / 'Server_Output'
-    return server_mp_spdz_output_path
-
-
 def get_application_mp_spdz_scripts_directory() -> Path:
     """ Getter for the application_mp_spdz_scripts_directory variable. """
     global working_directory
@@ -300,6 +253,24 @@ def get_mp_spdz_programs_directory() -> Path:
     return mp_spdz_programs_directory
 
 
+def get_mp_spdz_schedules_directory() -> Path:
+    """ Getter for the mp_spdz_schedules_directory variable. """
+    mp_spdz_schedules_directory = get_mp_spdz_programs_directory() / 'Schedules'
+    return mp_spdz_schedules_directory
+
+
+def get_mp_spdz_bytecode_directory() -> Path:
+    """ Getter for the mp_spdz_bytecode_directory variable. """
+    mp_spdz_bytecode_directory = get_mp_spdz_programs_directory() / 'Bytecode'
+    return mp_spdz_bytecode_directory
+
+
+def get_mp_spdz_compile_cache_directory() -> Path:
+    """ Getter for the mp_spdz_compile_cache_directory variable. """
+    mp_spdz_compile_cache_directory = get_working_directory() / 'MP_SPDZ_Compile_Cache'
+    return mp_spdz_compile_cache_directory
+
+
 def get_mp_spdz_scripts_directory() -> Path:
     """ Getter for the mp_spdz_scripts_directory variable. """
     mp_spdz_scripts_path = get_mp_spdz_programs_directory() / 'Source'
@@ -325,9 +296,9 @@ def get_inverted_index_matrix_path() -> Path:
     return inverted_index_matrix_path
 
 
-def get_server_encrypted_inverted_index_matrix_directory() -> Path:
+def get_server_encrypted_inverted_index_matrix_directory(session_id: str) -> Path:
     """ Getter for the server_encrypted_inverted_index_matrix_directory variable. """
-    server_encrypted_inverted_index_matrix_directory = (get_server_indexing_directory() /
+    server_encrypted_inverted_index_matrix_directory = (get_server_session_directory(session_id) /
                                                         'Encrypted_Inverted_Index_Matrix')
     return server_encrypted_inverted_index_matrix_directory
 
@@ -383,39 +354,51 @@ def get_mp_spdz_player_data_directory():
     return mp_spdz_player_data_directory
 
 
+def get_networking_certificates_directory() -> Path:
+    """ Getter for the networking_certificates_directory variable. """
+    global working_directory
+    # The simulated backend runs without MP-SPDZ, so it uses certificates of its own rather than those of MP-SPDZ.
+    if get_mpc_backend() == 'simulated':
+        networking_certificates_directory = working_directory / 'Networking_Certificates'
+    else:
+        networking_certificates_directory = get_mp_spdz_player_data_directory()
+    return networking_certificates_directory
+
+
 def get_client_networking_key_path() -> Path:
     """ Getter for the client_networking_key_path variable. """
-    client_networking_key_path = get_mp_spdz_player_data_directory() / 'P0.key'
+    client_networking_key_path = get_networking_certificates_directory() / 'P0.key'
     return client_networking_key_path
 
 
 def get_client_networking_certificate_path() -> Path:
     """ Getter for the client_networking_key_path variable. """
-    client_networking_certificate_path = get_mp_spdz_player_data_directory() / 'P0.pem'
+    client_networking_certificate_path = get_networking_certificates_directory() / 'P0.pem'
     return client_networking_certificate_path
 
 
 def get_server_networking_key_path() -> Path:
     """ Getter for the server_networking_key_path variable. """
-    server_networking_key_path = get_mp_spdz_player_data_directory() / 'P1.key'
+    server_networking_key_path = get_networking_certificates_directory() / 'P1.key'
     return server_networking_key_path
 
 
 def get_server_networking_certificate_path() -> Path:
     """ Getter for the client_networking_key_path variable. """
-    server_networking_certificate_path = get_mp_spdz_player_data_directory() / 'P1.pem'
+    server_networking_certificate_path = get_networking_certificates_directory() / 'P1.pem'
     return server_networking_certificate_path
 
 
-def get_server_encryption_keys_directory() -> Path:
+def get_server_encryption_keys_directory(session_id: str) -> Path:
     """ Getter for the server_encryption_keys_directory variable. """
-    server_encryption_keys_directory = get_server_directory() / 'Encryption_Keys'
+    server_encryption_keys_directory = get_server_session_directory(session_id) / 'Encryption_Keys'
     return server_encryption_keys_directory
 
 
-def get_inverted_index_matrix_encryption_key_path() -> Path:
+def get_inverted_index_matrix_encryption_key_path(session_id: str) -> Path:
     """ Getter for the inverted_index_matrix_encryption_key_path variable. """
-    inverted_index_matrix_encryption_key_path = get_server_encryption_keys_directory() / 'Encryption_Key.txt'
+    inverted_index_matrix_encryption_key_path = (get_server_encryption_keys_directory(session_id) /
+                                                 'Encryption_Key.txt')
     return inverted_index_matrix_encryption_key_path
 
 
@@ -450,12 +433,269 @@ def get_client_number_of_dummy_items_path() -> Path:
     return client_number_of_dummy_items_path
 
 
-def get_server_record_pointers_path() -> Path:
+def get_server_record_pointers_path(session_id: str) -> Path:
     """ Getter for the server_record_pointers_path variable. """
-    server_record_pointers_path = get_server_indexing_directory() / 'Record_Pointers.json'
+    server_record_pointers_path = get_server_session_directory(session_id) / 'Record_Pointers.json'
     return server_record_pointers_path
 
 
+def get_server_sessions_directory() -> Path:
+    """ Getter for the server_sessions_directory variable. """
+    server_sessions_directory = get_server_directory() / 'Sessions'
+    return server_sessions_directory
+
+
+def get_server_session_directory(session_id: str) -> Path:
+    """ Getter for the server_session_directory variable. """
+    server_session_directory = get_server_sessions_directory() / session_id
+    return server_session_directory
+
+
+def get_scratch_directory() -> Path | None:
+    """ Getter for the scratch_directory variable. RAM-backed when available, None to pre-process on the disk. """
+    scratch_directory = Path('/dev/shm') / 'Private_Database_Search' if Path('/dev/shm').is_dir() else None
+    return scratch_directory
+
+
+def get_server_scratch_records_directory(session_id: str) -> Path:
+    """ Getter for the server_scratch_records_directory variable. """
+    server_scratch_records_directory = get_scratch_directory() / 'Server' / session_id / 'Encrypted_Records'
+    return server_scratch_records_directory
+
+
+def get_client_scratch_encryption_key_streams_directory(session_id: str) -> Path:
+    """ Getter for the client_scratch_encryption_key_streams_directory variable. """
+    client_scratch_encryption_key_streams_directory = (get_scratch_directory() / 'Client' / session_id /
+                                                       'Records_Encryption_Key_Streams')
+    return client_scratch_encryption_key_streams_directory
+
+
+def get_client_mpc_metrics_path() -> Path:
+    """ Getter for the client_mpc_metrics_path variable. """
+    client_mpc_metrics_path = get_client_directory() / 'MPC_Metrics.json'
+    return client_mpc_metrics_path
+
+
+def get_server_mpc_metrics_path(session_id: str) -> Path:
+    """ Getter for the server_mpc_metrics_path variable. """
+    server_mpc_metrics_path = get_server_session_directory(session_id) / 'MPC_Metrics.json'
+    return server_mpc_metrics_path
+
+
+def get_client_session_id_path() -> Path:
+    """ Getter for the client_session_id_path variable. """
+    client_session_id_path = get_client_indexing_directory() / 'Session_ID.txt'
+    return client_session_id_path
+
+
+def get_server_worker_pool_size() -> int:
+    """ Getter for the server_worker_pool_size variable. """
+    server_worker_pool_size = 8
+    return server_worker_pool_size
+
+
+def get_maximum_number_of_sessions() -> int:
+    """ Getter for the maximum_number_of_sessions variable. """
+    maximum_number_of_sessions = 16
+    return maximum_number_of_sessions
+
+
+def get_mp_spdz_port_base() -> int:
+    """ Getter for the mp_spdz_port_base variable. """
+    mp_spdz_port_base = 14000
+    return mp_spdz_port_base
+
+
+def get_mp_spdz_ports_per_session() -> int:
+    """ Getter for the mp_spdz_ports_per_session variable. """
+    mp_spdz_ports_per_session = 100
+    return mp_spdz_ports_per_session
+
+
+def get_file_transfer_chunk_size() -> int:
+    """ Getter for the file_transfer_chunk_size variable. """
+    file_transfer_chunk_size = 2**20
+    return file_transfer_chunk_size
+
+
+def get_server_encrypted_inverted_index_matrix_manifest_path(session_id: str) -> Path:
+    """ Getter for the server_encrypted_inverted_index_matrix_manifest_path variable. """
+    server_encrypted_inverted_index_matrix_manifest_path = (get_server_session_directory(session_id) /
+                                                            'Encrypted_Inverted_Index_Matrix_Manifest.json')
+    return server_encrypted_inverted_index_matrix_manifest_path
+
+
+def get_index_synchronization_rounds() -> int:
+    """ Getter for the index_synchronization_rounds variable. """
+    index_synchronization_rounds = 3
+    return index_synchronization_rounds
+
+
+def get_client_record_connections() -> int:
+    """ Getter for the client_record_connections variable. """
+    client_record_connections = 4
+    return client_record_connections
+
+
+def get_mp_spdz_service_argument() -> str:
+    """ Getter for the mp_spdz_service_argument variable. """
+    mp_spdz_service_argument = 'service'
+    return mp_spdz_service_argument
+
+
+def get_mp_spdz_job_end_marker() -> str:
+    """ Getter for the mp_spdz_job_end_marker variable. """
+    mp_spdz_job_end_marker = 'JOB FINISHED'
+    return mp_spdz_job_end_marker
+
+
+def get_mp_spdz_service_programs() -> list[str]:
+    """ Getter for the mp_spdz_service_programs variable. """
+    mp_spdz_service_programs = [get_sort_and_encrypt_with_circuit_mpc_script_path().stem,
+                                get_sort_and_reencrypt_with_circuit_mpc_script_path().stem,
+                                get_aes_128_ecb_with_circuit_mpc_script_path().stem,
+                                get_semantic_search_mpc_script_path().stem]
+    return mp_spdz_service_programs
+
+
+def get_mp_spdz_ports_per_worker() -> int:
+    """ Getter for the mp_spdz_ports_per_worker variable. """
+    mp_spdz_ports_per_worker = 4
+    return mp_spdz_ports_per_worker
+
+
+def get_mpc_backend_variable() -> str:
+    """ Getter for the mpc_backend_variable variable. """
+    mpc_backend_variable = 'PDS_MPC_BACKEND'
+    return mpc_backend_variable
+
+
+def get_mpc_backend() -> str:
+    """ Getter for the mpc_backend variable. Either 'mp-spdz' or 'simulated', the same on the client and the server. """
+    # The backend may be overridden through the environment, e.g. to test the application without MP-SPDZ.
+    mpc_backend = environ.get(get_mpc_backend_variable(), 'mp-spdz')
+    return mpc_backend
+
+
+def get_mp_spdz_shutdown_timeout() -> int:
+    """ Getter for the mp_spdz_shutdown_timeout variable. """
+    mp_spdz_shutdown_timeout = 10
+    return mp_spdz_shutdown_timeout
+
+
+def get_mp_spdz_error_lines() -> int:
+    """ Getter for the mp_spdz_error_lines variable. """
+    mp_spdz_error_lines = 100
+    return mp_spdz_error_lines
+
+
+def get_mp_spdz_workers_per_program() -> int:
+    """ Getter for the mp_spdz_workers_per_program variable. """
+    mp_spdz_workers_per_program = 4
+    return mp_spdz_workers_per_program
+
+
+def get_mp_spdz_warm_workers_per_program() -> int:
+    """ Getter for the mp_spdz_warm_workers_per_program variable. At most mp_spdz_workers_per_program. """
+    mp_spdz_warm_workers_per_program = 1
+    return mp_spdz_warm_workers_per_program
+
+
+def get_shuffle_network() -> str:
+    """ Getter for the shuffle_network variable. Either 'waksman' or 'bitonic'. """
+    shuffle_network = 'waksman'
+    return shuffle_network
+
+
+def get_compare_exchanges_per_job() -> int:
+    """ Getter for the compare_exchanges_per_job variable. """
+    compare_exchanges_per_job = get_mpc_program_parameters()['compare_exchanges_per_job']
+    return compare_exchanges_per_job
+
+
+def get_query_digests_per_job() -> int:
+    """ Getter for the query_digests_per_job variable. """
+    query_digests_per_job = get_mpc_program_parameters()['query_digests_per_job']
+    return query_digests_per_job
+
+
+def get_search_query_term_separator() -> str:
+    """ Getter for the search_query_term_separator variable. """
+    search_query_term_separator = ';'
+    return search_query_term_separator
+
+
+def get_maximum_number_of_search_query_terms() -> int:
+    """ Getter for the maximum_number_of_search_query_terms variable. """
+    # Every keyword search query is padded to this many terms, so the server learns nothing from its number of terms.
+    maximum_number_of_search_query_terms = 4
+    return maximum_number_of_search_query_terms
+
+
+def get_number_of_query_jobs() -> int:
+    """ Getter for the number_of_query_jobs variable. """
+    number_of_query_jobs = -(-get_maximum_number_of_search_query_terms() // get_query_digests_per_job())
+    return number_of_query_jobs
+
+
+def get_mpc_program_parameters_variable() -> str:
+    """ Getter for the mpc_program_parameters_variable variable. """
+    mpc_program_parameters_variable = 'PDS_MPC_PROGRAM_PARAMETERS'
+    return mpc_program_parameters_variable
+
+
+def get_mpc_program_parameters(overrides: dict[str, int] | None = None) -> dict[str, int]:
+    """ Getter for the mpc_program_parameters variable. """
+    # The parameters the MP-SPDZ programs are compiled for, which a compilation may override through the environment.
+    mpc_program_parameters = {'database_size': get_database_size(),
+                              'mp_spdz_workers_per_program': get_mp_spdz_workers_per_program(),
+                              'block_size': get_block_size(),
+                              'number_of_blocks': get_number_of_blocks(),
+                              'embedding_dimension': get_embedding_dimension(),
+                              'number_of_records': get_number_of_records(),
+                              'semantic_search_request_threshold': get_semantic_search_request_threshold(),
+                              'query_digests_per_job': 4}
+    mpc_program_parameters.update(loads(environ.get(get_mpc_program_parameters_variable(), '{}')))
+    mpc_program_parameters.update(overrides or {})
+
+    # Every layer is split into at most one job per worker, the last job of a layer being padded.
+    compare_exchanges_per_layer = mpc_program_parameters['database_size'] // 2
+    workers_per_program = mpc_program_parameters['mp_spdz_workers_per_program']
+    mpc_program_parameters['compare_exchanges_per_job'] = max(1, -(-compare_exchanges_per_layer //
+                                                                   workers_per_program))
+    return mpc_program_parameters
+
+
+def get_mpc_program_parameterizations() -> list[dict[str, int]]:
+    """ Getter for the mpc_program_parameterizations variable. """
+    # Overrides of the parameters to pre-compile the MP-SPDZ programs for as well, e.g. [{'database_size': 1000}].
+    mpc_program_parameterizations = []
+    return mpc_program_parameterizations
+
+
+def get_maximum_number_of_requests_per_search() -> int:
+    """ Getter for the maximum_number_of_requests_per_search variable. """
+    # Every search requests the same number of records, at most this many, the results being padded with dummy items.
+    # The results beyond it are left to be retrieved by searching again.
+    maximum_number_of_requests_per_search = 4
+    return maximum_number_of_requests_per_search
+
+
+def get_number_of_searches_per_preprocessing() -> int:
+    """ Getter for the number_of_searches_per_preprocessing variable. """
+    # The searches without results the client can run before the database has to be pre-processed again.
+    number_of_searches_per_preprocessing = 2
+    return number_of_searches_per_preprocessing
+
+
+def get_minimum_number_of_dummy_items() -> int:
+    """ Getter for the minimum_number_of_dummy_items variable. """
+    # The dummy items the client can request in place of missing results.
+    minimum_number_of_dummy_items = (get_maximum_number_of_requests_per_search() *
+                                     get_number_of_searches_per_preprocessing())
+    return minimum_number_of_dummy_items
+
+
 def get_number_of_dummy_items() -> int:
     """ Getter for the number_of_dummy_items variable. """
     number_of_dummy_items = get_database_size() - get_number_of_records()
@@ -464,7 +704,9 @@ def get_number_of_dummy_items() -> int:
 
 def get_database_size() -> int:
     """ Getter for the database_size variable. """
-    database_size = 2**4
+    # Rounded up to an even size with one more dummy item, so the first layer of the shuffle encrypts every record.
+    database_size = get_number_of_records() + get_minimum_number_of_dummy_items()
+    database_size += database_size % 2
     return database_size
 
 
@@ -0,0 +1,866 @@
+""" Persistent, mutually authenticated session between the client and server. """
+
+# Imports.
+from asyncio import StreamReader, StreamWriter, IncompleteReadError, Lock as AsyncLock
+from asyncio import Future, Task, get_running_loop, create_task
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from enum import IntEnum
+from itertools import count
+from queue import Queue
+from struct import Struct
+from threading import Thread, Lock, Condition
+from ssl import SSLSocket
+from socket import SHUT_RDWR
+from typing import Callable, Iterator
+
+# Local getters imports.
+from application.getters import (get_file_transfer_chunk_size as
+                                 file_transfer_chunk_size)
+
+
+class MessageType(IntEnum):
+    """
+        The type of frame exchanged between the client and server.
+    """
+
+    RESPONSE = 0
+    ONLINE = 1
+    SENDING_NUMBER_OF_DUMMY_ITEMS = 2
+    RECORDS_PREPROCESSING = 3
+    ENCRYPT_RECORDS = 4
+    REENCRYPT_RECORDS = 5
+    RECORDS_PREPROCESSING_FINISHED = 6
+    SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX = 7
+    SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_FINISHED = 8
+    SEMANTIC_SEARCH = 9
+    ENCRYPT_QUERY = 10
+    SHUTTING_DOWN = 12
+    REQUESTING_ENCRYPTED_RECORDS = 13
+    STREAMED_RESPONSE = 14
+    SENDING_ENCRYPTED_INVERTED_INDEX_MATRIX_MANIFEST = 15
+    ATTACH = 16
+    ERROR_RESPONSE = 17
+
+    def __str__(self) -> str:
+        return f'<{self.name.replace("_", " ")}>'
+
+
+class Phase(IntEnum):
+    """
+        The phases of a session between the client and server, in the order they are reached.
+    """
+
+    # Not connected.
+    OFFLINE = 0
+    # The client and server have exchanged the online message.
+    ONLINE = 1
+    # The client has received the number of dummy items.
+    DUMMY_COUNT = 2
+    # The records pre-processing has finished.
+    PREPROCESSING = 3
+    # The index searched by the client is in place, either the encrypted inverted index matrix or the semantic indexing.
+    INDEX_SENT = 4
+    # Searches and record requests are served.
+    SERVING = 5
+    # The client has shut down.
+    SHUTDOWN = 6
+
+
+def resolve(future: Future) -> None:
+    """
+        Resolves a future unless it is already done.
+
+        Parameters:
+            - future (Future) : The future to be resolved.
+
+        Returns:
+            :raises
+            -
+    """
+
+    if not future.done():
+        future.set_result(None)
+
+    return
+
+
+class SessionState:
+    """
+        Tracks the phase of a session. Advancing the phase immediately wakes up the threads and coroutines waiting for
+        it.
+    """
+
+    def __init__(self) -> None:
+        self.phase = Phase.OFFLINE
+        self.condition = Condition()
+        self.waiters = []
+
+        return
+
+    def advance(self, phase: Phase) -> None:
+        """
+            Advances the session to a phase, phases already passed are ignored.
+
+            Parameters:
+                - phase (Phase) : The phase that has been reached.
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Updates the phase and wakes up the waiting threads.
+        with self.condition:
+            if phase <= self.phase:
+                return
+            self.phase = phase
+            self.condition.notify_all()
+            reached_waiters = [waiter for waiter in self.waiters if waiter[2] <= phase]
+            self.waiters = [waiter for waiter in self.waiters if waiter[2] > phase]
+
+        # Wakes up the waiting coroutines in their own event loops.
+        for loop, future, _ in reached_waiters:
+            loop.call_soon_threadsafe(resolve, future)
+
+        return
+
+    def wait_for(self, phase: Phase) -> None:
+        """
+            Blocks the calling thread until the session has reached a phase.
+
+            Parameters:
+                - phase (Phase) : The phase to wait for.
+
+            Returns:
+                :raises
+                -
+        """
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.phase >= phase)
+
+        return
+
+    async def reached(self, phase: Phase) -> None:
+        """
+            Waits until the session has reached a phase without blocking the event loop.
+
+            Parameters:
+                - phase (Phase) : The phase to wait for.
+
+            Returns:
+                :raises
+                -
+        """
+
+        with self.condition:
+            if self.phase >= phase:
+                return
+            loop = get_running_loop()
+            future = loop.create_future()
+            self.waiters.append((loop, future, phase))
+
+        await future
+
+        return
+
+
+# A frame is the message type, the tag of the request it belongs to and the payload length, followed by the payload.
+FRAME_HEADER = Struct('!BIQ')
+
+# Integers in payloads are unsigned 64-bit big-endian.
+INTEGER = Struct('!Q')
+
+
+def get_file_digest(path: Path) -> str:
+    """
+        Hashes a file to verify that it was transferred intact.
+
+        Parameters:
+            - path (Path) : The path of the file.
+
+        Returns:
+            :raises FileNotFoundError
+            - digest (str) : The SHA-256 digest of the file as a hexadecimal.
+    """
+
+    digest = sha256()
+    with path.open('rb') as f:
+        while chunk := f.read(file_transfer_chunk_size()):
+            digest.update(chunk)
+        f.close()
+
+    return digest.hexdigest()
+
+
+def encode_integers(*integers: int) -> bytes:
+    """
+        Encodes integers as a payload.
+
+        Parameters:
+            - integers (int) : The integers to be encoded.
+
+        Returns:
+            :raises
+            - payload (bytes) : The encoded integers.
+    """
+
+    return Struct(f'!{len(integers)}Q').pack(*integers)
+
+
+def decode_integers(payload: bytes) -> list[int]:
+    """
+        Decodes a payload of integers.
+
+        Parameters:
+            - payload (bytes) : The encoded integers.
+
+        Returns:
+            :raises
+            - integers (list[int]) : The decoded integers.
+    """
+
+    return list(Struct(f'!{len(payload) // INTEGER.size}Q').unpack(payload))
+
+
+def get_message_type(message_type: int) -> MessageType | int:
+    """
+        Gets the message type of a received frame.
+
+        Parameters:
+            - message_type (int) : The message type as received.
+
+        Returns:
+            :raises
+            - message_type (MessageType | int) : The message type, or the number as received if the type is unknown.
+    """
+
+    try:
+        return MessageType(message_type)
+    except ValueError:
+        return message_type
+
+
+class Connection:
+    """
+        Carries tagged request and response frames over a single long-lived TLS connection. Responses carry the tag of
+        the request they answer. A request may be answered by a stream of responses, which ends with a plain response,
+        or by an error response when the peer failed to handle it. A request whose handler fails, or a frame of an
+        unknown type, is answered with an error response, and the following frames are still received.
+        The payloads of the message types in file_payloads are written straight to disk through a fixed buffer, and the
+        handler receives the path of the file instead of the payload.
+    """
+
+    def __init__(self, connection: SSLSocket, handler: Callable,
+                 file_payloads: dict[MessageType, Callable[[], Path]] = None) -> None:
+        self.connection = connection
+        self.handler = handler
+        self.file_payloads = file_payloads or {}
+
+        self.tags = count(1)
+        self.pending_responses = {}
+        self.pending_responses_lock = Lock()
+        self.send_lock = Lock()
+        self.header_buffer = bytearray(FRAME_HEADER.size)
+        self.file_buffer = bytearray(file_transfer_chunk_size())
+
+        self.receive_thread = Thread(target=self.receive, daemon=True)
+        self.receive_thread.start()
+
+        return
+
+    def send_frame(self, tag: int, message_type: MessageType, payload: bytes = b'') -> None:
+        """
+            Sends a tagged frame to the peer.
+
+            Parameters:
+                - tag (int) : The tag of the request the frame belongs to.
+                - message_type (MessageType) : The type of the frame.
+                - payload (bytes) : The payload of the frame.
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Sends the header and the payload without interleaving with other frames.
+        with self.send_lock:
+            self.connection.sendall(FRAME_HEADER.pack(message_type, tag, len(payload)))
+            if payload:
+                self.connection.sendall(payload)
+
+        return
+
+    def receive_exactly(self, buffer: memoryview) -> bool:
+        """
+            Fills the buffer with bytes from the peer, however many reads it takes.
+
+            Parameters:
+                - buffer (memoryview) : The buffer to be filled.
+
+            Returns:
+                :raises
+                - filled (bool) : False if the peer disconnected before the buffer was filled.
+        """
+
+        received = 0
+        while received < len(buffer):
+            if (number_of_bytes := self.connection.recv_into(buffer[received:])) == 0:
+                return False
+            received += number_of_bytes
+
+        return True
+
+    def receive_to_file(self, length: int, path: Path) -> bool:
+        """
+            Writes the given number of bytes from the peer to a file, one buffer at a time.
+
+            Parameters:
+                - length (int) : The number of bytes to be received.
+                - path (Path) : The file to be written.
+
+            Returns:
+                :raises
+                - filled (bool) : False if the peer disconnected before every byte was received.
+        """
+
+        buffer = memoryview(self.file_buffer)
+        with path.open('wb') as f:
+            while length:
+                chunk = buffer[:min(length, len(buffer))]
+                if not self.receive_exactly(chunk):
+                    return False
+                f.write(chunk)
+                length -= len(chunk)
+            f.close()
+
+        return True
+
+    def receive_frame(self) -> tuple[int, MessageType, bytearray | Path] | None:
+        """
+            Receives a tagged frame from the peer.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - frame (tuple[int, MessageType | int, bytearray | Path] | None) : The tag, type and payload, or the
+                                                                                   path of the file the payload was
+                                                                                   written to. The type of a frame of
+                                                                                   an unknown type is kept as a number.
+                                                                                   None if the peer disconnected.
+        """
+
+        # Receives the header.
+        if not self.receive_exactly(memoryview(self.header_buffer)):
+            return None
+        message_type, tag, length = FRAME_HEADER.unpack(self.header_buffer)
+        message_type = get_message_type(message_type)
+
+        # Receives the payload straight to disk.
+        if message_type in self.file_payloads:
+            path = self.file_payloads[message_type]()
+            if not self.receive_to_file(length, path):
+                return None
+            return tag, message_type, path
+
+        # Receives the payload.
+        payload = bytearray(length)
+        if not self.receive_exactly(memoryview(payload)):
+            return None
+
+        return tag, message_type, payload
+
+    def request(self, message_type: MessageType, payload: bytes = b'') -> bytearray:
+        """
+            Sends a request to the peer and blocks until its response is received.
+
+            Parameters:
+                - message_type (MessageType) : The type of the request.
+                - payload (bytes) : The payload of the request.
+
+            Returns:
+                :raises ConnectionError
+                - response (bytearray) : The payload of the response.
+        """
+
+        # Registers where the response of the request should be delivered.
+        tag = next(self.tags)
+        response = Queue(maxsize=1)
+        with self.pending_responses_lock:
+            self.pending_responses[tag] = response
+
+        # Sends the request and waits for the response.
+        self.send_frame(tag, message_type, payload)
+        if (frame := response.get()) is None:
+            raise ConnectionError(f'The connection closed before {message_type} was answered.')
+        response_type, payload = frame
+        if response_type == MessageType.ERROR_RESPONSE:
+            raise ConnectionError(f'{message_type} failed on the peer: {payload.decode()}')
+
+        return payload
+
+    def request_stream(self, message_type: MessageType, payload: bytes = b'') -> Iterator[bytearray]:
+        """
+            Sends a request to the peer and yields its streamed responses as they are received, while the following
+            ones are still being received.
+
+            Parameters:
+                - message_type (MessageType) : The type of the request.
+                - payload (bytes) : The payload of the request.
+
+            Returns:
+                :raises ConnectionError
+                - responses (Iterator[bytearray]) : The payloads of the streamed responses, in the order they were sent.
+        """
+
+        # Registers where the responses of the request should be delivered.
+        tag = next(self.tags)
+        responses = Queue()
+        with self.pending_responses_lock:
+            self.pending_responses[tag] = responses
+
+        # Sends the request and yields the responses until the final one.
+        self.send_frame(tag, message_type, payload)
+        while (frame := responses.get()) is not None:
+            response_type, payload = frame
+            if response_type == MessageType.RESPONSE:
+                return
+            if response_type == MessageType.ERROR_RESPONSE:
+                raise ConnectionError(f'{message_type} failed on the peer: {payload.decode()}')
+            yield payload
+
+        raise ConnectionError(f'The connection closed before {message_type} was answered.')
+
+    def respond(self, tag: int, payload: bytes = b'') -> None:
+        """
+            Sends the response to a request received from the peer.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - payload (bytes) : The payload of the response.
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.send_frame(tag, MessageType.RESPONSE, payload)
+
+        return
+
+    def respond_error(self, tag: int, error: str) -> None:
+        """
+            Sends the error response to a request received from the peer that failed to be handled.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - error (str) : The description of the error.
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.send_frame(tag, MessageType.ERROR_RESPONSE, error.encode())
+
+        return
+
+    def handle(self, tag: int, message_type: MessageType, payload: bytearray | Path) -> None:
+        """
+            Hands a request to the handler, logging the error of a failed request and answering it with an error
+            response, so that neither the peer nor the receiving of the following frames is held up by it.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - message_type (MessageType) : The type of the request.
+                - payload (bytearray | Path) : The payload of the request, or the path of the file it was written to.
+
+            Returns:
+                :raises
+                -
+        """
+
+        try:
+            self.handler(self, tag, message_type, payload)
+        except Exception as error:
+            print(f'[ERROR] Handling request {tag} failed: {error!r}')
+            self.respond_error(tag, f'{error!r}')
+
+        return
+
+    def receive(self) -> None:
+        """
+            Receives frames until the peer disconnects, delivering responses to their requests and handing requests to
+            the handler.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        try:
+            while (frame := self.receive_frame()) is not None:
+                tag, message_type, payload = frame
+                if not isinstance(message_type, MessageType):
+                    print(f'[IGNORED] Frame of unknown type {message_type} with tag {tag}.')
+                    self.respond_error(tag, f'Unknown message type {message_type}.')
+                    continue
+                elif message_type in (MessageType.RESPONSE, MessageType.ERROR_RESPONSE):
+                    with self.pending_responses_lock:
+                        response = self.pending_responses.pop(tag, None)
+                elif message_type == MessageType.STREAMED_RESPONSE:
+                    with self.pending_responses_lock:
+                        response = self.pending_responses.get(tag)
+                else:
+                    self.handle(tag, message_type, payload)
+                    continue
+
+                # A response to no pending request, such as a late response to a request that was given up on.
+                if response is None:
+                    print(f'[IGNORED] {message_type} with unknown tag {tag}.')
+                else:
+                    response.put((message_type, payload))
+        except OSError:
+            pass
+        finally:
+            # Wakes up every request still waiting for a response, however the receiving ended.
+            with self.pending_responses_lock:
+                for response in self.pending_responses.values():
+                    response.put(None)
+                self.pending_responses = {}
+
+        return
+
+    def close(self) -> None:
+        """
+            Closes the connection.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        try:
+            self.connection.shutdown(SHUT_RDWR)
+        except OSError:
+            pass
+        self.connection.close()
+
+        return
+
+
+class AsyncConnection:
+    """
+        Carries tagged request and response frames over a single long-lived TLS connection served by an asyncio event
+        loop. Every received request is handled in its own task, so slow requests do not hold up the others. A request
+        whose handler fails, or a frame of an unknown type, is answered with an error response, so the peer does not
+        wait for it forever.
+    """
+
+    def __init__(self, reader: StreamReader, writer: StreamWriter, handler: Callable) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.handler = handler
+
+        # The server session the connection belongs to, once the peer has identified itself.
+        self.session = None
+
+        self.tags = count(1)
+        self.pending_responses = {}
+        self.send_lock = AsyncLock()
+        self.handler_tasks = set()
+
+        return
+
+    async def send_frame(self, tag: int, message_type: MessageType, payload: bytes = b'') -> None:
+        """
+            Sends a tagged frame to the peer.
+
+            Parameters:
+                - tag (int) : The tag of the request the frame belongs to.
+                - message_type (MessageType) : The type of the frame.
+                - payload (bytes) : The payload of the frame.
+
+            Returns:
+                :raises
+                -
+        """
+
+        # Sends the header and the payload without interleaving with other frames.
+        async with self.send_lock:
+            self.writer.write(FRAME_HEADER.pack(message_type, tag, len(payload)))
+            if payload:
+                self.writer.write(payload)
+            await self.writer.drain()
+
+        return
+
+    async def send_file_frame(self, tag: int, message_type: MessageType, path: Path) -> None:
+        """
+            Sends a tagged frame to the peer with the content of a file as the payload. The file is read one chunk at a
+            time and every chunk is drained before the next is read, so memory stays bounded however large the file is.
+
+            Parameters:
+                - tag (int) : The tag of the request the frame belongs to.
+                - message_type (MessageType) : The type of the frame.
+                - path (Path) : The file to be sent.
+
+            Returns:
+                :raises
+                -
+        """
+
+        loop = get_running_loop()
+
+        # Sends the header and the file without interleaving with other frames.
+        async with self.send_lock:
+            with path.open('rb') as f:
+                self.writer.write(FRAME_HEADER.pack(message_type, tag, path.stat().st_size))
+                while chunk := await loop.run_in_executor(None, f.read, file_transfer_chunk_size()):
+                    self.writer.write(chunk)
+                    await self.writer.drain()
+                f.close()
+            await self.writer.drain()
+
+        return
+
+    async def receive_frame(self) -> tuple[int, MessageType, bytes] | None:
+        """
+            Receives a tagged frame from the peer.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                - frame (tuple[int, MessageType | int, bytes] | None) : The tag, type and payload, or None if the peer
+                                                                        disconnected. The type of a frame of an unknown
+                                                                        type is kept as a number.
+        """
+
+        try:
+            message_type, tag, length = FRAME_HEADER.unpack(await self.reader.readexactly(FRAME_HEADER.size))
+            payload = await self.reader.readexactly(length)
+        except IncompleteReadError:
+            return None
+
+        return tag, get_message_type(message_type), payload
+
+    async def request(self, message_type: MessageType, payload: bytes = b'') -> bytes:
+        """
+            Sends a request to the peer and waits until its response is received.
+
+            Parameters:
+                - message_type (MessageType) : The type of the request.
+                - payload (bytes) : The payload of the request.
+
+            Returns:
+                :raises ConnectionError
+                - response (bytes) : The payload of the response.
+        """
+
+        # Registers where the response of the request should be delivered.
+        tag = next(self.tags)
+        response = get_running_loop().create_future()
+        self.pending_responses[tag] = response
+
+        # Sends the request and waits for the response.
+        await self.send_frame(tag, message_type, payload)
+        if (payload := await response) is None:
+            raise ConnectionError(f'The connection closed before {message_type} was answered.')
+
+        return payload
+
+    async def request_file(self, message_type: MessageType, path: Path) -> bytes:
+        """
+            Sends a request with the content of a file as the payload to the peer and waits until its response is
+            received.
+
+            Parameters:
+                - message_type (MessageType) : The type of the request.
+                - path (Path) : The file to be sent.
+
+            Returns:
+                :raises ConnectionError
+                - response (bytes) : The payload of the response.
+        """
+
+        # Registers where the response of the request should be delivered.
+        tag = next(self.tags)
+        response = get_running_loop().create_future()
+        self.pending_responses[tag] = response
+
+        # Sends the request and waits for the response.
+        await self.send_file_frame(tag, message_type, path)
+        if (payload := await response) is None:
+            raise ConnectionError(f'The connection closed before {message_type} was answered.')
+
+        return payload
+
+    async def respond(self, tag: int, payload: bytes = b'') -> None:
+        """
+            Sends the response to a request received from the peer.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - payload (bytes) : The payload of the response.
+
+            Returns:
+                :raises
+                -
+        """
+
+        await self.send_frame(tag, MessageType.RESPONSE, payload)
+
+        return
+
+    async def respond_stream(self, tag: int, payload: bytes) -> None:
+        """
+            Sends one of the streamed responses to a request received from the peer. The stream is ended by a plain
+            response.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - payload (bytes) : The payload of the streamed response.
+
+            Returns:
+                :raises
+                -
+        """
+
+        await self.send_frame(tag, MessageType.STREAMED_RESPONSE, payload)
+
+        return
+
+    async def respond_error(self, tag: int, error: str) -> None:
+        """
+            Sends the error response to a request received from the peer that failed to be handled.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - error (str) : The description of the error.
+
+            Returns:
+                :raises
+                -
+        """
+
+        await self.send_frame(tag, MessageType.ERROR_RESPONSE, error.encode())
+
+        return
+
+    def handler_done(self, tag: int, handler_task: Task) -> None:
+        """
+            Logs the error of a request whose handler failed and answers the request with an error response.
+
+            Parameters:
+                - tag (int) : The tag of the request.
+                - handler_task (Task) : The finished task handling the request.
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.handler_tasks.discard(handler_task)
+        if handler_task.cancelled() or (error := handler_task.exception()) is None:
+            return
+
+        print(f'[ERROR] Handling request {tag} failed: {error!r}')
+        if not self.writer.is_closing():
+            error_task = create_task(self.respond_error(tag, f'{error!r}'))
+            self.handler_tasks.add(error_task)
+            error_task.add_done_callback(self.handler_tasks.discard)
+
+        return
+
+    async def receive(self) -> None:
+        """
+            Receives frames until the peer disconnects, delivering responses to their requests and handing each request
+            to the handler in a task of its own.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        try:
+            while (frame := await self.receive_frame()) is not None:
+                tag, message_type, payload = frame
+                if not isinstance(message_type, MessageType):
+                    print(f'[IGNORED] Frame of unknown type {message_type} with tag {tag}.')
+                    await self.respond_error(tag, f'Unknown message type {message_type}.')
+                elif message_type in (MessageType.RESPONSE, MessageType.ERROR_RESPONSE) and \
+                        tag not in self.pending_responses:
+                    print(f'[IGNORED] {message_type} with unknown tag {tag}.')
+                elif message_type in (MessageType.RESPONSE, MessageType.ERROR_RESPONSE):
+                    # The request may have been cancelled while its response was on the way.
+                    response = self.pending_responses.pop(tag)
+                    if response.done():
+                        print(f'[IGNORED] {message_type} to cancelled request {tag}.')
+                    elif message_type == MessageType.RESPONSE:
+                        response.set_result(payload)
+                    else:
+                        response.set_exception(ConnectionError(f'The request failed on the peer: {payload.decode()}'))
+                else:
+                    handler_task = create_task(self.handler(self, tag, message_type, payload))
+                    self.handler_tasks.add(handler_task)
+                    handler_task.add_done_callback(partial(self.handler_done, tag))
+        except OSError:
+            pass
+        finally:
+            # Wakes up every request still waiting for a response, however the receiving ended.
+            for response in self.pending_responses.values():
+                resolve(response)
+            self.pending_responses = {}
+
+        return
+
+    async def close(self) -> None:
+        """
+            Closes the connection.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+        return
+
+    def abort(self) -> None:
+        """
+            Closes the connection at once, without waiting for the peer to acknowledge it.
+
+            Parameters:
+                -
+
+            Returns:
+                :raises
+                -
+        """
+
+        self.writer.transport.abort()
+
+        return
@@ -1,18 +1,20 @@
 """ Setup for the application. """
 
 # Imports.
-from os import chdir
-from subprocess import run
+from datetime import datetime, timedelta, timezone
 from sentence_transformers import SentenceTransformer
+from cryptography import x509
+from cryptography.x509.oid import NameOID
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import Encoding, PrivateFormat, NoEncryption
 
 # Local getters imports.
 from application.getters import working_directory_validation, mp_spdz_directory_validation
-from application.getters import (get_mp_spdz_directory as
-                                 mp_spdz_directory)
-from application.getters import (get_working_directory as
-                                 working_directory)
-from application.getters import (get_mp_spdz_compile_path as
-                                 mp_spdz_compile_path)
+from application.getters import (get_mp_spdz_service_argument as
+                                 service_argument)
+from application.getters import (get_mpc_backend as
+                                 mpc_backend)
 from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_path as
                                  sort_and_encrypt_with_circuit_mpc_script_path)
 from application.getters import (get_sort_and_reencrypt_with_circuit_mpc_script_path as
@@ -23,32 +25,18 @@ from application.getters import (get_sort_and_reencrypt_circuit_path as
                                  sort_and_reencrypt_circuit_path)
 from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
                                  aes_128_ecb_with_circuit_mpc_script_path)
-from application.getters import (get_mp_spdz_scripts_directory as
-                                 mp_spdz_scripts_directory)
-from application.getters import (get_mp_spdz_circuits_directory as
-                                 mp_spdz_circuits_directory)
-from application.getters import (get_encrypted_records_directory as
-                                 encrypted_pnr_records_directory)
+from application.getters import (get_mpc_program_parameterizations as
+                                 mpc_program_parameterizations)
 from application.getters import (get_server_indexing_directory as
                                  server_indexing_files_directory)
-from application.getters import (get_server_encrypted_inverted_index_matrix_directory as
-                                 server_encrypted_inverted_index_matrix_directory)
-from application.getters import (get_server_encryption_keys_directory as
-                                 server_encryption_keys_directory)
-from application.getters import (get_server_mp_spdz_input_directory as
-                                 server_mp_spdz_input_directory)
-from application.getters import (get_server_mp_spdz_output_directory as
-                                 server_mp_spdz_output_directory)
+from application.getters import (get_server_sessions_directory as
+                                 server_sessions_directory)
 from application.getters import (get_records_directory as
                                  records_directory)
 from application.getters import (get_client_indexing_directory as
                                  client_indexing_directory)
 from application.getters import (get_client_encrypted_inverted_index_matrix_directory as
                                  client_encrypted_inverted_index_matrix_directory)
-from application.getters import (get_client_mp_spdz_input_directory as
-                                 client_mp_spdz_input_directory)
-from application.getters import (get_client_mp_spdz_output_directory as
-                                 client_mp_spdz_output_directory)
 from application.getters import (get_records_encryption_key_streams_directory as
                                  records_encryption_key_streams_directory)
 from application.getters import (get_retrieved_records_directory as
@@ -57,6 +45,19 @@ from application.getters import (get_semantic_search_mpc_script_path as
                                  semantic_search_mpc_script_path)
 from application.getters import (get_embedding_model as
                                  embedding_model)
+from application.getters import (get_networking_certificates_directory as
+                                 networking_certificates_directory)
+from application.getters import (get_client_networking_key_path as
+                                 client_networking_key_path)
+from application.getters import (get_client_networking_certificate_path as
+                                 client_networking_certificate_path)
+from application.getters import (get_server_networking_key_path as
+                                 server_networking_key_path)
+from application.getters import (get_server_networking_certificate_path as
+                                 server_networking_certificate_path)
+
+# MPC imports.
+from application.MPC.compile_cache import compile_program
 
 
 def create_necessary_directories() -> None:
@@ -71,25 +72,19 @@ def create_necessary_directories() -> None:
             -
     """
 
-    encrypted_pnr_records_directory().mkdir(exist_ok=True)
     server_indexing_files_directory().mkdir(exist_ok=True)
-    server_encrypted_inverted_index_matrix_directory().mkdir(exist_ok=True)
-    server_mp_spdz_input_directory().mkdir(exist_ok=True)
-    server_mp_spdz_output_directory().mkdir(exist_ok=True)
-    server_encryption_keys_directory().mkdir(exist_ok=True)
+    server_sessions_directory().mkdir(exist_ok=True)
     records_directory().mkdir(exist_ok=True)
     client_indexing_directory().mkdir(exist_ok=True)
     client_encrypted_inverted_index_matrix_directory().mkdir(exist_ok=True)
-    client_mp_spdz_input_directory().mkdir(exist_ok=True)
-    client_mp_spdz_output_directory().mkdir(exist_ok=True)
     records_encryption_key_streams_directory().mkdir(exist_ok=True)
     retrieved_records_directory().mkdir(exist_ok=True)
 
 
-def setup_mpc_scripts_and_circuits() -> None:
+def create_networking_certificates() -> None:
     """
-        Moves the necessary .mpc scripts and the circuits they use over to the MP-SPDZ directory, then compiles the
-        scripts.
+        Creates the self-signed keys and certificates the client and the server authenticate each other with when
+        running without MP-SPDZ, whose keys and certificates are used otherwise. Valid ones are kept.
 
         Parameters:
             -
@@ -99,29 +94,66 @@ def setup_mpc_scripts_and_circuits() -> None:
             -
     """
 
-    chdir(mp_spdz_directory())
+    networking_certificates_directory().mkdir(exist_ok=True)
+
+    now = datetime.now(timezone.utc)
+    for key_path, certificate_path in [(client_networking_key_path(), client_networking_certificate_path()),
+                                       (server_networking_key_path(), server_networking_certificate_path())]:
+        if key_path.exists() and certificate_path.exists():
+            certificate = x509.load_pem_x509_certificate(certificate_path.read_bytes())
+            if certificate.not_valid_after_utc > now:
+                continue
+
+        # The certificates are named after the parties, which the client verifies the name of the server against.
+        key = ec.generate_private_key(ec.SECP256R1())
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, certificate_path.stem)])
+        certificate = (x509.CertificateBuilder()
+                       .subject_name(name)
+                       .issuer_name(name)
+                       .public_key(key.public_key())
+                       .serial_number(x509.random_serial_number())
+                       .not_valid_before(now)
+                       .not_valid_after(now + timedelta(days=365))
+                       .add_extension(x509.SubjectAlternativeName([x509.DNSName(certificate_path.stem)]),
+                                      critical=False)
+                       .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+                       .sign(key, hashes.SHA256()))
+
+        key_path.write_bytes(key.private_bytes(Encoding.PEM, PrivateFormat.TraditionalOpenSSL, NoEncryption()))
+        certificate_path.write_bytes(certificate.public_bytes(Encoding.PEM))
 
-    # Moves the circuits.
-    run(['cp', f'{sort_and_encrypt_circuit_path()}',
-         f'{mp_spdz_circuits_directory() / sort_and_encrypt_circuit_path().name}'])
-    run(['cp', f'{sort_and_reencrypt_circuit_path()}',
-         f'{mp_spdz_circuits_directory() / sort_and_reencrypt_circuit_path().name}'])
+    return
 
-    # Moves and compiles the .mpc scripts.
-    run(['cp', f'{sort_and_encrypt_with_circuit_mpc_script_path()}',
-         f'{mp_spdz_scripts_directory() / sort_and_encrypt_with_circuit_mpc_script_path().name}'])
-    run([f'{mp_spdz_compile_path()}', f'{sort_and_encrypt_with_circuit_mpc_script_path().name}', '-B', '128'])
-    run(['cp', f'{sort_and_reencrypt_with_circuit_mpc_script_path()}',
-         f'{mp_spdz_scripts_directory() / sort_and_reencrypt_with_circuit_mpc_script_path().name}'])
-    run([f'{mp_spdz_compile_path()}', f'{sort_and_reencrypt_with_circuit_mpc_script_path().name}', '-B', '128'])
-    run(['cp', f'{aes_128_ecb_with_circuit_mpc_script_path()}',
-         f'{mp_spdz_scripts_directory() / aes_128_ecb_with_circuit_mpc_script_path().name}'])
-    run([f'{mp_spdz_compile_path()}', f'{aes_128_ecb_with_circuit_mpc_script_path().name}', '-B', '128'])
-    run(['cp', f'{semantic_search_mpc_script_path()}',
-         f'{mp_spdz_scripts_directory() / semantic_search_mpc_script_path().name}'])
-    run([f'{mp_spdz_compile_path()}', f'{semantic_search_mpc_script_path().name}', '-B', '32'])
 
-    chdir(working_directory())
+def setup_mpc_scripts_and_circuits() -> None:
+    """
+        Moves the necessary .mpc scripts and the circuits they use over to the MP-SPDZ directory, then compiles the
+        scripts as services that keep running jobs. The programs are first compiled for every parameterization to be
+        pre-compiled, then for the configured parameters, and only when they are not already compiled from the same
+        script, circuits, options and parameters.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises ChildProcessError
+            -
+    """
+
+    # The script, circuits and compiler options of each program, which are all compiled with the service argument.
+    mpc_programs = [(sort_and_encrypt_with_circuit_mpc_script_path(), [sort_and_encrypt_circuit_path()], ['-B', '128']),
+                    (sort_and_reencrypt_with_circuit_mpc_script_path(), [sort_and_reencrypt_circuit_path()],
+                     ['-B', '128']),
+                    (aes_128_ecb_with_circuit_mpc_script_path(), [], ['-B', '128']),
+                    (semantic_search_mpc_script_path(), [], ['-B', '32'])]
+
+    for parameter_overrides in [*mpc_program_parameterizations(), None]:
+        for mpc_script_path, circuit_paths, compiler_options in mpc_programs:
+            outcome = compile_program(mpc_script_path, circuit_paths, compiler_options, [f'{service_argument()}'],
+                                      parameter_overrides)
+            print(f'[{outcome.upper()}] {mpc_script_path.stem} {parameter_overrides or ""}')
+
+    return
 
 
 def main() -> None:
@@ -132,16 +164,22 @@ def main() -> None:
     # Sets the working directory and validates it together with the MP-SPDZ's path.
     try:
         working_directory_validation()
-        mp_spdz_directory_validation()
+        if mpc_backend() == 'mp-spdz':
+            mp_spdz_directory_validation()
     except NotADirectoryError:
         raise NotADirectoryError('Please verify the "working_directory" and "MP_SPDZ_directory" paths in getters.py')
 
-    # Moves and compiles the MP-SPDZ scripts.
-    setup_mpc_scripts_and_circuits()
+    # Moves and compiles the MP-SPDZ scripts, which the simulated backend does without.
+    if mpc_backend() == 'mp-spdz':
+        setup_mpc_scripts_and_circuits()
 
     # Makes the required directories.
     create_necessary_directories()
 
+    # Creates the keys and certificates for communication, which MP-SPDZ provides otherwise.
+    if mpc_backend() == 'simulated':
+        create_networking_certificates()
+
     # Downloads the model.
     SentenceTransformer(embedding_model())
 
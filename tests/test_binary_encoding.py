@@ -0,0 +1,127 @@
+""" Tests of the binary encoding of the encrypted records, the encrypted inverted index matrix and the MPC jobs. """
+
+# Imports.
+from pathlib import Path
+
+import pytest
+
+# Local getters imports.
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
+
+# Binary encoding imports.
+from application.binary_encoding import (encode_blocks, write_encrypted_inverted_index_matrix_part,
+                                         read_encrypted_inverted_index_matrix_part_header,
+                                         read_encrypted_inverted_index_matrix_part, encode_words, decode_words)
+
+
+def test_blocks_are_encoded_as_fixed_size_words() -> None:
+    """
+        Encodes hexadecimal blocks of any length as words of number_of_bytes each.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    encoded_blocks = encode_blocks(['0', 'ff', 'f' * 2 * number_of_bytes()])
+
+    assert len(encoded_blocks) == 3 * number_of_bytes()
+    assert encoded_blocks[:number_of_bytes()] == bytes(number_of_bytes())
+    assert encoded_blocks[2 * number_of_bytes() - 1] == 0xff
+    assert encoded_blocks[2 * number_of_bytes():] == b'\xff' * number_of_bytes()
+    assert encode_blocks([]) == b''
+
+    return
+
+
+def test_inverted_index_matrix_part_round_trip(tmp_path: Path) -> None:
+    """
+        Writes a part of the encrypted inverted index matrix and reads it back as raw ciphertexts.
+
+        Parameters:
+            - tmp_path (Path) : Temporary directory of the test.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    part = {f'{attribute:x}' * 4: [f'{attribute * 16 + index:x}' for index in range(3)] for attribute in range(1, 6)}
+    part_path = tmp_path / 'part.bin'
+    write_encrypted_inverted_index_matrix_part(part, part_path)
+
+    assert read_encrypted_inverted_index_matrix_part_header(part_path) == (5, 3)
+    assert read_encrypted_inverted_index_matrix_part(part_path) == {
+        encode_blocks([attribute]): [encode_blocks([index]) for index in indices] for attribute, indices in part.items()}
+
+    return
+
+
+def test_empty_inverted_index_matrix_part_round_trip(tmp_path: Path) -> None:
+    """
+        Writes an empty part of the encrypted inverted index matrix and reads it back.
+
+        Parameters:
+            - tmp_path (Path) : Temporary directory of the test.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    part_path = tmp_path / 'part.bin'
+    write_encrypted_inverted_index_matrix_part({}, part_path)
+
+    assert read_encrypted_inverted_index_matrix_part_header(part_path) == (0, 0)
+    assert read_encrypted_inverted_index_matrix_part(part_path) == {}
+
+    return
+
+
+@pytest.mark.parametrize('signed', [False, True])
+def test_words_round_trip(signed: bool) -> None:
+    """
+        Encodes integers as words and decodes them back, the largest and, when signed, the smallest integers included.
+
+        Parameters:
+            - signed (bool) : Whether the integers may be negative.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    bits = 8 * number_of_bytes() - signed
+    integers = [0, 1, 255, 2 ** bits - 1] + ([-1, -2 ** bits] if signed else [])
+    words = encode_words(integers, signed=signed)
+
+    assert len(words) == len(integers) * number_of_bytes()
+    assert decode_words(words, signed=signed) == integers
+
+    return
+
+
+def test_words_out_of_range_are_rejected() -> None:
+    """
+        Refuses to encode integers that do not fit in a word.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    with pytest.raises(OverflowError):
+        encode_words([-1])
+    with pytest.raises(OverflowError):
+        encode_words([2 ** (8 * number_of_bytes())])
+    with pytest.raises(OverflowError):
+        encode_words([2 ** (8 * number_of_bytes() - 1)], signed=True)
+
+    return
@@ -0,0 +1,214 @@
+""" Tests of the tagged request and response frames between the client and server. """
+
+# Imports.
+from asyncio import open_connection, create_task, get_running_loop, sleep, run
+from socket import socketpair, MSG_WAITALL
+from threading import Thread
+
+import pytest
+
+# Networking imports.
+from application.networking import Connection, AsyncConnection, MessageType, FRAME_HEADER
+
+
+def fail(connection: Connection, tag: int, message_type: MessageType, payload: bytearray) -> None:
+    """
+        Handler failing every request.
+
+        Parameters:
+            - connection (Connection) : Connection the request was received on.
+            - tag (int) : Tag of the request.
+            - message_type (MessageType) : The type of the request.
+            - payload (bytearray) : The payload of the request.
+
+        Returns:
+            :raises RuntimeError
+            -
+    """
+
+    raise RuntimeError('The handler failed.')
+
+
+def test_failed_request_is_answered_with_an_error() -> None:
+    """
+        A request whose handler fails is answered with an error response, and the next request is still received.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    client_socket, server_socket = socketpair()
+    client = Connection(client_socket, lambda *_: None)
+    server = Connection(server_socket, fail)
+    try:
+        for _ in range(2):
+            with pytest.raises(ConnectionError, match='The handler failed'):
+                client.request(MessageType.ONLINE)
+        assert server.receive_thread.is_alive()
+    finally:
+        client.close()
+        server.close()
+
+    return
+
+
+def test_unknown_message_type_is_answered_with_an_error() -> None:
+    """
+        A frame of an unknown type is answered with an error response, and the next request is still received.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    client_socket, server_socket = socketpair()
+    server = Connection(server_socket, lambda connection, tag, message_type, payload: connection.respond(tag))
+    try:
+        client_socket.sendall(FRAME_HEADER.pack(255, 7, 3) + b'abc')
+        message_type, tag, length = FRAME_HEADER.unpack(client_socket.recv(FRAME_HEADER.size, MSG_WAITALL))
+        assert (message_type, tag) == (MessageType.ERROR_RESPONSE, 7)
+        client_socket.recv(length, MSG_WAITALL)
+
+        client_socket.sendall(FRAME_HEADER.pack(MessageType.ONLINE, 8, 0))
+        assert FRAME_HEADER.unpack(client_socket.recv(FRAME_HEADER.size, MSG_WAITALL)) == (MessageType.RESPONSE, 8, 0)
+    finally:
+        server.close()
+        client_socket.close()
+
+    return
+
+
+def test_pending_request_is_woken_when_the_peer_disconnects() -> None:
+    """
+        A request waiting for its response fails once the peer disconnects.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    client_socket, server_socket = socketpair()
+    client = Connection(client_socket, lambda *_: None)
+
+    errors = []
+    def request() -> None:
+        try:
+            client.request(MessageType.ONLINE)
+        except ConnectionError as error:
+            errors.append(error)
+
+    requester = Thread(target=request, daemon=True)
+    try:
+        requester.start()
+        server_socket.recv(FRAME_HEADER.size)
+        server_socket.close()
+        requester.join(timeout=10)
+        assert not requester.is_alive() and errors
+    finally:
+        client.close()
+
+    return
+
+
+async def respond(connection: AsyncConnection, tag: int, message_type: MessageType, payload: bytes) -> None:
+    """
+        Handler answering every request.
+
+        Parameters:
+            - connection (AsyncConnection) : Connection the request was received on.
+            - tag (int) : Tag of the request.
+            - message_type (MessageType) : The type of the request.
+            - payload (bytes) : The payload of the request.
+
+        Returns:
+            :raises
+            -
+    """
+
+    await connection.respond(tag, payload)
+
+    return
+
+
+def test_async_unknown_message_type_is_answered_with_an_error() -> None:
+    """
+        A frame of an unknown type received by the server is answered with an error response, and the next request is
+        still received.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    async def exchange() -> None:
+        client_socket, server_socket = socketpair()
+        reader, writer = await open_connection(sock=server_socket)
+        server = AsyncConnection(reader, writer, respond)
+        receiving = create_task(server.receive())
+        client = Connection(client_socket, lambda *_: None)
+        try:
+            client.send_frame(7, 255)
+            await sleep(0.1)
+            response = await get_running_loop().run_in_executor(None, client.request, MessageType.ONLINE, b'online')
+            assert response == b'online'
+            assert not receiving.done()
+        finally:
+            client.close()
+            await receiving
+            await server.close()
+
+    run(exchange())
+
+    return
+
+
+def test_async_response_to_a_cancelled_request_is_ignored() -> None:
+    """
+        The response to a request that was cancelled is ignored, and the other requests are still woken once the peer
+        disconnects.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    async def exchange() -> None:
+        client_socket, server_socket = socketpair()
+        reader, writer = await open_connection(sock=server_socket)
+        server = AsyncConnection(reader, writer, respond)
+        receiving = create_task(server.receive())
+        try:
+            cancelled = create_task(server.request(MessageType.SENDING_NUMBER_OF_DUMMY_ITEMS))
+            pending = create_task(server.request(MessageType.SENDING_NUMBER_OF_DUMMY_ITEMS))
+            await sleep(0.1)
+            cancelled.cancel()
+            client_socket.sendall(FRAME_HEADER.pack(MessageType.RESPONSE, 1, 0))
+            await sleep(0.1)
+            assert not receiving.done()
+
+            client_socket.close()
+            await receiving
+            with pytest.raises(ConnectionError):
+                await pending
+        finally:
+            await server.close()
+
+    run(exchange())
+
+    return
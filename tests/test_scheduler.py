@@ -0,0 +1,101 @@
+""" Tests of the dispatching of a dependency graph of MPC jobs to the workers. """
+
+# Imports.
+from random import Random
+from threading import Lock
+from time import sleep
+
+import pytest
+
+# MPC imports.
+from application.MPC.scheduler import get_dependencies, get_critical_path_length, run_schedule
+
+
+def test_task_depends_on_the_last_tasks_touching_its_items() -> None:
+    """
+        A task depends on the last earlier task that touched each of its items, and on no other task.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    dependencies = get_dependencies([[0, 1], [2, 3], [1, 2], [0, 3], [4, 5], [1, 4]])
+
+    assert dependencies == [set(), set(), {0, 1}, {0, 1}, set(), {2, 4}]
+    assert get_critical_path_length(dependencies) == 3
+    assert get_critical_path_length([]) == 0
+
+    return
+
+
+@pytest.mark.parametrize('number_of_workers', [1, 3, 8])
+def test_tasks_run_after_their_dependencies(number_of_workers: int) -> None:
+    """
+        Runs a random graph of tasks, every one of which starts only once the tasks it depends on have finished, each on
+        a single worker at a time.
+
+        Parameters:
+            - number_of_workers (int) : The number of workers.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    random = Random(number_of_workers)
+    tasks = [random.sample(range(20), 2) for _ in range(100)]
+    dependencies = get_dependencies(tasks)
+
+    lock, finished, running_workers, violations = Lock(), set(), set(), []
+    def run_task(task: list[int], worker: int) -> None:
+        task_index = next(index for index, other_task in enumerate(tasks) if other_task is task)
+        with lock:
+            if not dependencies[task_index] <= finished or worker in running_workers:
+                violations.append(task_index)
+            running_workers.add(worker)
+        sleep(0.001)
+        with lock:
+            running_workers.discard(worker)
+            finished.add(task_index)
+
+    metrics = run_schedule(tasks, dependencies, run_task, number_of_workers)
+
+    assert not violations
+    assert finished == set(range(len(tasks)))
+    assert metrics['tasks'] == len(tasks)
+    assert metrics['critical_path_length'] == get_critical_path_length(dependencies)
+    assert 0 < metrics['utilization'] <= 1
+
+    return
+
+
+def test_failed_task_stops_the_schedule() -> None:
+    """
+        A task that fails stops the workers from taking further tasks, and its error is raised.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    tasks = [[index] for index in range(10)]
+    dependencies = [set()] + [{index} for index in range(9)]
+
+    run_tasks = []
+    def run_task(task: list[int], worker: int) -> None:
+        run_tasks.append(task[0])
+        if task[0] == 3:
+            raise RuntimeError('The job failed.')
+
+    with pytest.raises(RuntimeError, match='The job failed'):
+        run_schedule(tasks, dependencies, run_task, 4)
+    assert run_tasks == [0, 1, 2, 3]
+
+    return
@@ -0,0 +1,96 @@
+""" Tests of the networks of compare-exchanges moving every record to its place in the permutation. """
+
+# Imports.
+from random import Random
+from typing import Callable
+
+import pytest
+
+# Client imports.
+import application.Client.Utilities.bitonic_sort
+from application.Client.Utilities.bitonic_sort import get_bitonic_network
+from application.Client.Utilities.waksman_network import get_waksman_network
+
+
+def apply_network(layers: list[list[tuple[bool, int, int]]], number_of_records: int) -> list[int]:
+    """
+        Runs the compare-exchanges of a network on the records, checking that no record is touched twice in a layer.
+
+        Parameters:
+            - layers (list[list[tuple[bool, int, int]]]) : The compare-exchanges of each layer.
+            - number_of_records (int) : The number of records.
+
+        Returns:
+            :raises AssertionError
+            - records (list[int]) : The record at each position once the network has run.
+    """
+
+    records = list(range(number_of_records))
+    for layer in layers:
+        indices = [index for _, index_a, index_b in layer for index in (index_a, index_b)]
+        assert len(indices) == len(set(indices)), 'A record is touched twice in a layer.'
+        assert all(0 <= index < number_of_records for index in indices)
+        for swap, index_a, index_b in layer:
+            if swap:
+                records[index_a], records[index_b] = records[index_b], records[index_a]
+
+    return records
+
+
+@pytest.mark.parametrize('get_network', [get_bitonic_network, get_waksman_network], ids=['bitonic', 'waksman'])
+@pytest.mark.parametrize('number_of_records', [1, 2, 3, 5, 6, 7, 8, 12, 13, 16, 31, 33, 64, 100])
+def test_network_moves_every_record_to_its_place(get_network: Callable, number_of_records: int,
+                                                 monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        Runs the network of random permutations of any number of records, which moves every record to the position the
+        permutation gives it.
+
+        Parameters:
+            - get_network (Callable) : Compiles the network of a permutation.
+            - number_of_records (int) : The number of records.
+            - monkeypatch (MonkeyPatch) : Patches the database size for the bitonic network.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    monkeypatch.setattr(application.Client.Utilities.bitonic_sort, 'database_size', lambda: number_of_records)
+
+    random = Random(number_of_records)
+    for _ in range(10):
+        permutation = random.sample(range(number_of_records), number_of_records)
+        layers = get_network(list(permutation))
+
+        records = apply_network(layers, number_of_records)
+        assert all(records[position] == record for record, position in enumerate(permutation))
+
+        # The first layer encrypts every record when there is an even number of them.
+        if number_of_records % 2 == 0:
+            assert sorted(index for _, index_a, index_b in layers[0]
+                          for index in (index_a, index_b)) == list(range(number_of_records))
+
+    return
+
+
+def test_waksman_network_is_smaller_than_the_bitonic_network(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        The Waksman network of a permutation has fewer switches than the bitonic network has compare-exchanges.
+
+        Parameters:
+            - monkeypatch (MonkeyPatch) : Patches the database size for the bitonic network.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    number_of_records = 100
+    monkeypatch.setattr(application.Client.Utilities.bitonic_sort, 'database_size', lambda: number_of_records)
+
+    permutation = Random(0).sample(range(number_of_records), number_of_records)
+    waksman_switches = sum(map(len, get_waksman_network(list(permutation))))
+    bitonic_compare_exchanges = sum(map(len, get_bitonic_network(list(permutation))))
+    assert waksman_switches < bitonic_compare_exchanges
+
+    return
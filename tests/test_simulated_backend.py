@@ -0,0 +1,171 @@
+""" End-to-end test of the application on the simulated MPC backend, which runs without MP-SPDZ. """
+
+# Imports.
+from json import load
+from pathlib import Path
+from shutil import copytree, ignore_patterns
+from socket import create_server
+from stat import S_IMODE
+
+import pytest
+
+# Local getters imports.
+import application.getters
+from application.getters import (get_mpc_backend_variable as
+                                 mpc_backend_variable)
+from application.getters import (get_records_directory as
+                                 records_directory)
+from application.getters import (get_excluded_records as
+                                 excluded_records)
+from application.getters import (get_retrieved_records_directory as
+                                 retrieved_records_directory)
+from application.getters import (get_maximum_number_of_sessions as
+                                 maximum_number_of_sessions)
+
+# Setup imports.
+from application.setup import create_necessary_directories, create_networking_certificates
+
+# Client and server imports.
+import application.Client.Utilities.client_utilities
+from application.Client.Utilities.client_utilities import Utilities as ClientUtilities
+from application.Client.client import Communicator as Client
+from application.Server.server import Communicator as Server
+
+
+@pytest.fixture
+def working_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+        Runs the application on the simulated backend from a copy of the application directory, on a free port.
+
+        Parameters:
+            - tmp_path (Path) : Temporary directory of the test.
+            - monkeypatch (MonkeyPatch) : Patches the environment and the getters for the test.
+
+        Returns:
+            :raises
+            - working_directory (Path) : The copy of the application directory.
+    """
+
+    working_directory = tmp_path / 'application'
+    copytree(Path(application.getters.__file__).parent, working_directory, ignore=ignore_patterns('__pycache__'))
+
+    monkeypatch.setenv(mpc_backend_variable(), 'simulated')
+    monkeypatch.setattr(application.getters, 'working_directory', working_directory)
+    with create_server(('localhost', 0)) as s:
+        monkeypatch.setattr(application.getters, 'server_port', s.getsockname()[1])
+
+    create_necessary_directories()
+    create_networking_certificates()
+
+    return working_directory
+
+
+def test_keyword_search(working_directory: Path) -> None:
+    """
+        Pre-processes the records, searches for a record by its email and fetches it.
+
+        Parameters:
+            - working_directory (Path) : The copy of the application directory.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    server = Server()
+    server.setup_records(True)
+    server.start()
+
+    client = Client()
+    try:
+        client.user_response('n', 'n')
+        client.wait_for_server()
+        client.waiting_to_send_number_of_dummy_items()
+        client.send_records_preprocessing_message()
+        client.wait_for_encrypted_inverted_index_matrix()
+        client.start_serving()
+
+        # Searches for the email of one of the generated records, which no other record holds.
+        record_path = next(path for path in sorted(records_directory().glob('*.json'))
+                           if path.name not in excluded_records())
+        with record_path.open() as f:
+            record = load(f)
+        client.send_encrypt_query_message(record['Payment Information']['Email'])
+        client.request_records()
+
+        with (retrieved_records_directory() / f'record{record["PNR Number"]}.json').open() as f:
+            assert load(f) == record
+    finally:
+        client.kill()
+        server.kill()
+
+    return
+
+
+def test_shutdown_closes_the_sessions(working_directory: Path) -> None:
+    """
+        Shuts the server down while a client is connected, which closes the client's session and frees its ports.
+
+        Parameters:
+            - working_directory (Path) : The copy of the application directory.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    server = Server()
+    server.setup_records(True)
+    server.start()
+
+    client = Client()
+    try:
+        client.user_response('n', 'n')
+        client.wait_for_server()
+    finally:
+        server.kill()
+        client.kill()
+
+    assert not server.sessions
+    assert sorted(server.free_port_slots) == list(range(maximum_number_of_sessions()))
+
+    return
+
+
+def test_scratch_encryption_keys_are_private_to_the_session(working_directory: Path, tmp_path: Path,
+                                                            monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        Keeps the encryption keys of a session in a scratch directory of its own that only its user can access, which
+        is removed even if the shuffle fails.
+
+        Parameters:
+            - working_directory (Path) : The copy of the application directory.
+            - tmp_path (Path) : Temporary directory of the test.
+            - monkeypatch (MonkeyPatch) : Patches the scratch directory and the shuffle for the test.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    scratch_directory = tmp_path / 'scratch'
+    monkeypatch.setattr(application.getters, 'get_scratch_directory', lambda: scratch_directory)
+    monkeypatch.setattr(application.Client.Utilities.client_utilities, 'scratch_directory', lambda: scratch_directory)
+
+    modes = {}
+    def shuffle(client_communicator: ClientUtilities, connection: None) -> None:
+        for path in (client_communicator.encryption_keys_directory,
+                     client_communicator.encryption_keys_directory.parent):
+            modes[path.relative_to(scratch_directory)] = S_IMODE(path.stat().st_mode)
+        raise ConnectionError('The server disconnected.')
+    monkeypatch.setattr(application.Client.Utilities.client_utilities, 'shuffle', shuffle)
+
+    client = ClientUtilities()
+    client.session_id = 'session'
+    with pytest.raises(ConnectionError):
+        client.records_preprocessing(client, None)
+
+    assert modes == {Path('Client/session/Records_Encryption_Key_Streams'): 0o700, Path('Client/session'): 0o700}
+    assert not (scratch_directory / 'Client' / 'session').exists()
+
+    return
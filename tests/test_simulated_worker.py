@@ -0,0 +1,106 @@
+""" Tests of the in-process reference implementations of the MP-SPDZ programs. """
+
+# Imports.
+from socket import create_server
+from threading import Thread
+
+import pytest
+
+# Local getters imports.
+from application.getters import (get_semantic_search_mpc_script_path as
+                                 semantic_search_mpc_script_path)
+
+# Binary encoding imports.
+from application.binary_encoding import encode_words, decode_words
+
+# MPC imports.
+import application.MPC.simulated_worker
+from application.MPC.simulated_worker import SimulatedWorkerPool, closest_embeddings
+
+
+# The search query embedding and the embeddings of the records, with the pointers of the records. Records 7, 3 and 9
+# are as close to the query as each other, and record 5 has negative coordinates.
+QUERY_EMBEDDING = [10, -20, 30]
+RECORD_POINTERS = [4, 7, 3, 5, 9]
+RECORDS_EMBEDDING = [[0, 0, 0], [11, -20, 30], [10, -20, 31], [-10, -20, 30], [10, -19, 30]]
+
+
+def get_inputs() -> tuple[bytes, bytes]:
+    """
+        Gets the inputs of both parties to the semantic search.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises
+            - inputs_0 (bytes) : The search query embedding.
+            - inputs_1 (bytes) : The record pointers followed by the record embeddings.
+    """
+
+    inputs_0 = encode_words(QUERY_EMBEDDING, signed=True)
+    inputs_1 = encode_words(RECORD_POINTERS + [value for embedding in RECORDS_EMBEDDING for value in embedding],
+                            signed=True)
+
+    return inputs_0, inputs_1
+
+
+@pytest.mark.parametrize('request_threshold, closest_records', [(1, [7]), (3, [7, 3, 9]), (5, [7, 3, 9, 5, 4])])
+def test_closest_embeddings(request_threshold: int, closest_records: list[int],
+                            monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        Gets the pointers of the records closest to the search query, ties going to the earlier record.
+
+        Parameters:
+            - request_threshold (int) : The number of records to get.
+            - closest_records (list[int]) : The pointers of the closest records, closest first.
+            - monkeypatch (MonkeyPatch) : Patches the request threshold for the test.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    monkeypatch.setattr(application.MPC.simulated_worker, 'request_threshold', lambda: request_threshold)
+
+    assert decode_words(closest_embeddings(*get_inputs()), signed=True) == closest_records
+
+    return
+
+
+def test_semantic_search_between_the_parties(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+        Runs the semantic search between party 0, holding the search query, and party 1, holding the records, with party
+        0 listening on the host address only.
+
+        Parameters:
+            - monkeypatch (MonkeyPatch) : Patches the request threshold for the test.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    monkeypatch.setattr(application.MPC.simulated_worker, 'request_threshold', lambda: 2)
+
+    with create_server(('localhost', 0)) as s:
+        port_base = s.getsockname()[1]
+    mpc_script_name = semantic_search_mpc_script_path().stem
+    inputs_0, inputs_1 = get_inputs()
+    pools = [SimulatedWorkerPool(port_base), SimulatedWorkerPool(port_base)]
+    try:
+        party_1 = Thread(target=pools[1].run, args=(1, mpc_script_name, '127.0.0.1', inputs_1), daemon=True)
+        party_1.start()
+        output = pools[0].run(0, mpc_script_name, '127.0.0.1', inputs_0)
+        party_1.join(timeout=10)
+
+        assert decode_words(output, signed=True) == [7, 3]
+        assert pools[0].get_worker(0, mpc_script_name, '127.0.0.1', 0).listener.getsockname()[0] == '127.0.0.1'
+    finally:
+        for pool in pools:
+            pool.close()
+
+    summary = pools[0].metrics.get_summary()['semantic_search']
+    assert (summary['jobs'], summary['workers'], summary['failed_workers']) == (1, 1, 0)
+
+    return
@@ -0,0 +1,209 @@
+""" Tests of the MP-SPDZ parties running jobs through their standard input and output. """
+
+# Imports.
+from pathlib import Path
+from socket import create_server
+from sys import executable
+from threading import Thread
+from time import sleep
+
+import pytest
+
+# Local getters imports.
+import application.getters
+from application.getters import (get_mp_spdz_protocol as
+                                 mp_spdz_protocol)
+from application.getters import (get_mp_spdz_job_end_marker as
+                                 job_end_marker)
+from application.getters import (get_sort_and_encrypt_with_circuit_mpc_script_path as
+                                 sort_and_encrypt_with_circuit_mpc_script_path)
+from application.getters import (get_number_of_blocks as
+                                 number_of_blocks)
+from application.getters import (get_number_of_bytes as
+                                 number_of_bytes)
+from application.getters import (get_aes_128_ecb_with_circuit_mpc_script_path as
+                                 aes_128_ecb_mpc_script_path)
+
+# MPC imports.
+from application.MPC.worker import PartyWorker
+from application.MPC.metrics import MetricsSink
+from application.MPC.simulated_worker import SimulatedWorkerPool
+
+
+# Stands in for a party of a program that reveals its outputs as it reads its inputs, as the sort_and_encrypt programs
+# do for every pair of records, by revealing every input word as soon as it is read. It reports the communication on
+# exit as MP-SPDZ does.
+PARTY = f'''#!{executable}
+import atexit, sys
+atexit.register(lambda: print('Data sent = 0.5 MB in ~3 rounds (party 0 only)', file=sys.stderr))
+stdin = sys.stdin.buffer.raw
+pending, running = b'', False
+while chunk := stdin.read(4096):
+    data = pending + chunk
+    end = max(data.rfind(b' '), data.rfind(b'\\n')) + 1
+    data, pending = data[:end], data[end:]
+    for line_number, line in enumerate(data.split(b'\\n')):
+        if line_number > 0:
+            print('{job_end_marker()}')
+            running = False
+        words = []
+        for token in line.split():
+            if running:
+                words.append(f'0x{{int(token):x}}')
+            elif token == b'0':
+                sys.exit(0)
+            else:
+                running = True
+        if words:
+            print(' '.join(words))
+    sys.stdout.flush()
+'''
+
+
+@pytest.fixture
+def mp_spdz_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+        Installs the stand-in party as the MP-SPDZ protocol.
+
+        Parameters:
+            - tmp_path (Path) : Temporary directory of the test.
+            - monkeypatch (MonkeyPatch) : Patches the getters for the test.
+
+        Returns:
+            :raises
+            - mp_spdz_directory (Path) : The directory of the stand-in party.
+    """
+
+    party_path = tmp_path / mp_spdz_protocol()
+    party_path.write_text(PARTY)
+    party_path.chmod(0o755)
+    monkeypatch.setattr(application.getters, 'mp_spdz_directory', tmp_path)
+
+    return tmp_path
+
+
+def test_job_larger_than_the_pipes(mp_spdz_directory: Path) -> None:
+    """
+        Runs a job of 64 pairs of records, whose inputs and outputs are each far larger than a pipe holds.
+
+        Parameters:
+            - mp_spdz_directory (Path) : The directory of the stand-in party.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    inputs = bytes(range(256)) * (64 * 2 * number_of_blocks() * number_of_bytes() // 256)
+    worker = PartyWorker(0, sort_and_encrypt_with_circuit_mpc_script_path().stem, 'localhost', 0, MetricsSink())
+
+    outputs = []
+    job = Thread(target=lambda: outputs.append(worker.run(inputs)), daemon=True)
+    try:
+        job.start()
+        job.join(timeout=60)
+        assert not job.is_alive(), 'The job is blocked on the pipes of the party.'
+        assert outputs == [inputs]
+    finally:
+        if job.is_alive():
+            worker.process.kill()
+        worker.close()
+
+    summary = worker.metrics.get_summary()['encrypt']
+    assert (summary['jobs'], summary['workers'], summary['bytes_sent'], summary['rounds']) == (1, 1, 500000, 3)
+
+    return
+
+
+def test_party_1_job_is_measured(mp_spdz_directory: Path) -> None:
+    """
+        Runs a job on party 1, which returns as soon as its inputs are handed over, and is measured once the end
+        marker of the job is read.
+
+        Parameters:
+            - mp_spdz_directory (Path) : The directory of the stand-in party.
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    worker = PartyWorker(1, sort_and_encrypt_with_circuit_mpc_script_path().stem, 'localhost', 0, MetricsSink())
+    try:
+        # The first word stands in for the indicator to run the job, so it is not zero.
+        assert worker.run(bytes(range(1, 1 + 4 * number_of_bytes()))) == b''
+        for _ in range(100):
+            if worker.metrics.get_summary().get('encrypt', {}).get('wall_time'):
+                break
+            sleep(0.1)
+    finally:
+        worker.close()
+
+    summary = worker.metrics.get_summary()['encrypt']
+    assert (summary['jobs'], summary['workers'], summary['rounds']) == (1, 1, 3)
+    assert summary['wall_time'] > 0
+
+    return
+
+
+def wait_for_pool_level(pool: SimulatedWorkerPool, operation: str, refills: int) -> dict[str, float]:
+    """
+        Waits for the workers of an operation to be warmed a number of times.
+
+        Parameters:
+            - pool (SimulatedWorkerPool) : The pool warming the workers.
+            - operation (str) : The operation of the workers.
+            - refills (int) : The number of times the workers are started.
+
+        Returns:
+            :raises AssertionError
+            - summary (dict[str, float]) : The metrics of the operation.
+    """
+
+    for _ in range(100):
+        summary = pool.metrics.get_summary().get(operation, {})
+        if summary.get('refills') == refills and 'pool_level' in summary:
+            return summary
+        sleep(0.1)
+
+    raise AssertionError(f'The workers of {operation} were not warmed {refills} times.')
+
+
+def test_stopped_warm_worker_is_replaced() -> None:
+    """
+        A warmed worker that stops during a job is started again in the background, which is reported in the pool
+        level and the refills.
+
+        Parameters:
+            -
+
+        Returns:
+            :raises AssertionError
+            -
+    """
+
+    with create_server(('localhost', 0)) as s:
+        port_base = s.getsockname()[1]
+    mpc_script_name = aes_128_ecb_mpc_script_path().stem
+    pools = [SimulatedWorkerPool(port_base), SimulatedWorkerPool(port_base)]
+    try:
+        for player_id, pool in enumerate(pools):
+            pool.warm(player_id, mpc_script_name, 'localhost')
+        assert wait_for_pool_level(pools[0], 'aes_128_ecb', 1)['pool_level'] == 1
+
+        # Party 1 stops, so the job of party 0 fails and its worker is replaced once party 1 is warmed again.
+        pools[1].get_worker(1, mpc_script_name, 'localhost', 0).close_connection()
+        with pytest.raises(ChildProcessError):
+            pools[0].run(0, mpc_script_name, 'localhost', b'')
+        pools[1].warm(1, mpc_script_name, 'localhost')
+        summary = wait_for_pool_level(pools[0], 'aes_128_ecb', 2)
+        assert (summary['pool_level'], summary['warm_jobs'], summary['failures']) == (1, 1, 1)
+    finally:
+        for pool in pools:
+            pool.close()
+
+    # The failed worker and the one replacing it have stopped.
+    summary = pools[0].metrics.get_summary()['aes_128_ecb']
+    assert (summary['workers'], summary['failed_workers']) == (2, 1)
+
+    return